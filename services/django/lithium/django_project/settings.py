@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     # Third-party
     "rest_framework",
     "allauth",
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "timetabling_system.middleware.RequestMetricsMiddleware",  # request latency for /metrics
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # WhiteNoise
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -204,6 +206,31 @@ ACCOUNT_EMAIL_REQUIRED = True
 DATA_UPLOAD_MAX_NUMBER_FIELDS = int(os.getenv("DJANGO_DATA_UPLOAD_MAX_NUMBER_FIELDS", "50000"))
 ACCOUNT_UNIQUE_EMAIL = True
 
+# Parsed-upload cache keyed by file content hash; least recently used entries
+# are evicted past the size limit. A limit of 0 disables the cache.
+UPLOAD_PARSE_CACHE_DIR = Path(os.getenv("DJANGO_UPLOAD_PARSE_CACHE_DIR", BASE_DIR / ".upload-cache"))
+UPLOAD_PARSE_CACHE_MAX_BYTES = int(os.getenv("DJANGO_UPLOAD_PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# A queued upload still running after this many seconds is taken to belong to a
+# worker that died: it is queued again, or failed once it has been claimed
+# UPLOAD_JOB_MAX_ATTEMPTS times. Keep the timeout above the slowest real import.
+UPLOAD_JOB_TIMEOUT = int(os.getenv("DJANGO_UPLOAD_JOB_TIMEOUT", "1800"))
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv("DJANGO_UPLOAD_JOB_MAX_ATTEMPTS", "2"))
+
+# Staff ?profile=1 uploads write <UploadLog id>.pstats / .collapsed files here.
+UPLOAD_PROFILE_DIR = Path(os.getenv("DJANGO_UPLOAD_PROFILE_DIR", BASE_DIR / ".upload-profiles"))
+
+# Per-worker metrics files merged by /metrics (see timetabling_system.metrics).
+METRICS_DIR = Path(os.getenv("DJANGO_METRICS_DIR", BASE_DIR / ".metrics"))
+# /metrics only answers these client addresses (REMOTE_ADDR, i.e. the proxy's
+# address behind a reverse proxy) or requests sending
+# "Authorization: Bearer <DJANGO_METRICS_TOKEN>" when a token is set.
+METRICS_ALLOWED_IPS = os.getenv("DJANGO_METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+METRICS_TOKEN = os.getenv("DJANGO_METRICS_TOKEN", "")
+
+# Runs the tests with the directories above pointed at temporary ones.
+TEST_RUNNER = "django_project.test_runner.TestRunner"
+
 # CORS setup for local frontend
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
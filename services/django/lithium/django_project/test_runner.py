@@ -0,0 +1,28 @@
+from tempfile import TemporaryDirectory
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from timetabling_system import metrics
+
+# Settings naming directories the app writes to at runtime.
+RUNTIME_DIRS = ("METRICS_DIR", "UPLOAD_PARSE_CACHE_DIR", "UPLOAD_PROFILE_DIR")
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the suite with RUNTIME_DIRS in a temporary directory instead of the project tree."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._runtime_dir = TemporaryDirectory()
+        self._runtime_settings = override_settings(
+            **{name: f"{self._runtime_dir.name}/{name.lower()}" for name in RUNTIME_DIRS}
+        )
+        self._runtime_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # Drop this process's metrics so the exit-time flush has nothing to write.
+        metrics.reset()
+        self._runtime_settings.disable()
+        self._runtime_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -57,6 +57,10 @@ export PGUSER=$DB_SUPERUSER
 run_as_dev pg_ctl -D "$POSTGRES_DIR" -w start
 
 cleanup() {
+  if [ -n "${WORKER_PID:-}" ] && kill -0 "$WORKER_PID" >/dev/null 2>&1; then
+    kill "$WORKER_PID"
+    wait "$WORKER_PID" || true
+  fi
   if [ -n "${RUNSERVER_PID:-}" ] && kill -0 "$RUNSERVER_PID" >/dev/null 2>&1; then
     kill "$RUNSERVER_PID"
     wait "$RUNSERVER_PID" || true
@@ -89,6 +93,10 @@ run_in_venv python -m pip install --no-input -r requirements.txt
 run_in_venv python manage.py makemigrations --noinput
 run_in_venv python manage.py migrate --noinput
 
+# Background worker for uploads queued with ?async=1
+run_in_venv python manage.py process_upload_jobs &
+WORKER_PID=$!
+
 run_in_venv python manage.py runserver 0.0.0.0:8000 &
 RUNSERVER_PID=$!
 wait "$RUNSERVER_PID"
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from unittest.mock import patch
 
 
+# The parse cache is keyed by file content; keep it out of tests that reuse the same bytes.
+@override_settings(UPLOAD_PARSE_CACHE_MAX_BYTES=0)
 class TimetableUploadViewTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -70,3 +72,472 @@ class TimetableUploadViewTests(TestCase):
         self.assertIn("rows", ingest_args[0])
         self.assertEqual(response.data["status"], "ok")
         self.assertIn("ingest", response.data)
+
+
+@override_settings(UPLOAD_PARSE_CACHE_MAX_BYTES=0)
+class AsyncUploadJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="async-uploader",
+            email="async@example.com",
+            password="secret",
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("api-exam-upload")
+
+    def _queue(self, name="exam.xlsx"):
+        upload = SimpleUploadedFile(name, b"content", content_type="application/vnd.ms-excel")
+        return self.client.post(f"{self.url}?async=1", {"file": upload}, format="multipart")
+
+    @patch("timetabling_system.api.views.parse_excel_file")
+    def test_async_upload_is_queued_without_parsing(self, mock_parse):
+        response = self._queue()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "queued")
+        self.assertEqual(
+            response.data["status_url"], reverse("api-upload-job", args=[response.data["job_id"]])
+        )
+        mock_parse.assert_not_called()
+
+        job = self.client.get(response.data["status_url"])
+        self.assertEqual(job.status_code, status.HTTP_200_OK)
+        self.assertEqual(job.data["status"], "queued")
+        self.assertEqual(job.data["file_name"], "exam.xlsx")
+        self.assertNotIn("file_content", job.data)
+
+    @patch("timetabling_system.services.upload_jobs.ingest_upload_result")
+    @patch("timetabling_system.services.upload_jobs.parse_excel_file")
+    def test_worker_runs_job_and_records_progress(self, mock_parse, mock_ingest):
+        from timetabling_system.services.upload_jobs import process_pending_jobs
+
+        mock_parse.return_value = {"status": "ok", "type": "Exam", "rows": [{"x": 1}]}
+        mock_ingest.return_value = {"handled": True, "created": 2, "updated": 1}
+        response = self._queue()
+
+        self.assertEqual(process_pending_jobs(), 1)
+        self.assertEqual(process_pending_jobs(), 0)
+
+        parsed_upload = mock_parse.call_args[0][0]
+        self.assertEqual(parsed_upload.name, "exam.xlsx")
+        self.assertEqual(parsed_upload.read(), b"content")
+        self.assertEqual(mock_ingest.call_args[1]["uploaded_by"], self.user)
+
+        job = self.client.get(response.data["status_url"]).data
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["summary"]["records_created"], 2)
+        self.assertNotIn("rows", job["summary"])
+        self.assertEqual(job["progress"]["parse"]["status"], "done")
+        self.assertEqual(job["progress"]["ingest"]["status"], "done")
+        self.assertIsNotNone(job["finished_at"])
+
+    @patch("timetabling_system.services.upload_jobs.ingest_upload_result")
+    @patch("timetabling_system.services.upload_jobs.parse_excel_file")
+    def test_failed_parse_marks_job_failed(self, mock_parse, mock_ingest):
+        from timetabling_system.services.upload_jobs import process_pending_jobs
+
+        mock_parse.return_value = {"status": "error", "message": "Missing required columns"}
+        response = self._queue()
+
+        process_pending_jobs()
+
+        job = self.client.get(response.data["status_url"]).data
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Missing required columns")
+        self.assertEqual(job["progress"]["ingest"]["status"], "skipped")
+        mock_ingest.assert_not_called()
+
+    @override_settings(UPLOAD_JOB_TIMEOUT=60, UPLOAD_JOB_MAX_ATTEMPTS=2)
+    def test_jobs_left_running_by_a_dead_worker_are_reclaimed(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from timetabling_system.models import UploadJob, UploadJobStatus
+        from timetabling_system.services.upload_jobs import claim_next_job
+
+        job_id = self._queue().data["job_id"]
+        self.assertEqual(claim_next_job().pk, job_id)
+        # Still within the timeout: the job belongs to a live worker.
+        self.assertIsNone(claim_next_job())
+
+        long_ago = timezone.now() - timedelta(minutes=5)
+        UploadJob.objects.filter(pk=job_id).update(started_at=long_ago)
+        retried = claim_next_job()
+        self.assertEqual((retried.pk, retried.attempts), (job_id, 2))
+
+        UploadJob.objects.filter(pk=job_id).update(started_at=long_ago)
+        self.assertIsNone(claim_next_job())
+        job = UploadJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, UploadJobStatus.FAILED)
+        self.assertIn("2 attempts", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+
+@override_settings(UPLOAD_PARSE_CACHE_MAX_BYTES=0)
+class UploadDedupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="dedup-uploader",
+            email="dedup@example.com",
+            password="secret",
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("api-exam-upload")
+        self.workbooks = {}
+
+    def _upload(self, upload, query=""):
+        # Commit each upload so its data version is recorded, as in production.
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"{self.url}{query}", {"file": upload}, format="multipart")
+
+    def _workbook_file(self, name, *rows):
+        from io import BytesIO
+        from openpyxl import Workbook
+
+        # openpyxl stamps the save time into the file, so each workbook is built
+        # once per test for a repeat upload to carry exactly the same bytes.
+        if rows not in self.workbooks:
+            wb = Workbook()
+            ws = wb.active
+            for row in rows:
+                ws.append(row)
+            buf = BytesIO()
+            wb.save(buf)
+            self.workbooks[rows] = buf.getvalue()
+        return SimpleUploadedFile(name, self.workbooks[rows], content_type="application/vnd.ms-excel")
+
+    def _exam_file(self, name="exam.xlsx", exam_name="Algebra"):
+        return self._workbook_file(
+            name,
+            ("Exam Code", "Exam Name", "Exam Date", "Exam Start", "Exam Length", "Exam Type", "School", "Main Venue"),
+            ("ABC101", exam_name, "2025-05-01", "09:30", 120, "On Campus", "Maths", "Main Hall"),
+        )
+
+    def test_identical_reupload_short_circuits(self):
+        from timetabling_system.api import views as api_views
+        from timetabling_system.models import UploadLog
+
+        first = self._upload(self._exam_file())
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["records_created"], 1)
+        self.assertEqual(len(UploadLog.objects.get().content_hash), 64)
+
+        with patch.object(api_views, "parse_excel_file") as mock_parse, patch.object(
+            api_views, "ingest_upload_result"
+        ) as mock_ingest:
+            second = self._upload(self._exam_file("again.xlsx"))
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["unchanged"])
+        self.assertEqual(second.data["file"], "again.xlsx")
+        self.assertEqual(second.data["records_created"], 0)
+        mock_parse.assert_not_called()
+        mock_ingest.assert_not_called()
+        self.assertEqual(UploadLog.objects.count(), 1)
+
+    def _provision_file(self, name="provisions.xlsx"):
+        from timetabling_system.utils.exam_period_generator import PROVISION_HEADERS
+
+        return self._workbook_file(
+            name,
+            tuple(PROVISION_HEADERS),
+            ("Main Hall", "Thursday", "2025-05-01", "09:30", "11:30", "2:00", "On Campus",
+             "ABC101", "Algebra", "Maths", "S100", "Student", "Extra time 25%", "Front row"),
+        )
+
+    def test_reupload_after_a_different_upload_imports_again(self):
+        from timetabling_system.models import Exam
+
+        self._upload(self._exam_file())
+        self._upload(self._exam_file(exam_name="Linear Algebra"))
+        again = self._upload(self._exam_file())
+
+        self.assertNotIn("unchanged", again.data)
+        self.assertEqual(again.data["records_updated"], 1)
+        self.assertEqual(Exam.objects.get(course_code="ABC101").exam_name, "Algebra")
+
+    def test_reupload_after_skipped_rows_imports_again(self):
+        from timetabling_system.models import Provisions, UploadLog
+
+        early = self._upload(self._provision_file())
+        self.assertEqual(early.status_code, status.HTTP_200_OK)
+        self.assertEqual(early.data["ingest"]["skipped"], 1)
+        self.assertEqual(UploadLog.objects.get().records_skipped, 1)
+
+        self._upload(self._exam_file())
+        again = self._upload(self._provision_file())
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertNotIn("unchanged", again.data)
+        self.assertEqual(again.data["records_created"], 1)
+        self.assertTrue(Provisions.objects.filter(student_id="S100", exam__course_code="ABC101").exists())
+
+        repeat = self._upload(self._provision_file())
+        self.assertTrue(repeat.data["unchanged"])
+
+    def test_prune_applies_incremental_import_to_identical_upload(self):
+        from timetabling_system.models import Exam
+
+        Exam.objects.create(
+            exam_name="Old", course_code="OLD1", exam_type="On Campus", no_students=1, exam_school="Maths"
+        )
+        self._upload(self._exam_file())
+
+        kept = self._upload(self._exam_file(), "?incremental=1")
+        self.assertTrue(kept.data["unchanged"])
+        pruned = self._upload(self._exam_file(), "?incremental=1&prune=1")
+
+        self.assertEqual(pruned.data["ingest"]["diff"]["removed"], ["OLD1"])
+        self.assertEqual(pruned.data["ingest"]["deleted"], {"Exam": 1})
+        self.assertFalse(Exam.objects.filter(course_code="OLD1").exists())
+
+    def test_force_reimports_identical_upload(self):
+        from timetabling_system.models import UploadLog
+
+        self._upload(self._exam_file())
+        response = self._upload(self._exam_file(), "?force=1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("unchanged", response.data)
+        self.assertEqual(response.data["records_updated"], 1)
+        self.assertEqual(UploadLog.objects.count(), 2)
+
+
+class ExamVenueListApiTests(TestCase):
+    def setUp(self):
+        from datetime import datetime
+
+        from django.utils import timezone
+        from timetabling_system.models import Exam, ExamVenue, Venue
+
+        self.client = APIClient()
+        # Run the data-version bumps as if the fixtures had been committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            hall = Venue.objects.create(venue_name="Main Hall", capacity=100, venuetype="main_hall")
+            start = timezone.make_aware(datetime(2025, 5, 1, 9, 30))
+            for idx in range(5):
+                exam = Exam.objects.create(
+                    exam_name=f"Exam {idx}",
+                    course_code=f"ABC10{idx}",
+                    exam_type="On Campus",
+                    no_students=10,
+                    exam_school="Maths",
+                    school_contact="",
+                )
+                ExamVenue.objects.create(exam=exam, venue=hall, start_time=start, exam_length=60, core=True)
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(reverse("exam-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(response.data[0]["venues"], ["Main Hall"])
+        self.assertEqual(response.data[0]["exam_venues"][0]["exam_name"], "Exam 0")
+
+    def test_cursor_pages_cover_every_exam_once(self):
+        url = f"{reverse('exam-list')}?page_size=2"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen.extend(exam["course_code"] for exam in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, [f"ABC10{idx}" for idx in range(5)])
+
+    def test_fields_skip_venue_prefetch(self):
+        # Data version lookup + exams.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("exam-list"), {"fields": "exam_id,course_code"})
+
+        self.assertEqual(set(response.data[0]), {"exam_id", "course_code"})
+
+    def test_expand_selects_nested_lists(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("exam-list"), {"expand": "exam_venues"})
+
+        self.assertNotIn("venues", response.data[0])
+        self.assertEqual(response.data[0]["exam_venues"][0]["venue_name"], "Main Hall")
+        self.assertEqual(response.data[0]["exam_venues"][0]["exam_name"], "Exam 0")
+
+        venues = self.client.get(reverse("venue-list"), {"expand": ""})
+        self.assertNotIn("exams", venues.data[0])
+        self.assertNotIn("exam_venues", venues.data[0])
+        self.assertEqual(venues.data[0]["venue_name"], "Main Hall")
+
+    def test_unchanged_data_returns_304_without_querying_rows(self):
+        from timetabling_system.models import Exam
+
+        first = self.client.get(reverse("exam-list"))
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(reverse("exam-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Exam.objects.filter(course_code="ABC100").first().save()
+        changed = self.client.get(reverse("venue-list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertIn("Last-Modified", changed)
+
+    def test_exam_sizes_use_fixed_number_of_queries(self):
+        from timetabling_system.models import Exam, ExamVenue, Student, StudentExam, Venue
+
+        exam = Exam.objects.get(course_code="ABC100")
+        core = exam.examvenue_set.get()
+        room = Venue.objects.create(venue_name="Room 1", capacity=5, venuetype="separate_room")
+        alt = ExamVenue.objects.create(exam=exam, venue=room, start_time=core.start_time, exam_length=60)
+        student = Student.objects.create(student_id="S1", student_name="Student")
+        StudentExam.objects.create(student=student, exam=exam, exam_venue=alt)
+
+        # Data version lookup + exams + grouped ExamVenue counts.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("api-exam-sizes"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(response.data[0]["core_size"], 9)
+        self.assertEqual(
+            [(ev["venue_name"], ev["students"]) for ev in response.data[0]["exam_venues"]],
+            [("Main Hall", 0), ("Room 1", 1)],
+        )
+        self.assertEqual(response.data[1]["core_size"], 10)
+
+        with self.assertNumQueries(3):
+            page = self.client.get(reverse("api-exam-sizes"), {"page_size": 2})
+        self.assertEqual([row["course_code"] for row in page.data["results"]], ["ABC100", "ABC101"])
+
+    def test_exam_sizes_etag_changes_with_student_exams(self):
+        from timetabling_system.models import Exam, Student, StudentExam
+
+        url = reverse("api-exam-sizes")
+        etag = self.client.get(url)["ETag"]
+        exam = Exam.objects.get(course_code="ABC100")
+        student = Student.objects.create(student_id="S1", student_name="Student")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seat = StudentExam.objects.create(student=student, exam=exam, exam_venue=exam.examvenue_set.get())
+        added = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(added.status_code, status.HTTP_200_OK)
+        self.assertEqual(added.data[0]["exam_venues"][0]["students"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seat.delete()
+        removed = self.client.get(url, HTTP_IF_NONE_MATCH=added["ETag"])
+        self.assertEqual(removed.status_code, status.HTTP_200_OK)
+        self.assertEqual(removed.data[0]["exam_venues"][0]["students"], 0)
+
+    def test_exam_sizes_filter_by_school_and_date(self):
+        url = reverse("api-exam-sizes")
+
+        self.assertEqual(len(self.client.get(url, {"school": "Maths", "date_from": "2025-05-01"}).data), 5)
+        self.assertEqual(self.client.get(url, {"school": "Physics"}).data, [])
+        self.assertEqual(self.client.get(url, {"date_to": "2025-04-30"}).data, [])
+
+        response = self.client.get(url, {"date_from": "May 1st"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_from", response.data)
+
+
+class UploadProfileTests(TestCase):
+    def setUp(self):
+        from tempfile import TemporaryDirectory
+
+        profile_dir = TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        settings_override = override_settings(
+            UPLOAD_PARSE_CACHE_MAX_BYTES=0, UPLOAD_PROFILE_DIR=profile_dir.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="secret", is_staff=True
+        )
+        self.result = {
+            "status": "ok",
+            "type": "Exam",
+            "rows": [
+                {
+                    "exam_code": "PROF1",
+                    "exam_name": "Profiled",
+                    "exam_date": "2025-07-01",
+                    "exam_start": "09:00",
+                    "exam_length": "2:00",
+                    "exam_type": "Written",
+                    "school": "Engineering",
+                    "main_venue": "Main Hall",
+                }
+            ],
+        }
+
+    def _upload(self, url):
+        upload = SimpleUploadedFile("exam.xlsx", b"content", content_type="application/vnd.ms-excel")
+        return self.client.post(url, {"file": upload}, format="multipart")
+
+    @patch("timetabling_system.api.views.parse_excel_file")
+    def test_staff_profile_is_saved_and_downloadable(self, mock_parse):
+        import pstats
+        from tempfile import NamedTemporaryFile
+
+        from timetabling_system.models import UploadLog
+
+        mock_parse.return_value = self.result
+        self.client.force_authenticate(self.staff)
+
+        response = self._upload(f"{reverse('api-exam-upload')}?profile=1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = UploadLog.objects.get()
+        self.assertTrue(log.has_profile)
+        profile_url = reverse("api-upload-profile", args=[log.pk])
+        self.assertEqual(
+            response.data["profile"],
+            {"pstats": f"{profile_url}?kind=pstats", "collapsed": f"{profile_url}?kind=collapsed"},
+        )
+
+        stats_file = self.client.get(response.data["profile"]["pstats"])
+        self.assertEqual(stats_file.status_code, status.HTTP_200_OK)
+        with NamedTemporaryFile() as tmp:
+            tmp.write(b"".join(stats_file.streaming_content))
+            tmp.flush()
+            functions = {func[2] for func in pstats.Stats(tmp.name).stats}
+        self.assertIn("ingest_upload_result", functions)
+
+        collapsed = self.client.get(response.data["profile"]["collapsed"])
+        self.assertEqual(collapsed.status_code, status.HTTP_200_OK)
+        for line in b"".join(collapsed.streaming_content).decode().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack and int(count) > 0)
+
+        self.assertEqual(self.client.get(profile_url, {"kind": "svg"}).status_code, 400)
+
+    @patch("timetabling_system.views.parse_excel_file")
+    def test_profile_flag_is_ignored_for_non_staff(self, mock_parse):
+        from timetabling_system.models import UploadLog
+
+        mock_parse.return_value = self.result
+        user = get_user_model().objects.create_user(
+            username="uploader", email="uploader@example.com", password="secret"
+        )
+        self.client.force_login(user)
+
+        response = self._upload(f"{reverse('upload-exams')}?profile=1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("profile", response.json())
+        log = UploadLog.objects.get()
+        self.assertFalse(log.has_profile)
+        profile_url = reverse("api-upload-profile", args=[log.pk])
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(profile_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(profile_url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.test import TestCase
+
+from timetabling_system.services import ingest_upload_result
+from timetabling_system.services.data_version import bump_data_version, get_data_version
+
+
+class DataVersionTests(TestCase):
+    def test_bumps_in_one_transaction_coalesce(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for _ in range(5):
+                    bump_data_version()
+
+        version, updated_at = get_data_version()
+        self.assertEqual(version, 1)
+        self.assertIsNotNone(updated_at)
+
+    def test_rolled_back_bump_is_dropped_and_next_one_applies(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    bump_data_version()
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+            self.assertEqual(get_data_version(), (0, None))
+            bump_data_version()
+
+        self.assertEqual(get_data_version()[0], 1)
+
+    def test_bump_in_rolled_back_savepoint_is_not_carried_over(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        bump_data_version("other")
+                        raise RuntimeError("rollback")
+                except RuntimeError:
+                    pass
+                bump_data_version()
+                bump_data_version()
+
+        self.assertEqual(get_data_version()[0], 1)
+        self.assertEqual(get_data_version("other"), (0, None))
+
+    def test_ingest_bumps_only_when_rows_change(self):
+        result = {
+            "status": "ok",
+            "type": "Exam",
+            "rows": [
+                {
+                    "exam_code": "ABC101",
+                    "exam_name": "Algebra",
+                    "exam_date": "2025-05-01",
+                    "exam_start": "09:30",
+                    "exam_length": 120,
+                    "exam_type": "Written",
+                    "no_students": "20",
+                    "school": "Maths",
+                    "school_contact": "Dr. X",
+                    "main_venue": "Main Hall",
+                }
+            ],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_upload_result(result, file_name="exam.xlsx", bulk=True)
+        version = get_data_version()[0]
+        self.assertGreaterEqual(version, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = ingest_upload_result(result, file_name="exam.xlsx", incremental=True)
+
+        self.assertEqual(summary["diff"]["unchanged"], 1)
+        self.assertEqual(get_data_version()[0], version)
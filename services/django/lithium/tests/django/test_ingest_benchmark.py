@@ -0,0 +1,93 @@
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from timetabling_system.models import Exam, ExamVenue, StudentExam, UploadLog, Venue
+from timetabling_system.utils.exam_period_generator import generate_exam_period
+from timetabling_system.utils.excel_parser import parse_excel_file
+
+
+class ExamPeriodGeneratorTests(TestCase):
+    def test_workbooks_parse_as_their_upload_types(self):
+        with TemporaryDirectory() as directory:
+            paths = generate_exam_period(directory, exams=8, students=5, venues=6, days=3, seed=1)
+            parsed = {}
+            for file_type in ("Venue", "Exam", "Provisions"):
+                with open(paths[file_type], "rb") as handle:
+                    parsed[file_type] = parse_excel_file(handle)
+
+        for file_type, result in parsed.items():
+            self.assertEqual((result["status"], result["type"]), ("ok", file_type))
+        self.assertEqual(len(parsed["Venue"]["days"]), 3)
+        self.assertEqual(len(parsed["Venue"]["venues"]), 6)
+        self.assertEqual(len(parsed["Exam"]["rows"]), 8)
+        self.assertEqual(len(parsed["Provisions"]["rows"]), paths["rows"]["Provisions"])
+        exam_codes = {row["exam_code"] for row in parsed["Exam"]["rows"]}
+        self.assertTrue({row["exam_code"] for row in parsed["Provisions"]["rows"]} <= exam_codes)
+
+    def test_same_seed_gives_same_timetable(self):
+        with TemporaryDirectory() as first, TemporaryDirectory() as second:
+            rows = []
+            for directory in (first, second):
+                paths = generate_exam_period(directory, exams=5, students=3, venues=4, days=2, seed=7)
+                with open(paths["Provisions"], "rb") as handle:
+                    batch = parse_excel_file(handle)["rows"]
+                rows.append([(row["student_id"], row["exam_code"], row["provisions"]) for row in batch])
+
+        self.assertEqual(rows[0], rows[1])
+
+
+class BenchmarkIngestCommandTests(TestCase):
+    def test_records_every_stage_and_leaves_no_data(self):
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "baseline.json"
+            call_command(
+                "benchmark_ingest",
+                exams=6,
+                students=4,
+                venues=5,
+                days=2,
+                output=str(output),
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+            compared = StringIO()
+            call_command(
+                "benchmark_ingest",
+                "--provision-mix=extra_time_30_per_hour=1",
+                exams=6,
+                students=4,
+                venues=5,
+                days=2,
+                compare=str(output),
+                stdout=compared,
+            )
+
+        self.assertEqual(report["scale"]["exams"], 6)
+        self.assertEqual(
+            list(report["stages"]),
+            [
+                "parse_venue",
+                "parse_exam",
+                "parse_provisions",
+                "import_venue_days",
+                "import_exam_rows",
+                "import_exam_rows_bulk",
+                "import_exam_rows_incremental",
+                "import_provision_rows",
+                "import_provision_rows_bulk",
+                "ingest_upload_result",
+            ],
+        )
+        exam_stage = report["stages"]["import_exam_rows_bulk"]
+        self.assertEqual(exam_stage["rows"], 6)
+        self.assertGreater(exam_stage["queries"], 0)
+        self.assertGreater(exam_stage["peak_memory_bytes"], 0)
+        self.assertIn("baseline s", compared.getvalue())
+        for model in (Exam, ExamVenue, StudentExam, UploadLog, Venue):
+            self.assertFalse(model.objects.exists(), model.__name__)
@@ -0,0 +1,152 @@
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from timetabling_system import metrics
+from timetabling_system.models import Exam, ExamVenue, Venue, VenueType
+from timetabling_system.services import ingest_upload_result
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(METRICS_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def _scrape(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_workers_are_merged_from_their_files(self):
+        metrics.inc("timetabling_allocation_failures_total", 2)
+        metrics.observe("timetabling_upload_stage_seconds", 0.2, stage="parse", file_type="Exam")
+        metrics.set_gauge("timetabling_upload_rows_per_second", 10, file_type="Exam")
+        metrics.flush()
+        # Another worker: a new series written to its own file.
+        metrics._owner["pid"] = None
+        metrics.inc("timetabling_allocation_failures_total", 3)
+        metrics.observe("timetabling_upload_stage_seconds", 3.0, stage="parse", file_type="Exam")
+        metrics.set_gauge("timetabling_upload_rows_per_second", 25, file_type="Exam")
+
+        text = metrics.render_metrics()
+
+        labels = 'file_type="Exam",stage="parse"'
+        self.assertIn("timetabling_allocation_failures_total 5", text)
+        self.assertIn(f'timetabling_upload_stage_seconds_bucket{{{labels},le="0.1"}} 0', text)
+        self.assertIn(f'timetabling_upload_stage_seconds_bucket{{{labels},le="0.25"}} 1', text)
+        self.assertIn(f'timetabling_upload_stage_seconds_bucket{{{labels},le="5"}} 2', text)
+        self.assertIn(f'timetabling_upload_stage_seconds_bucket{{{labels},le="+Inf"}} 2', text)
+        self.assertIn(f"timetabling_upload_stage_seconds_sum{{{labels}}} 3.2", text)
+        self.assertIn('timetabling_upload_rows_per_second{file_type="Exam"} 25', text)
+
+    def test_exited_workers_are_folded_into_the_archive(self):
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True)
+        dead_pid = int(exited.stdout)
+        counter = metrics._key("timetabling_allocation_failures_total", {})
+        (self.directory / f"{dead_pid}-0000beef.json").write_text(json.dumps({counter: 3}))
+        (self.directory / "exited-workers.json").write_text(json.dumps({counter: 4}))
+        metrics.inc("timetabling_allocation_failures_total", 2)
+
+        self.assertIn("timetabling_allocation_failures_total 9", metrics.render_metrics())
+        self.assertIn("timetabling_allocation_failures_total 9", metrics.render_metrics())
+        self.assertEqual(
+            sorted(path.name for path in self.directory.glob("*.json")),
+            sorted(["exited-workers.json", metrics._owner["file"]]),
+        )
+
+    def test_endpoint_is_limited_to_allowed_addresses_or_token(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 200)  # test client: 127.0.0.1
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.5").status_code, 403)
+
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(
+                self.client.get(url, REMOTE_ADDR="10.0.0.5", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200
+            )
+            self.assertEqual(
+                self.client.get(url, REMOTE_ADDR="10.0.0.5", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403
+            )
+
+    def test_endpoint_reports_requests_uploads_and_placeholders(self):
+        ingest_upload_result(
+            {
+                "status": "ok",
+                "type": "Exam",
+                "rows": [
+                    {
+                        "exam_code": "MET1",
+                        "exam_name": "Metrics",
+                        "exam_date": "2025-07-01",
+                        "exam_start": "09:00",
+                        "exam_length": "2:00",
+                        "exam_type": "Written",
+                        "school": "Engineering",
+                        "main_venue": "Main Hall",
+                    }
+                ],
+            },
+            file_name="exam.xlsx",
+        )
+        ExamVenue.objects.create(
+            exam=Exam.objects.get(course_code="MET1"),
+            venue=None,
+            start_time=timezone.make_aware(datetime(2025, 7, 1, 9, 0)),
+            exam_length=120,
+        )
+        self.client.get(reverse("healthz"))
+
+        text = self._scrape()
+
+        self.assertIn('timetabling_upload_rows_total{file_type="Exam"} 1', text)
+        self.assertIn('timetabling_upload_stage_seconds_count{file_type="Exam",stage="ingest"} 1', text)
+        self.assertIn('timetabling_upload_rows_per_second{file_type="Exam"}', text)
+        self.assertIn("timetabling_placeholder_exam_venues 1", text)
+        self.assertIn(
+            'timetabling_http_request_duration_seconds_count{method="GET",status="200",view="healthz"} 1',
+            text,
+        )
+        self.assertIn("# TYPE timetabling_allocation_failures_total counter", text)
+
+    def test_students_left_on_placeholders_count_as_allocation_failures(self):
+        exam = Exam.objects.create(
+            exam_name="Algorithms",
+            course_code="ALG1",
+            exam_type="Written",
+            no_students=10,
+            exam_school="Engineering",
+            school_contact="",
+        )
+        hall = Venue.objects.create(venue_name="Main Hall", capacity=200, venuetype=VenueType.MAIN_HALL)
+        ExamVenue.objects.create(
+            exam=exam,
+            venue=hall,
+            start_time=timezone.make_aware(datetime(2025, 7, 1, 9, 0)),
+            exam_length=120,
+            core=True,
+        )
+        rows = [
+            {"student_id": f"S{idx}", "student_name": "Student", "exam_code": "ALG1",
+             "provisions": "Separate room on own"}
+            for idx in range(3)
+        ]
+
+        for bulk in (False, True):
+            ingest_upload_result(
+                {"status": "ok", "type": "Provisions", "rows": rows}, file_name="prov.xlsx", bulk=bulk
+            )
+
+        self.assertIn("timetabling_allocation_failures_total 6", metrics.render_metrics())
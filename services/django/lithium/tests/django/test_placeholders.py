@@ -0,0 +1,208 @@
+from datetime import datetime
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from timetabling_system.models import (
+    Exam,
+    ExamVenue,
+    ExamVenueProvisionType,
+    Student,
+    StudentExam,
+    Venue,
+    VenueType,
+)
+from timetabling_system.services import placeholders
+from timetabling_system.services.placeholders import (
+    attach_placeholders_to_venues,
+    placeholder_candidates,
+)
+
+SEPARATE = ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN
+
+
+class PlaceholderAttachTests(TestCase):
+    def setUp(self):
+        self.start = timezone.make_aware(datetime(2025, 8, 20, 9, 0))
+
+    def _placeholder(self, code, students=0):
+        exam = Exam.objects.create(
+            exam_name=code,
+            course_code=code,
+            exam_type="Written",
+            no_students=0,
+            exam_school="Science",
+            school_contact="",
+        )
+        placeholder = ExamVenue.objects.create(
+            exam=exam,
+            venue=None,
+            start_time=self.start,
+            exam_length=90,
+            provision_capabilities=[SEPARATE],
+        )
+        for i in range(students):
+            student = Student.objects.create(student_id=f"{code}-{i}", student_name=code)
+            StudentExam.objects.create(student=student, exam=exam, exam_venue=placeholder)
+        return placeholder
+
+    def _room(self, name, capacity=10):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Venue.objects.create(
+                venue_name=name,
+                capacity=capacity,
+                venuetype=VenueType.SEPARATE_ROOM,
+                provision_capabilities=[SEPARATE],
+            )
+
+    def test_venue_saves_in_one_transaction_share_one_pass(self):
+        self._placeholder("PH1")
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues") as attach:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for i in range(3):
+                        Venue.objects.create(
+                            venue_name=f"Room {i}",
+                            capacity=10,
+                            venuetype=VenueType.SEPARATE_ROOM,
+                        )
+                    Venue.objects.filter(venue_name="Room 0").get().save()
+
+        attach.assert_called_once()
+        self.assertEqual(
+            [venue.venue_name for venue in attach.call_args.args[0]],
+            ["Room 0", "Room 1", "Room 2"],
+        )
+
+    def test_rolled_back_venue_save_is_not_attached(self):
+        placeholder = self._placeholder("PH1")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Venue.objects.create(
+                        venue_name="Ghost Room",
+                        capacity=10,
+                        venuetype=VenueType.SEPARATE_ROOM,
+                        provision_capabilities=[SEPARATE],
+                    )
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        placeholder.refresh_from_db()
+        self.assertIsNone(placeholder.venue)
+
+    def test_venue_saved_after_a_rollback_is_attached_alone(self):
+        self._placeholder("PH1")
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues") as attach:
+            room_b = self._room("Room B")
+            attach.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    try:
+                        with transaction.atomic():
+                            room_b.save()
+                            raise RuntimeError("rollback")
+                    except RuntimeError:
+                        pass
+            attach.assert_not_called()
+
+            self._room("Room A")
+
+        attach.assert_called_once()
+        self.assertEqual([venue.venue_name for venue in attach.call_args.args[0]], ["Room A"])
+
+    def test_attach_error_after_commit_is_logged_not_raised(self):
+        self._placeholder("PH1")
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues", side_effect=RuntimeError("boom")):
+            with self.assertLogs("django", level="ERROR") as logs:
+                self._room("Room A")
+
+        self.assertIn("boom", logs.output[0])
+
+    def test_one_pass_spreads_clashing_placeholders_over_venues(self):
+        first, second = self._placeholder("PH1"), self._placeholder("PH2")
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues"):
+            rooms = [self._room("Room A"), self._room("Room B")]
+
+        with CaptureQueriesContext(connection) as ctx:
+            resolved = attach_placeholders_to_venues(rooms)
+
+        self.assertEqual(resolved, 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.venue_id, second.venue_id), ("Room A", "Room B"))
+        placeholder_scans = [
+            q for q in ctx.captured_queries
+            if 'FROM "timetabling_system_examvenue"' in q["sql"] and '"venue_id" IS NULL' in q["sql"]
+        ]
+        self.assertEqual(len(placeholder_scans), 1)
+
+    def test_placeholder_is_folded_into_exam_row_at_venue(self):
+        placeholder = self._placeholder("PH1", students=2)
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues"):
+            room = self._room("Room A")
+        existing = ExamVenue.objects.create(
+            exam=placeholder.exam, venue=room, start_time=self.start, exam_length=90
+        )
+
+        attach_placeholders_to_venues([room])
+
+        self.assertFalse(ExamVenue.objects.filter(pk=placeholder.pk).exists())
+        self.assertEqual(StudentExam.objects.filter(exam_venue=existing).count(), 2)
+
+    def test_room_too_small_for_placeholder_students_is_skipped(self):
+        placeholder = self._placeholder("PH1", students=3)
+
+        self._room("Tiny Room", capacity=2)
+
+        placeholder.refresh_from_db()
+        self.assertIsNone(placeholder.venue)
+
+    def test_candidates_are_filtered_in_the_database(self):
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues"):
+            room = self._room("Room A")
+        room.availability = ["2025-08-20"]
+        room.save(update_fields=["availability"])
+        viable = self._placeholder("OK")
+        needs_cap = self._placeholder("CAP")
+        needs_cap.provision_capabilities = [SEPARATE, ExamVenueProvisionType.USE_COMPUTER]
+        needs_cap.save()
+        wrong_day = self._placeholder("DAY")
+        wrong_day.start_time = self.start.replace(day=21)
+        wrong_day.save()
+        clashing = self._placeholder("CLASH")
+        clashing.start_time = self.start.replace(hour=14)
+        clashing.save()
+        other = Exam.objects.create(
+            exam_name="Other", course_code="OTHER", exam_type="Written",
+            no_students=0, exam_school="Science", school_contact="",
+        )
+        ExamVenue.objects.create(exam=other, venue=room, start_time=clashing.start_time, exam_length=60)
+
+        candidates = placeholder_candidates([room])
+
+        self.assertEqual(list(candidates.values_list("pk", flat=True)), [viable.pk])
+
+    def test_candidate_days_match_python_check_near_midnight(self):
+        with mock.patch.object(placeholders, "attach_placeholders_to_venues"):
+            room = self._room("Room A")
+        room.availability = ["2025-08-20"]
+        room.save(update_fields=["availability"])
+        late = self._placeholder("LATE")
+        late.start_time = self.start.replace(hour=23, minute=30)
+        late.save()
+        early = self._placeholder("EARLY")
+        early.start_time = self.start.replace(day=21, hour=0, minute=30)
+        early.save()
+
+        # 23:30 UTC on the 20th is already the 21st in London.
+        with timezone.override("Europe/London"):
+            candidates = list(placeholder_candidates([room]))
+
+        self.assertEqual([ev.pk for ev in candidates], [late.pk])
+        self.assertTrue(all(placeholders.venue_is_available(room, ev.start_time) for ev in candidates))
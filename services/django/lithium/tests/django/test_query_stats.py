@@ -0,0 +1,28 @@
+from django.test import TestCase
+
+from timetabling_system.models import Venue
+from timetabling_system.services.query_stats import collect_query_stats, query_shape
+
+
+class QueryStatsTests(TestCase):
+    def test_query_shape_folds_variable_length_parts(self):
+        self.assertEqual(
+            query_shape('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            'SELECT * FROM "t" WHERE "id" IN (%s, ...)',
+        )
+        self.assertEqual(
+            query_shape('INSERT INTO "t" ("a", "b") VALUES (%s, %s), (%s, %s), (%s, %s)'),
+            'INSERT INTO "t" ("a", "b") VALUES (%s, ...), ...',
+        )
+        self.assertEqual(query_shape('SAVEPOINT "s1402_x7"'), 'SAVEPOINT "sN"')
+
+    def test_repeated_shapes_are_counted_together(self):
+        with collect_query_stats() as stats:
+            for names in (["A", "B"], ["A", "B", "C"], ["A", "B", "C", "D"]):
+                list(Venue.objects.filter(venue_name__in=names))
+            Venue.objects.count()
+
+        self.assertEqual(stats.count, 4)
+        top = stats.top_shapes()
+        self.assertEqual([shape["count"] for shape in top], [3, 1])
+        self.assertTrue(top[0]["sql"].startswith("SELECT"))
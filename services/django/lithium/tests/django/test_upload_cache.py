@@ -0,0 +1,77 @@
+import os
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from timetabling_system.services.upload_cache import ParseResultCache, hash_upload, parse_upload
+
+
+class ParseResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def _upload(self, content=b"workbook bytes", name="exam.xlsx"):
+        upload = BytesIO(content)
+        upload.name = name
+        return upload
+
+    def test_hash_upload_rewinds_file(self):
+        upload = self._upload()
+        upload.read(3)
+
+        digest = hash_upload(upload)
+
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(upload.tell(), 0)
+        self.assertEqual(digest, hash_upload(self._upload()))
+        self.assertNotEqual(digest, hash_upload(self._upload(b"other bytes")))
+
+    def test_parse_upload_serves_repeat_from_cache(self):
+        parse = mock.Mock(return_value={"status": "ok", "type": "Exam", "file": "exam.xlsx", "rows": [{"a": 1}]})
+
+        with override_settings(UPLOAD_PARSE_CACHE_DIR=self.directory, UPLOAD_PARSE_CACHE_MAX_BYTES=1 << 20):
+            first = parse_upload(self._upload(), parse, content_hash="abc")
+            second = parse_upload(self._upload(name="renamed.xlsx"), parse, content_hash="abc")
+            forced = parse_upload(self._upload(), parse, content_hash="abc", force=True)
+
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(second["rows"], first["rows"])
+        self.assertEqual(second["file"], "renamed.xlsx")
+        self.assertEqual(forced["file"], "exam.xlsx")
+
+    def test_parse_errors_are_not_cached(self):
+        parse = mock.Mock(return_value={"status": "error", "message": "Missing required columns"})
+
+        with override_settings(UPLOAD_PARSE_CACHE_DIR=self.directory, UPLOAD_PARSE_CACHE_MAX_BYTES=1 << 20):
+            parse_upload(self._upload(), parse, content_hash="abc")
+            parse_upload(self._upload(), parse, content_hash="abc")
+
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        payload = {"status": "ok", "rows": ["x" * 400]}
+        cache = ParseResultCache(self.directory, max_bytes=1200)
+
+        cache.set("a", payload)
+        cache.set("b", payload)
+        os.utime(cache._path("a"), (1, 1))
+        os.utime(cache._path("b"), (2, 2))
+        self.assertIsNotNone(cache.get("a"))  # refreshes "a"
+        cache.set("c", payload)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_zero_size_disables_cache(self):
+        cache = ParseResultCache(self.directory, max_bytes=0)
+
+        cache.set("a", {"status": "ok"})
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(os.listdir(self.directory), [])
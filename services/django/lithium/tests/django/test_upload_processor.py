@@ -1,7 +1,11 @@
 from datetime import datetime
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from timetabling_system.models import (
@@ -16,8 +20,12 @@ from timetabling_system.models import (
     Venue,
     VenueType,
 )
-from timetabling_system.services import ingest_upload_result
-from timetabling_system.services.venue_stats import examvenue_student_counts, core_exam_size
+from timetabling_system.services import ingest_upload_result, upload_processor
+from timetabling_system.services.venue_stats import (
+    core_exam_size,
+    exam_size_report,
+    examvenue_student_counts,
+)
 
 
 class UploadProcessorTests(TestCase):
@@ -121,6 +129,39 @@ class UploadProcessorTests(TestCase):
         self.assertTrue(StudentExam.objects.filter(student=student, exam=exam).exists())
         self.assertEqual(UploadLog.objects.count(), 1)
 
+    def test_ingest_summary_and_log_record_query_stats(self):
+        result = {
+            "status": "ok",
+            "type": "Exam",
+            "rows": [
+                {
+                    "exam_code": f"QRY{idx}",
+                    "exam_name": f"Queries {idx}",
+                    "exam_date": "2025-07-01",
+                    "exam_start": "09:00",
+                    "exam_length": "2:00",
+                    "exam_type": "Written",
+                    "school": "Engineering",
+                    "main_venue": "Main Hall",
+                }
+                for idx in range(3)
+            ],
+        }
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = ingest_upload_result(result, file_name="exam.xlsx", uploaded_by=self.user)
+
+        stats = summary["queries"]
+        # Everything but the UploadLog insert itself.
+        self.assertEqual(stats["count"], len(ctx.captured_queries) - 1)
+        self.assertGreaterEqual(stats["time_ms"], 0)
+        self.assertLessEqual(len(stats["top"]), 5)
+        self.assertEqual(stats["top"][0]["count"], max(shape["count"] for shape in stats["top"]))
+        log = UploadLog.objects.get()
+        self.assertEqual(log.query_count, stats["count"])
+        self.assertEqual(log.query_time_ms, stats["time_ms"])
+        self.assertEqual(log.top_queries, stats["top"])
+
     def test_provision_values_map_to_enum_slugs(self):
         exam = Exam.objects.create(
             exam_name="Discrete Maths",
@@ -424,6 +465,66 @@ class UploadProcessorTests(TestCase):
         self.assertEqual(student_exam.exam_venue.venue, separate_room)
         self.assertNotEqual(student_exam.exam_venue.venue, core_venue)
 
+    def _shared_room_exam(self, *rooms):
+        exam = Exam.objects.create(
+            exam_name="Geography",
+            course_code="GEO1",
+            exam_type="Written",
+            no_students=0,
+            exam_school="Science",
+            school_contact="",
+        )
+        ExamVenue.objects.create(
+            exam=exam,
+            venue=Venue.objects.create(venue_name="Sports Hall", capacity=200, venuetype=VenueType.MAIN_HALL),
+            start_time=timezone.make_aware(datetime(2025, 7, 6, 9, 0)),
+            exam_length=120,
+            core=True,
+        )
+        for name, capacity in rooms:
+            Venue.objects.create(
+                venue_name=name,
+                capacity=capacity,
+                venuetype=VenueType.SEPARATE_ROOM,
+                provision_capabilities=[ExamVenueProvisionType.SEPARATE_ROOM_NOT_ON_OWN],
+            )
+        return exam
+
+    def _ingest_shared_room_students(self, exam, count):
+        rows = [
+            {
+                "student_id": f"SR{i}",
+                "student_name": f"Shared {i}",
+                "exam_code": exam.course_code,
+                "provisions": "Separate room not on own",
+            }
+            for i in range(count)
+        ]
+        ingest_upload_result(
+            {"status": "ok", "type": "Provisions", "rows": rows},
+            file_name="prov.xlsx",
+            uploaded_by=self.user,
+        )
+        return dict(
+            StudentExam.objects.filter(exam=exam)
+            .values_list("exam_venue__venue")
+            .annotate(total=Count("pk"))
+        )
+
+    def test_provision_allocation_does_not_overfill_room(self):
+        exam = self._shared_room_exam(("Side Room", 2))
+
+        seated = self._ingest_shared_room_students(exam, 3)
+
+        self.assertEqual(seated, {"Side Room": 2, None: 1})
+
+    def test_zero_capacity_room_is_not_treated_as_full(self):
+        exam = self._shared_room_exam(("Unsurveyed Room", 0))
+
+        seated = self._ingest_shared_room_students(exam, 3)
+
+        self.assertEqual(seated, {"Unsurveyed Room": 3})
+
     def test_small_extra_time_reuses_core_venue_despite_overlap(self):
         exam = Exam.objects.create(
             exam_name="History",
@@ -532,6 +633,12 @@ class UploadProcessorTests(TestCase):
 
         # Core size should subtract the 10 students in the other venue, but not the 5 in the same venue.
         self.assertEqual(core_exam_size(exam), 90)
+        [report] = exam_size_report([exam])
+        self.assertEqual(report["core_size"], 90)
+        self.assertEqual(
+            {ev["examvenue_id"]: ev["students"] for ev in report["exam_venues"]},
+            {core_ev.pk: 0, alt_ev.pk: 10, small_extra_ev.pk: 5},
+        )
 
     def test_unsupported_file_type_returns_summary(self):
         result = {"status": "ok", "type": "Unknown", "days": []}
@@ -819,13 +926,14 @@ class UploadProcessorTests(TestCase):
         self.assertIsNone(placeholder.venue)
 
         # Add a compatible venue and re-run upload; placeholder should be updated to use it
-        computer_lab = Venue.objects.create(
-            venue_name="Comp Lab 3",
-            capacity=20,
-            venuetype=VenueType.COMPUTER_CLUSTER,
-            is_accessible=True,
-            provision_capabilities=[ExamVenueProvisionType.USE_COMPUTER],
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            computer_lab = Venue.objects.create(
+                venue_name="Comp Lab 3",
+                capacity=20,
+                venuetype=VenueType.COMPUTER_CLUSTER,
+                is_accessible=True,
+                provision_capabilities=[ExamVenueProvisionType.USE_COMPUTER],
+            )
 
         ingest_upload_result(result, file_name="prov.xlsx", uploaded_by=self.user)
         placeholder.refresh_from_db()
@@ -861,14 +969,15 @@ class UploadProcessorTests(TestCase):
         self.assertIsNone(placeholder.venue)
         self.assertEqual(student_exam.exam_venue, placeholder)
 
-        # Create a new compatible venue; signal should attach placeholder automatically
-        computer_lab = Venue.objects.create(
-            venue_name="Comp Lab Auto",
-            capacity=15,
-            venuetype=VenueType.SCHOOL_TO_SORT,
-            is_accessible=True,
-            provision_capabilities=[ExamVenueProvisionType.USE_COMPUTER],
-        )
+        # Create a new compatible venue; signal should attach placeholder once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            computer_lab = Venue.objects.create(
+                venue_name="Comp Lab Auto",
+                capacity=15,
+                venuetype=VenueType.SCHOOL_TO_SORT,
+                is_accessible=True,
+                provision_capabilities=[ExamVenueProvisionType.USE_COMPUTER],
+            )
 
         placeholder.refresh_from_db()
         student_exam.refresh_from_db()
@@ -1291,6 +1400,111 @@ class UploadProcessorTests(TestCase):
         self.assertEqual(ev.start_time, timezone.make_aware(datetime(2025, 8, 15, 9, 15)))
         self.assertEqual(ev.exam_length, 60)
 
+    def _exam_row(self, code, start, venue, **overrides):
+        row = {
+            "exam_code": code,
+            "exam_name": f"Exam {code}",
+            "exam_date": "2025-08-15",
+            "exam_start": start,
+            "exam_length": 60,
+            "exam_type": "Written",
+            "no_students": "20",
+            "school": "Science",
+            "school_contact": "Dr. X",
+            "main_venue": venue,
+        }
+        row.update(overrides)
+        return row
+
+    def test_bulk_exam_import_matches_row_by_row_summary(self):
+        rows = [
+            self._exam_row("B1", "09:00", "Hall A; Hall B"),
+            self._exam_row("B2", "09:30", "Hall A"),  # overlaps B1 in Hall A -> placeholder
+            self._exam_row("B3", "13:00", "Hall A"),
+            self._exam_row("B1", "09:00", "Hall A", exam_name="Renamed"),  # duplicate row updates
+            {"exam_name": "No code"},
+        ]
+        summary = ingest_upload_result(
+            {"status": "ok", "type": "Exam", "rows": rows},
+            file_name="exam.xlsx",
+            uploaded_by=self.user,
+            bulk=True,
+        )
+
+        self.assertEqual(summary["created"], 3)
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(summary["skipped"], 1)
+        self.assertEqual(summary["errors"], ["Row 5: Missing exam_code / course_code."])
+        self.assertEqual(Exam.objects.get(course_code="B1").exam_name, "Renamed")
+        self.assertEqual(
+            set(ExamVenue.objects.filter(exam__course_code="B1").values_list("venue_id", flat=True)),
+            {"Hall A", "Hall B"},
+        )
+        placeholder = ExamVenue.objects.get(exam__course_code="B2")
+        self.assertIsNone(placeholder.venue)
+        self.assertTrue(placeholder.core)
+        self.assertEqual(ExamVenue.objects.get(exam__course_code="B3").venue_id, "Hall A")
+        self.assertEqual(Venue.objects.get(venue_name="Hall B").venuetype, VenueType.SCHOOL_TO_SORT)
+
+        # Re-importing updates in place rather than duplicating links.
+        summary = ingest_upload_result(
+            {"status": "ok", "type": "Exam", "rows": rows[:3]},
+            file_name="exam.xlsx",
+            uploaded_by=self.user,
+            bulk=True,
+        )
+        self.assertEqual(summary["created"], 0)
+        self.assertEqual(summary["updated"], 3)
+        self.assertEqual(ExamVenue.objects.filter(exam__course_code="B1").count(), 2)
+
+    def test_bulk_exam_import_conflict_with_existing_booking_creates_placeholder(self):
+        venue = Venue.objects.create(
+            venue_name="Wolfson 346",
+            capacity=100,
+            venuetype=VenueType.MAIN_HALL,
+        )
+        ExamVenue.objects.create(
+            exam=Exam.objects.create(
+                exam_name="Existing",
+                course_code="EXIST1",
+                exam_type="Written",
+                no_students=0,
+                exam_school="Science",
+                school_contact="",
+            ),
+            venue=venue,
+            start_time=timezone.make_aware(datetime(2025, 8, 15, 9, 0)),
+            exam_length=120,
+            core=True,
+        )
+
+        ingest_upload_result(
+            {"status": "ok", "type": "Exam", "rows": [self._exam_row("NEW1", "09:15", "Wolfson 346")]},
+            file_name="exam.xlsx",
+            uploaded_by=self.user,
+            bulk=True,
+        )
+        ev = ExamVenue.objects.get(exam__course_code="NEW1")
+        self.assertIsNone(ev.venue)
+        self.assertEqual(ev.start_time, timezone.make_aware(datetime(2025, 8, 15, 9, 15)))
+        self.assertEqual(ev.exam_length, 60)
+
+    def test_bulk_exam_import_query_count_does_not_scale_with_rows(self):
+        def run(count):
+            rows = [
+                self._exam_row(f"Q{count}-{i}", f"{9 + i % 8:02d}:00", f"Room {count}-{i}")
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                ingest_upload_result(
+                    {"status": "ok", "type": "Exam", "rows": rows},
+                    file_name="exam.xlsx",
+                    bulk=True,
+                )
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(5), run(40))
+
     def test_placeholder_is_assigned_when_venue_capabilities_updated(self):
         exam = Exam.objects.create(
             exam_name="Late Capability",
@@ -1308,20 +1522,321 @@ class UploadProcessorTests(TestCase):
             provision_capabilities=[ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN],
         )
 
-        venue = Venue.objects.create(
-            venue_name="Late Room",
-            capacity=10,
-            venuetype=VenueType.SEPARATE_ROOM,
-            provision_capabilities=[],
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            venue = Venue.objects.create(
+                venue_name="Late Room",
+                capacity=10,
+                venuetype=VenueType.SEPARATE_ROOM,
+                provision_capabilities=[],
+            )
 
         # Initially not assigned
         placeholder.refresh_from_db()
         self.assertIsNone(placeholder.venue)
 
-        # Update venue to add capability; post_save signal should attach placeholder
+        # Update venue to add capability; post_save signal should attach placeholder on commit
         venue.provision_capabilities = [ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN]
-        venue.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            venue.save()
 
         placeholder.refresh_from_db()
         self.assertEqual(placeholder.venue, venue)
+
+
+class BulkUploadProcessorTests(UploadProcessorTests):
+    """Re-run every ingest scenario above through the bulk importers."""
+
+    def setUp(self):
+        super().setUp()
+        for name in ("_import_exam_rows", "_import_provision_rows"):
+            patcher = mock.patch(
+                f"timetabling_system.services.upload_processor.{name}",
+                getattr(upload_processor, f"{name}_bulk"),
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_bulk_provision_import_query_count_does_not_scale_with_rows(self):
+        exam = Exam.objects.create(
+            exam_name="Statistics",
+            course_code="STA101",
+            exam_type="Written",
+            no_students=0,
+            exam_school="Mathematics",
+            school_contact="",
+        )
+        ExamVenue.objects.create(
+            exam=exam,
+            venue=Venue.objects.create(
+                venue_name="Main Hall",
+                capacity=300,
+                venuetype=VenueType.MAIN_HALL,
+            ),
+            start_time=timezone.make_aware(datetime(2025, 7, 1, 9, 0)),
+            exam_length=120,
+            core=True,
+        )
+
+        def run(prefix, count):
+            rows = [
+                {
+                    "student_id": f"{prefix}{i}",
+                    "student_name": f"Student {i}",
+                    "exam_code": "STA101",
+                    "provisions": "reader",
+                }
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                summary = ingest_upload_result(
+                    {"status": "ok", "type": "Provisions", "rows": rows},
+                    file_name="prov.xlsx",
+                    bulk=True,
+                )
+            self.assertEqual(summary["created"], count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run("A", 5), run("B", 60))
+        self.assertEqual(StudentExam.objects.filter(exam=exam).count(), 65)
+        self.assertEqual(Provisions.objects.filter(exam=exam).count(), 65)
+
+    def test_bulk_provision_import_reads_venue_catalog_once(self):
+        start = timezone.make_aware(datetime(2025, 7, 1, 9, 0))
+        for i in range(3):
+            Venue.objects.create(
+                venue_name=f"Lab {i}",
+                capacity=20,
+                venuetype=VenueType.COMPUTER_CLUSTER,
+                provision_capabilities=[ExamVenueProvisionType.USE_COMPUTER],
+            )
+        rows = []
+        for i in range(6):
+            exam = Exam.objects.create(
+                exam_name=f"Exam {i}",
+                course_code=f"CAT{i}",
+                exam_type="Written",
+                no_students=0,
+                exam_school="Science",
+                school_contact="",
+            )
+            ExamVenue.objects.create(exam=exam, venue=None, start_time=start, exam_length=60, core=True)
+            rows.append(
+                {
+                    "student_id": f"C{i}",
+                    "student_name": f"Student {i}",
+                    "exam_code": exam.course_code,
+                    "provisions": "Use of a computer",
+                }
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            ingest_upload_result(
+                {"status": "ok", "type": "Provisions", "rows": rows},
+                file_name="prov.xlsx",
+                bulk=True,
+            )
+
+        venue_scans = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "timetabling_system_venue"' in q["sql"]
+        ]
+        self.assertEqual(len(venue_scans), 1)
+        # Three labs for six simultaneous exams: the rest fall back to placeholders.
+        booked = StudentExam.objects.filter(exam_venue__venue__isnull=False)
+        self.assertEqual(booked.values("exam_venue__venue").distinct().count(), 3)
+        self.assertEqual(StudentExam.objects.filter(exam_venue__venue__isnull=True).count(), 3)
+
+    def test_bulk_provision_import_gives_scarce_room_to_tightest_student(self):
+        start = timezone.make_aware(datetime(2025, 7, 1, 9, 0))
+        accessible_room = Venue.objects.create(
+            venue_name="Quiet Room A",
+            capacity=5,
+            venuetype=VenueType.SEPARATE_ROOM,
+            provision_capabilities=[
+                ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN,
+                ExamVenueProvisionType.ACCESSIBLE_HALL,
+            ],
+            is_accessible=True,
+        )
+        other_room = Venue.objects.create(
+            venue_name="Quiet Room B",
+            capacity=5,
+            venuetype=VenueType.SEPARATE_ROOM,
+            provision_capabilities=[ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN],
+        )
+        rows = []
+        for code, provisions in (
+            ("SEP1", "Separate room on own"),
+            ("SEP2", "Separate room on own; Accessible hall"),
+        ):
+            exam = Exam.objects.create(
+                exam_name=code,
+                course_code=code,
+                exam_type="Written",
+                no_students=0,
+                exam_school="Science",
+                school_contact="",
+            )
+            ExamVenue.objects.create(exam=exam, venue=None, start_time=start, exam_length=60, core=True)
+            rows.append(
+                {
+                    "student_id": f"S-{code}",
+                    "student_name": code,
+                    "exam_code": code,
+                    "provisions": provisions,
+                }
+            )
+
+        # File order would hand the accessible room to the first student and
+        # leave the second, who can only sit there, on a placeholder.
+        ingest_upload_result(
+            {"status": "ok", "type": "Provisions", "rows": rows},
+            file_name="prov.xlsx",
+            bulk=True,
+        )
+
+        venues = dict(
+            StudentExam.objects.values_list("exam__course_code", "exam_venue__venue")
+        )
+        self.assertEqual(venues, {"SEP1": other_room.pk, "SEP2": accessible_room.pk})
+
+    def test_bulk_provision_import_keeps_group_in_one_room_when_it_fits(self):
+        exam = self._shared_room_exam(("Small Room", 2), ("Large Room", 5))
+
+        seated = self._ingest_shared_room_students(exam, 3)
+
+        self.assertEqual(seated, {"Large Room": 3})
+
+
+class IncrementalExamImportTests(TestCase):
+    _exam_row = UploadProcessorTests._exam_row
+
+    def _ingest(self, rows, **kwargs):
+        return ingest_upload_result(
+            {"status": "ok", "type": "Exam", "rows": rows}, file_name="exam.xlsx", **kwargs
+        )
+
+    def _timetable(self, **changes):
+        rows = {
+            "E1": self._exam_row("E1", "09:00", "Hall A"),
+            "E2": self._exam_row("E2", "11:00", "Hall A"),
+            "E3": self._exam_row("E3", "09:00", "Hall B"),
+        }
+        for code, overrides in changes.items():
+            if overrides is None:
+                rows.pop(code)
+            else:
+                start = overrides.pop("exam_start", rows[code]["exam_start"])
+                venue = overrides.pop("main_venue", rows[code]["main_venue"])
+                rows[code] = self._exam_row(code, start, venue, **overrides)
+        return list(rows.values())
+
+    def _slot(self, code):
+        return list(
+            ExamVenue.objects.filter(exam__course_code=code, core=True)
+            .order_by("pk")
+            .values_list("venue_id", "start_time__hour")
+        )
+
+    def test_identical_timetable_is_a_no_op(self):
+        self._ingest(self._timetable(), bulk=True)
+        before = list(ExamVenue.objects.order_by("pk").values_list("pk", "venue_id", "start_time"))
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = self._ingest(self._timetable(), incremental=True)
+
+        self.assertEqual((summary["created"], summary["updated"]), (0, 0))
+        self.assertEqual(
+            summary["diff"],
+            {"added": [], "changed": [], "moved": [], "missing": [], "removed": [], "unchanged": 3},
+        )
+        self.assertEqual(summary["reallocated"], 0)
+        self.assertEqual(list(ExamVenue.objects.order_by("pk").values_list("pk", "venue_id", "start_time")), before)
+        writes = [q["sql"] for q in ctx.captured_queries if not q["sql"].lstrip().startswith(("SELECT", "SAVEPOINT", "RELEASE"))]
+        self.assertEqual(len(writes), 1, writes)  # the UploadLog row
+
+    def test_only_moved_exam_is_relinked(self):
+        self._ingest(self._timetable(), bulk=True)
+        untouched = list(ExamVenue.objects.filter(exam__course_code__in=["E1", "E3"]).values_list("pk", flat=True))
+
+        summary = self._ingest(
+            self._timetable(E2={"exam_start": "14:00", "main_venue": "Hall C"}, E3={"exam_name": "Renamed"}),
+            incremental=True,
+        )
+
+        self.assertEqual(summary["diff"]["moved"], ["E2"])
+        self.assertEqual(summary["diff"]["changed"], ["E3"])
+        self.assertEqual(summary["updated"], 2)
+        self.assertEqual(self._slot("E2"), [("Hall C", 14)])
+        self.assertEqual(Exam.objects.get(course_code="E3").exam_name, "Renamed")
+        self.assertCountEqual(
+            ExamVenue.objects.filter(exam__course_code__in=["E1", "E3"]).values_list("pk", flat=True), untouched
+        )
+
+    def test_missing_exams_are_reported_but_kept_without_prune(self):
+        self._ingest(self._timetable(), bulk=True)
+
+        summary = self._ingest(self._timetable(E3=None), incremental=True)
+
+        self.assertEqual(summary["diff"]["missing"], ["E3"])
+        self.assertEqual(summary["diff"]["removed"], [])
+        self.assertNotIn("deleted", summary)
+        self.assertTrue(Exam.objects.filter(course_code="E3").exists())
+
+    def test_prune_removes_missing_exams_only_within_uploaded_schools(self):
+        self._ingest(self._timetable(), bulk=True)
+        self._ingest([self._exam_row("H1", "09:00", "Hall Z", school="History")], bulk=True)
+        ingest_upload_result(
+            {"status": "ok", "type": "Provisions", "rows": [{"student_id": "S1", "exam_code": "E3"}]},
+            file_name="p.xlsx",
+            bulk=True,
+        )
+
+        summary = self._ingest(
+            self._timetable(E3=None) + [self._exam_row("E4", "15:00", "Hall B")], incremental=True, prune=True
+        )
+
+        self.assertEqual(summary["diff"]["removed"], ["E3"])
+        self.assertEqual(summary["diff"]["added"], ["E4"])
+        self.assertEqual(summary["created"], 1)
+        self.assertEqual(summary["deleted"], {"Exam": 1, "ExamVenue": 1, "Provisions": 1, "StudentExam": 1})
+        self.assertFalse(Exam.objects.filter(course_code="E3").exists())
+        self.assertTrue(Exam.objects.filter(course_code="H1").exists())
+        self.assertEqual(self._slot("E4"), [("Hall B", 15)])
+
+    def test_prune_never_removes_the_default_school(self):
+        self._ingest([self._exam_row("U1", "09:00", "Hall A", school=None)], bulk=True)
+
+        summary = self._ingest(
+            [self._exam_row("U2", "11:00", "Hall A", school=None)], incremental=True, prune=True
+        )
+
+        self.assertEqual(Exam.objects.get(course_code="U1").exam_school, "Unassigned")
+        self.assertEqual(summary["diff"]["removed"], [])
+        self.assertEqual(summary["diff"]["missing"], [])
+
+    def test_moved_exam_reallocates_provision_students(self):
+        Venue.objects.create(
+            venue_name="Quiet Room",
+            capacity=5,
+            venuetype=VenueType.SEPARATE_ROOM,
+            provision_capabilities=[ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN],
+            is_accessible=True,
+        )
+        self._ingest(self._timetable(), bulk=True)
+        provision_rows = [
+            {"student_id": "S1", "student_name": "Solo", "exam_code": "E1", "provisions": "Separate room on own"},
+            {"student_id": "S2", "student_name": "Solo Too", "exam_code": "E3", "provisions": "Separate room on own"},
+        ]
+        ingest_upload_result({"status": "ok", "type": "Provisions", "rows": provision_rows}, file_name="p.xlsx", bulk=True)
+        untouched = StudentExam.objects.get(student_id="S2").exam_venue_id
+
+        summary = self._ingest(self._timetable(E1={"exam_start": "15:00"}), incremental=True)
+
+        self.assertEqual(summary["diff"]["moved"], ["E1"])
+        self.assertEqual(summary["reallocated"], 1)
+        moved = StudentExam.objects.select_related("exam_venue").get(student_id="S1")
+        self.assertEqual(moved.exam_venue.venue_id, "Quiet Room")
+        self.assertEqual(timezone.localtime(moved.exam_venue.start_time).hour, 15)
+        self.assertEqual(ExamVenue.objects.filter(exam__course_code="E1", core=False).count(), 1)
+        self.assertEqual(StudentExam.objects.get(student_id="S2").exam_venue_id, untouched)
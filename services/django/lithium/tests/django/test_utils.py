@@ -4,6 +4,8 @@ import pandas as pd
  
 from timetabling_system.utils.file_classifier import (
 
+    classify,
+
     detect_exam_file,
 
     detect_provision_file,
@@ -17,7 +19,7 @@ from timetabling_system.utils.excel_parser import (
     parse_excel_file,
     prepare_exam_provision_df,
 )
-from timetabling_system.utils.column_mapper import normalize, map_equivalent_columns
+from timetabling_system.utils.column_mapper import canonical_headers, normalize, map_equivalent_columns
  
  
 class TestFileClassifier(TestCase):
@@ -73,6 +75,54 @@ class TestFileClassifier(TestCase):
 
         assert detect_provision_file(df) is False
 
+    def test_canonical_headers_maps_a_row_in_order(self):
+        row = ["Exam Code", "  Course\nCode ", float("nan"), "Unnamed: 3", "Exam Duration (Hours:Minutes)", "Exam Code"]
+
+        assert canonical_headers(row) == ["exam_code", "exam_code", "", "", "exam_length", "exam_code"]
+        assert canonical_headers(pd.Series(row)) == canonical_headers(row)
+        assert map_equivalent_columns(["Exam Code", "Unnamed: 3", "Colour"]) == {
+            "Exam Code": "exam_code",
+            "Unnamed: 3": "",
+            "Colour": "colour",
+        }
+        assert normalize(" Student  I.D. ") == "student_id"
+
+    def test_classify_returns_reusable_profile(self):
+        exam = classify(pd.DataFrame({"exam_code": [1], "exam_name": ["Test"], "exam_date": ["2025-06-01"]}))
+        assert exam.file_type == "Exam"
+        assert exam.exam_hits == 3
+        assert {"exam_code", "exam_name", "exam_date"} <= exam.canonical_columns
+        assert 0 < exam.confidence <= 1
+
+        venue = classify(pd.DataFrame([["Monday", "Tuesday"], ["2025/07/28", "2025/07/29"], ["Room A", "Room B"]]))
+        assert venue.file_type == "Venue"
+        assert (venue.venue_weekday_hits, venue.venue_date_hits) == (2, 2)
+        assert venue.confidence == 1.0
+
+        unknown = classify(pd.DataFrame({"colour": ["red"]}))
+        assert unknown.file_type is None
+        assert unknown.confidence == 0.0
+
+    def test_parse_excel_file_classifies_each_frame_once(self):
+        from io import BytesIO
+        from unittest.mock import patch
+        from openpyxl import Workbook
+        from timetabling_system.utils import file_classifier
+
+        wb = Workbook()
+        wb.active.append(["Exam Code", "Exam Name", "Exam Date"])
+        wb.active.append(["ABC1", "Maths", "2025-06-01"])
+        buf = BytesIO()
+        wb.save(buf)
+
+        with patch.object(
+            file_classifier, "_canonical_columns", wraps=file_classifier._canonical_columns
+        ) as canonical:
+            result = parse_excel_file(buf)
+
+        assert result["type"] == "Exam"
+        assert canonical.call_count == 1
+
     def test_detect_provision_multiline_headers(self):
         df = pd.DataFrame(
             [
@@ -327,3 +377,218 @@ class TestFileClassifier(TestCase):
         assert "days" in result and len(result["days"]) == 2
 
  
+
+    def test_parse_venue_file_streams_red_font_and_blank_leading_rows(self):
+        from io import BytesIO
+        from openpyxl import Workbook
+        from openpyxl.styles import Font
+        from timetabling_system.utils.venue_parser import parse_venue_file
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append([])
+        ws.append(["Monday", None, "Tuesday"])
+        ws.append(["2025-07-28", "ignored", "2025-07-29"])
+        ws.append(["Room A", "No header", "Room B"])
+        ws.append([None, None, "Room A"])
+        ws.append(["Room C"])
+        ws["C5"].font = Font(color="FFFF0000")
+        buf = BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+
+        result = parse_venue_file(buf)
+
+        assert result["status"] == "ok"
+        assert [(d["day"], d["date"]) for d in result["days"]] == [
+            ("Monday", "2025-07-28"),
+            ("Tuesday", "2025-07-29"),
+        ]
+        assert result["days"][0]["rooms"] == [
+            {"name": "Room A", "accessible": True},
+            {"name": "Room C", "accessible": True},
+        ]
+        assert result["days"][1]["rooms"] == [
+            {"name": "Room B", "accessible": True},
+            {"name": "Room A", "accessible": False},
+        ]
+        assert result["venues"] == [
+            {"name": "Room A", "is_accessible": False},
+            {"name": "Room C", "is_accessible": True},
+            {"name": "Room B", "is_accessible": True},
+        ]
+
+    def test_parse_venue_file_ignores_stale_dimension(self):
+        import re
+        import zipfile
+        from io import BytesIO
+        from openpyxl import Workbook
+        from timetabling_system.utils.venue_parser import parse_venue_file
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Monday"])
+        ws.append(["2025-07-28"])
+        ws.append(["Room A"])
+        ws.append(["Room B"])
+        saved = BytesIO()
+        wb.save(saved)
+        # Some exporters write a <dimension> smaller than the data actually in the sheet.
+        buf = BytesIO()
+        with zipfile.ZipFile(saved) as src, zipfile.ZipFile(buf, "w") as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename == "xl/worksheets/sheet1.xml":
+                    data = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1:A2"', data)
+                dst.writestr(item, data)
+        buf.seek(0)
+
+        result = parse_venue_file(buf)
+
+        assert result["status"] == "ok"
+        assert [room["name"] for room in result["days"][0]["rooms"]] == ["Room A", "Room B"]
+
+    def test_parse_venue_file_without_date_row_is_error(self):
+        from io import BytesIO
+        from openpyxl import Workbook
+        from timetabling_system.utils.venue_parser import parse_venue_file
+
+        wb = Workbook()
+        wb.active.append(["Monday", "Tuesday"])
+        buf = BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+
+        result = parse_venue_file(buf)
+
+        assert result["status"] == "error"
+        assert result["type"] == "Venue"
+
+    def test_workbook_source_dataframe_matches_read_excel(self):
+        from datetime import datetime
+        from io import BytesIO
+        from openpyxl import Workbook
+        from timetabling_system.utils.workbook_source import WorkbookSource
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Course Code", None, "Course Code", "Length", "Start"])
+        ws.append(["ABC1", "x", "dup", 120, datetime(2025, 5, 1, 9, 30)])
+        ws.append([])
+        ws.append(["ABC2", None, None, 90.5, "=1/0"])
+        ws.append(["ABC3", "", "", 60])
+        ws.append([None, None, None, None, None, "trailing"])
+        ws.append([])
+        buf = BytesIO()
+        wb.save(buf)
+
+        buf.seek(0)
+        expected = pd.read_excel(buf)
+        source = WorkbookSource(buf)
+
+        pd.testing.assert_frame_equal(source.dataframe(), expected)
+        assert source.active_rows is source.rows
+
+    def test_coerce_columns_matches_per_value_coercion(self):
+        from datetime import date, datetime, time, timedelta
+        from timetabling_system.services.upload_processor import _coerce_date, _coerce_int, _coerce_time
+        from timetabling_system.utils.column_coercion import coerce_columns
+
+        dates = [
+            "2025-06-01", " 2025-6-1 ", "2025-02-30", "01/06/2025", datetime(2025, 6, 1, 9, 30),
+            date(2025, 6, 2), None, "", float("nan"),
+        ]
+        times = [
+            "09:00", "9:5", "09:30:15", "24:00", "0930", "2025-06-01 09:00", 0.375, 0.5000001,
+            time(13, 0), datetime(2025, 6, 1, 14, 0), None, "  ",
+        ]
+        lengths = [
+            120, 90.5, "02:30", "2:30:00", "2h30m", "2 hours 30 minutes", "90 mins", "1hr", "120",
+            "1.5 hours", "-5", time(2, 15), timedelta(minutes=150, seconds=40), True, None, "",
+        ]
+        width = max(len(dates), len(times), len(lengths))
+        pad = lambda values: values + [None] * (width - len(values))
+        df = pd.DataFrame(
+            {"exam_date": pad(dates), "exam_start": pad(times), "exam_length": pad(lengths), "no_students": pad(lengths)},
+            dtype=object,
+        )
+
+        typed = coerce_columns(df.copy(), "Exam")
+
+        for column, coerce in (
+            ("exam_date", _coerce_date),
+            ("exam_start", _coerce_time),
+            ("exam_length", _coerce_int),
+            ("no_students", _coerce_int),
+        ):
+            for raw, converted in zip(df[column], typed[column]):
+                try:
+                    expected = coerce(raw)
+                except ValueError:
+                    expected = ValueError
+                try:
+                    actual = coerce(converted)
+                except ValueError:
+                    actual = ValueError
+                # A converted cell keeps the per-value result; anything else is left raw.
+                assert actual == expected, (column, raw, converted)
+        assert typed["exam_date"][0] == date(2025, 6, 1)
+        assert typed["exam_start"][6] == time(9, 0)
+        assert typed["exam_start"][9] == datetime(2025, 6, 1, 14, 0)
+        assert typed["exam_length"][5] == 150
+        assert typed["exam_length"][9] == "1.5 hours"
+
+    def test_coerce_columns_reads_excel_serial_dates(self):
+        from datetime import date
+        from timetabling_system.utils.column_coercion import coerce_columns
+
+        df = pd.DataFrame({"exam_date": [45809, 45809.625, 0.5]}, dtype=object)
+
+        typed = coerce_columns(df, "Exam")
+
+        assert list(typed["exam_date"]) == [date(2025, 6, 1), date(2025, 6, 1), 0.5]
+
+    def test_parse_excel_file_returns_typed_exam_rows(self):
+        from datetime import date, time
+        from io import BytesIO
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Exam Code", "Exam Name", "Exam Date", "Exam Start", "Exam Length", "Exam Type", "School", "Main Venue", "Exam Size"])
+        ws.append(["CHEM101", "Chemistry 1", "2025-06-01", "09:00", "2h", "On Campus", "Chemistry", "Main Hall", "10"])
+        buf = BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+
+        row = parse_excel_file(buf)["rows"][0]
+
+        assert row["exam_date"] == date(2025, 6, 1)
+        assert row["exam_start"] == time(9, 0)
+        assert row["exam_length"] == 120
+        assert row["no_students"] == 10
+
+    def test_row_batch_matches_to_dict_records(self):
+        import json
+        import pickle
+        from rest_framework.utils.encoders import JSONEncoder
+        from timetabling_system.utils.row_batch import RowBatch
+
+        df = pd.DataFrame(
+            [["A1", 1, None, "x"], ["A2", 2.5, "y", "z"], ["A3", 3, None, None]],
+            columns=["exam_code", "no_students", "notes", "notes"],
+            dtype=object,
+        )
+        with self.assertWarns(UserWarning):
+            expected = df.to_dict(orient="records")
+
+        batch = RowBatch.from_dataframe(df)
+
+        assert len(batch) == 3
+        assert list(batch) == expected
+        assert batch[-1] == expected[-1]
+        assert list(batch[1:]) == expected[1:]
+        assert [len(chunk) for chunk in batch.chunks(2)] == [2, 1]
+        assert list(batch.project(["exam_code", "missing"])) == [{"exam_code": code} for code in ("A1", "A2", "A3")]
+        assert list(pickle.loads(pickle.dumps(batch))) == expected
+        assert json.loads(json.dumps({"rows": batch}, cls=JSONEncoder))["rows"] == expected
@@ -0,0 +1,204 @@
+import random
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from timetabling_system.models import Exam, ExamVenue, Venue, VenueType
+from timetabling_system.services.allocation import AllocationContext
+from timetabling_system.services.venue_matching import (
+    VenueBookingIndex,
+    bookings_have_timing_conflict,
+    venue_has_timing_conflict,
+)
+
+
+class VenueBookingIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.day = timezone.make_aware(datetime(2025, 8, 1, 9, 0))
+
+    def _booking(self, exam_id, start_minutes, length, pk=None):
+        start = self.day + timedelta(minutes=start_minutes) if start_minutes is not None else None
+        return ExamVenue(examvenue_id=pk, exam_id=exam_id, start_time=start, exam_length=length)
+
+    def test_overlap_rules_match_linear_scan(self):
+        rng = random.Random(4)
+        starts = [None] + list(range(0, 600, 15))
+        lengths = [None, 30, 60, 90, 120, 180]
+        bookings = [
+            self._booking(rng.randint(1, 6), rng.choice(starts), rng.choice(lengths))
+            for _ in range(80)
+        ]
+        index = VenueBookingIndex(bookings)
+
+        for _ in range(400):
+            start = self.day + timedelta(minutes=rng.randrange(-60, 660, 5))
+            length = rng.choice([None, 15, 60, 120, 240])
+            ignore = rng.choice([None, 1, 2, 3])
+            allow = rng.random() < 0.3
+            self.assertEqual(
+                index.has_conflict(start, length, ignore_exam_id=ignore, allow_same_exam_overlap=allow),
+                bookings_have_timing_conflict(
+                    bookings, start, length, ignore_exam_id=ignore, allow_same_exam_overlap=allow
+                ),
+            )
+
+    def test_adds_and_discards_keep_matching_linear_scan(self):
+        rng = random.Random(9)
+        starts = list(range(0, 600, 15))
+        lengths = [30, 60, 90, 240, 480]
+        booked = [self._booking(1, rng.choice(starts), rng.choice(lengths)) for _ in range(40)]
+        index = VenueBookingIndex(booked)
+
+        for _ in range(300):
+            if booked and rng.random() < 0.5:
+                removed = booked.pop(rng.randrange(len(booked)))
+                index.discard(removed)
+            else:
+                added = self._booking(1, rng.choice(starts), rng.choice(lengths))
+                booked.append(added)
+                index.add(added)
+            start = self.day + timedelta(minutes=rng.randrange(-60, 660, 5))
+            length = rng.choice([15, 60, 120])
+            self.assertEqual(len(index), len(booked))
+            self.assertEqual(
+                index.has_conflict(start, length), bookings_have_timing_conflict(booked, start, length)
+            )
+
+    def test_touching_slots_do_not_conflict(self):
+        index = VenueBookingIndex([self._booking(1, 0, 120)])
+
+        self.assertFalse(index.has_conflict(self.day + timedelta(minutes=120), 60))
+        self.assertFalse(index.has_conflict(self.day - timedelta(minutes=60), 60))
+        self.assertTrue(index.has_conflict(self.day + timedelta(minutes=119), 60))
+
+    def test_same_exam_exact_slot_is_reusable(self):
+        index = VenueBookingIndex([self._booking(7, 0, 120)])
+
+        self.assertFalse(index.has_conflict(self.day, 120, ignore_exam_id=7))
+        self.assertTrue(index.has_conflict(self.day, 150, ignore_exam_id=7))
+        self.assertFalse(index.has_conflict(self.day, 150, ignore_exam_id=7, allow_same_exam_overlap=True))
+
+    def test_discard_and_readd_after_retiming(self):
+        long_booking = self._booking(1, 0, 600, pk=10)
+        index = VenueBookingIndex([long_booking, self._booking(2, 30, 30, pk=11)])
+        self.assertTrue(index.has_conflict(self.day + timedelta(minutes=300), 30))
+
+        index.discard(long_booking)
+        long_booking.exam_length = 60
+        index.add(long_booking)
+
+        self.assertEqual(len(index), 2)
+        self.assertFalse(index.has_conflict(self.day + timedelta(minutes=300), 30))
+
+    def test_discard_matches_reloaded_row_by_pk(self):
+        index = VenueBookingIndex([self._booking(1, 0, 60, pk=5)])
+
+        index.discard(self._booking(1, 0, 60, pk=5))
+
+        self.assertEqual(len(index), 0)
+        self.assertFalse(index.has_conflict(self.day, 60))
+
+
+class AllocationContextSeatTests(SimpleTestCase):
+    def setUp(self):
+        self.day = timezone.make_aware(datetime(2025, 8, 1, 9, 0))
+
+    def _context(self, capacity, bookings, venuetype=VenueType.SEPARATE_ROOM):
+        venue = Venue(venue_name="Room", capacity=capacity, venuetype=venuetype)
+        exam_venues = []
+        for pk, (exam_id, start_minutes, length, seated, core) in enumerate(bookings, start=1):
+            exam_venue = ExamVenue(
+                examvenue_id=pk,
+                exam_id=exam_id,
+                venue=venue,
+                start_time=self.day + timedelta(minutes=start_minutes),
+                exam_length=length,
+                core=core,
+            )
+            exam_venue.seated = seated
+            exam_venues.append(exam_venue)
+        return AllocationContext([venue], exam_venues), venue
+
+    def test_free_seats_counts_peak_not_sum_of_overlaps(self):
+        context, venue = self._context(5, [(1, 0, 60, 2, False), (2, 60, 60, 3, False)])
+
+        self.assertEqual(context.free_seats(venue, self.day, 120, exam_id=3), 2)
+        self.assertEqual(context.free_seats(venue, self.day, 30, exam_id=3), 3)
+        self.assertEqual(context.free_seats(venue, self.day + timedelta(minutes=120), 60), 5)
+
+    def test_seat_and_unseat_update_the_ledger(self):
+        context, venue = self._context(4, [(1, 0, 60, 3, False)])
+        added = ExamVenue(exam_id=1, venue=venue, start_time=self.day, exam_length=60)
+        context.book(added)
+
+        context.seat(added)
+        self.assertEqual(context.free_seats(venue, self.day, 60), 0)
+        context.unseat(1, 2)
+        self.assertEqual(context.free_seats(venue, self.day, 60), 2)
+
+    def test_unknown_capacity_and_own_core_sitting_are_unlimited(self):
+        context, venue = self._context(0, [(1, 0, 60, 9, False)])
+        self.assertIsNone(context.free_seats(venue, self.day, 60))
+
+        context, venue = self._context(5, [(1, 0, 60, 9, False)], VenueType.SCHOOL_TO_SORT)
+        self.assertIsNone(context.free_seats(venue, self.day, 60))
+
+        context, venue = self._context(5, [(1, 0, 60, 5, True)])
+        self.assertIsNone(context.free_seats(venue, self.day, 60, exam_id=1))
+        self.assertEqual(context.free_seats(venue, self.day + timedelta(minutes=60), 60, exam_id=1), 5)
+
+
+class VenueSlotQueryTests(TestCase):
+    def test_slot_overlap_query_matches_python_rules(self):
+        rng = random.Random(11)
+        day = timezone.make_aware(datetime(2025, 8, 1, 9, 0))
+        venue = Venue.objects.create(venue_name="Hall", capacity=50, venuetype="main_hall")
+        exams = [
+            Exam.objects.create(
+                exam_name=f"E{idx}",
+                course_code=f"E{idx}",
+                exam_type="Written",
+                no_students=1,
+                exam_school="S",
+                school_contact="",
+            )
+            for idx in range(4)
+        ]
+        for _ in range(30):
+            start_minutes = rng.choice([None] + list(range(0, 600, 15)))
+            ExamVenue.objects.create(
+                exam=rng.choice(exams),
+                venue=venue,
+                start_time=day + timedelta(minutes=start_minutes) if start_minutes is not None else None,
+                exam_length=rng.choice([None, 30, 60, 120]),
+            )
+        bookings = list(venue.examvenue_set.all())
+
+        for _ in range(150):
+            start = day + timedelta(minutes=rng.randrange(-60, 660, 15))
+            length = rng.choice([None, 15, 60, 120])
+            ignore = rng.choice([None] + [exam.pk for exam in exams])
+            allow = rng.random() < 0.3
+            self.assertEqual(
+                venue_has_timing_conflict(
+                    venue, start, length, ignore_exam_id=ignore, allow_same_exam_overlap=allow
+                ),
+                bookings_have_timing_conflict(
+                    bookings, start, length, ignore_exam_id=ignore, allow_same_exam_overlap=allow
+                ),
+            )
+
+    def test_slot_column_is_null_without_timing(self):
+        venue = Venue.objects.create(venue_name="Hall", capacity=50, venuetype="main_hall")
+        exam = Exam.objects.create(
+            exam_name="E", course_code="E1", exam_type="Written", no_students=1, exam_school="S", school_contact=""
+        )
+        start = timezone.make_aware(datetime(2025, 8, 1, 9, 0))
+        timed = ExamVenue.objects.create(exam=exam, venue=venue, start_time=start, exam_length=90)
+        untimed = ExamVenue.objects.create(exam=exam, venue=venue, start_time=start)
+
+        timed.refresh_from_db()
+        untimed.refresh_from_db()
+        self.assertEqual((timed.slot.lower, timed.slot.upper), (start, start + timedelta(minutes=90)))
+        self.assertIsNone(untimed.slot)
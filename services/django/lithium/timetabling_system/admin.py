@@ -10,6 +10,7 @@ from .models import (
     StudentExam,
     Provisions,
     UploadLog,
+    UploadJob,
     ProvisionType,
     ExamVenueProvisionType,
 )
@@ -97,5 +98,25 @@ class ProvisionsAdmin(admin.ModelAdmin):
 
 @admin.register(UploadLog)
 class UploadLogAdmin(admin.ModelAdmin):
-    list_display = ("file_name", "uploaded_by", "uploaded_at", "records_created", "records_updated")
+    list_display = (
+        "file_name",
+        "uploaded_by",
+        "uploaded_at",
+        "records_created",
+        "records_updated",
+        "records_skipped",
+        "query_count",
+        "query_time_ms",
+    )
+    search_fields = ("file_name", "content_hash")
+    readonly_fields = ("query_count", "query_time_ms", "top_queries", "has_profile")
     ordering = ("-uploaded_at",)
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ("file_name", "status", "uploaded_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    exclude = ("file_content",)
+    readonly_fields = ("progress", "summary", "error", "attempts", "created_at", "started_at", "finished_at")
+    ordering = ("-created_at",)
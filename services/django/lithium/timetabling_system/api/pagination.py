@@ -0,0 +1,28 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the primary key, only when the client asks for it.
+
+    Existing clients fetch whole lists and keep getting a bare array; passing
+    ?page_size=N (or following a returned ?cursor=) switches to pages of
+    {"next", "previous", "results"} that stay stable while rows are added.
+    """
+    page_size = 200
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ExamCursorPagination(OptInCursorPagination):
+    ordering = "exam_id"
+
+
+class VenueCursorPagination(OptInCursorPagination):
+    ordering = "venue_name"
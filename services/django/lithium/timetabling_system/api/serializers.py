@@ -1,5 +1,42 @@
 from rest_framework import serializers
-from timetabling_system.models import Exam, ExamVenue, Venue
+from timetabling_system.models import Exam, ExamVenue, UploadJob, Venue
+
+
+def _param_list(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Lets list/detail requests choose which fields come back.
+
+    ?fields=a,b keeps only those fields. The nested relation lists in
+    expandable_fields are included by default; once ?expand= is given only
+    the ones it names are kept (so ?expand= alone drops them all).
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+        selected = self.selected_fields(request.query_params)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, query_params):
+        """Names of the fields a request with these query params will render."""
+        selected = set(cls.Meta.fields)
+        if "fields" in query_params:
+            selected &= _param_list(query_params["fields"])
+        if "expand" in query_params:
+            expand = _param_list(query_params["expand"])
+            selected -= set(cls.expandable_fields) - expand
+            selected |= set(cls.expandable_fields) & expand
+        return selected
 
 
 class ExamVenueSerializer(serializers.ModelSerializer):
@@ -23,7 +60,9 @@ class ExamVenueSerializer(serializers.ModelSerializer):
         return obj.venue.venue_name if obj.venue else None
 
 
-class ExamSerializer(serializers.ModelSerializer):
+class ExamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = ("venues", "exam_venues")
+
     venues = serializers.SerializerMethodField()
     exam_venues = ExamVenueSerializer(source="examvenue_set", many=True, read_only=True)
 
@@ -48,7 +87,9 @@ class ExamSerializer(serializers.ModelSerializer):
         return [ev.venue.venue_name for ev in exam_venues if ev.venue]
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = ("exams", "exam_venues")
+
     exams = serializers.SerializerMethodField()
     exam_venues = ExamVenueSerializer(source="examvenue_set", many=True, read_only=True)
 
@@ -71,3 +112,21 @@ class VenueSerializer(serializers.ModelSerializer):
         exam_venues = getattr(obj, "_prefetched_objects_cache", {}).get("examvenue_set")
         if exam_venues is None: exam_venues = obj.examvenue_set.select_related("exam").all()
         return [ev.exam.exam_name for ev in exam_venues]
+
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.IntegerField(source="pk", read_only=True)
+
+    class Meta:
+        model = UploadJob
+        fields = (
+            "job_id",
+            "file_name",
+            "status",
+            "progress",
+            "summary",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
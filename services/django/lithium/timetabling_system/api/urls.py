@@ -3,7 +3,14 @@ from rest_framework.routers import DefaultRouter
 
 from timetabling_system.views import upload_timetable_file
 
-from .views import ExamViewSet, TimetableUploadView, VenueViewSet
+from .views import (
+    ExamSizeReportView,
+    ExamViewSet,
+    TimetableUploadView,
+    UploadJobView,
+    UploadProfileView,
+    VenueViewSet,
+)
 
 router = DefaultRouter()
 router.register("exams", ExamViewSet, basename="exam")
@@ -11,6 +18,9 @@ router.register("venues", VenueViewSet, basename="venue")
 
 urlpatterns = [
     path("exams-upload", TimetableUploadView.as_view(), name="api-exam-upload"),
+    path("upload-jobs/<int:pk>", UploadJobView.as_view(), name="api-upload-job"),
+    path("exam-sizes", ExamSizeReportView.as_view(), name="api-exam-sizes"),
+    path("upload-logs/<int:pk>/profile", UploadProfileView.as_view(), name="api-upload-profile"),
 ]
 
 urlpatterns += router.urls
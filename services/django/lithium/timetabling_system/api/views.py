@@ -1,26 +1,195 @@
-from rest_framework import status, viewsets
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date, quote_etag
+from rest_framework import generics, status, viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from timetabling_system.models import Exam, Venue
+from timetabling_system.models import Exam, ExamVenue, UploadJob, UploadLog
 from timetabling_system.services import ingest_upload_result
+from timetabling_system.services.data_version import TIMETABLE_DATA, get_data_version
+from timetabling_system.services.upload_cache import (
+    find_duplicate_upload,
+    hash_upload,
+    is_force_request,
+    parse_upload,
+    unchanged_result,
+)
+from timetabling_system.services.upload_jobs import enqueue_upload, is_async_request
+from timetabling_system.services.upload_profiling import PROFILE_KINDS, profile_path, upload_profile
+from timetabling_system.services.upload_processor import is_incremental_request, is_prune_request
+from timetabling_system.services.venue_stats import exam_size_report
 from timetabling_system.utils.excel_parser import parse_excel_file
 from timetabling_system.utils.venue_ingest import upsert_venues
-from .serializers import ExamSerializer, VenueSerializer
+from .pagination import ExamCursorPagination, VenueCursorPagination
+from .serializers import ExamSerializer, UploadJobSerializer, VenueSerializer
 
 
-class ExamViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Exam.objects.all().prefetch_related("examvenue_set__venue")
+def _sparse_queryset(serializer_class, query_params, exam_venues, nested_columns=()):
+    """
+    Queryset loading only the columns the requested fields render, and the
+    ExamVenue rows only when one of the nested relation fields was requested.
+    nested_columns are parent columns the nested serializers read back.
+    """
+    model = serializer_class.Meta.model
+    selected = serializer_class.selected_fields(query_params)
+    columns = {f.name for f in model._meta.concrete_fields if f.name in selected}
+    if selected & set(serializer_class.expandable_fields):
+        columns.update(nested_columns)
+        queryset = model.objects.prefetch_related(Prefetch("examvenue_set", queryset=exam_venues))
+    else:
+        queryset = model.objects.all()
+    return queryset.only(model._meta.pk.name, *sorted(columns))
+
+
+class DataVersionConditionalMixin:
+    """
+    ETag / Last-Modified for read-only viewsets, taken from the timetable
+    data version. A matching If-None-Match or If-Modified-Since gets a 304
+    after a single version lookup, without querying or serializing rows.
+    """
+    data_version_name = TIMETABLE_DATA
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        # Read the version before the rows: a change landing mid-request
+        # then leaves the client with a stale tag, never a stale body.
+        version, updated_at = get_data_version(self.data_version_name)
+        etag = quote_etag(f"{self.data_version_name}-{version}")
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class ExamViewSet(DataVersionConditionalMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Exams with their venue bookings. Supports ?page_size=/?cursor= paging,
+    ?fields=/?expand= to trim the response (see SparseFieldsMixin) and
+    conditional GETs.
+    """
     serializer_class = ExamSerializer
+    pagination_class = ExamCursorPagination
 
+    def get_queryset(self):
+        return _sparse_queryset(
+            ExamSerializer,
+            self.request.query_params,
+            ExamVenue.objects.select_related("venue"),
+            nested_columns=("exam_name",),
+        )
 
-class VenueViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Venue.objects.all().prefetch_related("examvenue_set__exam")
+
+class VenueViewSet(DataVersionConditionalMixin, viewsets.ReadOnlyModelViewSet):
+    """Venues with their exam bookings; same paging, field and caching options as exams."""
     serializer_class = VenueSerializer
+    pagination_class = VenueCursorPagination
+
+    def get_queryset(self):
+        return _sparse_queryset(
+            VenueSerializer,
+            self.request.query_params,
+            ExamVenue.objects.select_related("exam"),
+        )
+
+
+class ExamSizeReportView(DataVersionConditionalMixin, generics.ListAPIView):
+    """
+    Core exam size and per-venue student counts for a page of exams, in two
+    queries. Filter with ?school= and/or ?date_from=/?date_to= (YYYY-MM-DD,
+    matching exams with any booking on those days); paging as for exams.
+    """
+    pagination_class = ExamCursorPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        exams = Exam.objects.only("exam_id", "course_code", "exam_name", "exam_school", "no_students")
+        school = params.get("school")
+        if school:
+            exams = exams.filter(exam_school=school)
+        bookings = ExamVenue.objects.filter(exam=OuterRef("pk"))
+        date_from, date_to = self._date_param("date_from"), self._date_param("date_to")
+        if date_from:
+            bookings = bookings.filter(start_time__date__gte=date_from)
+        if date_to:
+            bookings = bookings.filter(start_time__date__lte=date_to)
+        if date_from or date_to:
+            exams = exams.filter(Exists(bookings))
+        return exams.order_by("exam_id")
+
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Expected a date as YYYY-MM-DD."})
+        return parsed
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self._list, request, *args, **kwargs)
+
+    def _list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(exam_size_report(page))
+        return Response(exam_size_report(queryset))
+
+
+class UploadJobView(generics.RetrieveAPIView):
+    """Status, per-stage progress and final summary of a queued upload."""
+    queryset = UploadJob.objects.defer("file_content")
+    serializer_class = UploadJobSerializer
+
+
+class UploadProfileView(APIView):
+    """Staff download of a ?profile=1 upload's output: ?kind=pstats (default) or ?kind=collapsed."""
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, pk):
+        kind = request.query_params.get("kind") or "pstats"
+        if kind not in PROFILE_KINDS:
+            return Response(
+                {"status": "error", "message": f"kind must be one of {', '.join(PROFILE_KINDS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        path = profile_path(pk, kind)
+        if not UploadLog.objects.filter(pk=pk, has_profile=True).exists() or not path.exists():
+            raise Http404("No profile recorded for this upload.")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
 
 
 class TimetableUploadView(APIView):
-    """Accepts an uploaded Excel file and routes it through the parser helpers."""
+    """
+    Accepts an uploaded Excel file and routes it through the parser helpers.
+    With ?async=1 the file is queued instead and a job id is returned (202).
+    Re-uploads of an already imported file short-circuit unless ?force=1;
+    ?incremental=1 applies an exam timetable as a diff against current state,
+    and ?prune=1 alongside it deletes the uploaded schools' exams the file no
+    longer lists.
+    Staff can add ?profile=1 to profile the parse and import; the response
+    then links to the saved profile (see UploadProfileView).
+    """
     parser_classes = (MultiPartParser, FormParser)
 
 
@@ -33,31 +202,58 @@ class TimetableUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if hasattr(upload, "seek"):
-            upload.seek(0)
-                    
-        try:
-            result = parse_excel_file(upload)
-        except Exception as exc:  # pragma: no cover - defensive fallback
+        force = is_force_request(request)
+        incremental = is_incremental_request(request)
+        prune = incremental and is_prune_request(request)
+        if is_async_request(request):
+            job = enqueue_upload(
+                upload, uploaded_by=request.user, force=force, incremental=incremental, prune=prune
+            )
             return Response(
                 {
-                    "status": "error",
-                    "message": "Failed to parse uploaded file.",
-                    "details": str(exc),
+                    "status": job.status,
+                    "job_id": job.pk,
+                    "status_url": reverse("api-upload-job", args=[job.pk]),
                 },
-                status=status.HTTP_400_BAD_REQUEST,
+                status=status.HTTP_202_ACCEPTED,
             )
 
-        if result.get("status") == "ok":
-            ingest_summary = ingest_upload_result(
-                result,
-                file_name=getattr(upload, "name", "uploaded_file"),
-                uploaded_by=request.user,
-            )
-            if ingest_summary:
-                result["ingest"] = ingest_summary
-                result["records_created"] = ingest_summary.get("created", 0)
-                result["records_updated"] = ingest_summary.get("updated", 0)
+        file_name = getattr(upload, "name", "uploaded_file")
+        content_hash = hash_upload(upload)
+        duplicate = None if force or prune else find_duplicate_upload(content_hash)
+        if duplicate:
+            return Response(unchanged_result(duplicate, file_name=file_name), status=status.HTTP_200_OK)
+
+        ingest_summary = None
+        with upload_profile(request) as profile:
+            try:
+                result = parse_upload(upload, parse_excel_file, content_hash=content_hash, force=force)
+            except Exception as exc:  # pragma: no cover - defensive fallback
+                return Response(
+                    {
+                        "status": "error",
+                        "message": "Failed to parse uploaded file.",
+                        "details": str(exc),
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if result.get("status") == "ok":
+                ingest_summary = ingest_upload_result(
+                    result,
+                    file_name=file_name,
+                    uploaded_by=request.user,
+                    bulk=True,
+                    incremental=incremental,
+                    prune=prune,
+                    content_hash=content_hash,
+                )
+                if ingest_summary:
+                    result["ingest"] = ingest_summary
+                    result["records_created"] = ingest_summary.get("created", 0)
+                    result["records_updated"] = ingest_summary.get("updated", 0)
+        if profile:
+            result["profile"] = profile.save((ingest_summary or {}).get("upload_log_id"))
 
         http_status = (
             status.HTTP_200_OK if result.get("status") == "ok" else status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,103 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from timetabling_system.models import ProvisionType
+from timetabling_system.services.ingest_benchmark import (
+    benchmark_report,
+    compare_benchmarks,
+    run_ingest_benchmark,
+)
+from timetabling_system.utils.exam_period_generator import generate_exam_period
+
+
+def _provision_mix(value):
+    """Parse "extra_time_30_per_hour=2,use_computer=1" into {ProvisionType: weight}."""
+    mix = {}
+    for part in filter(None, (item.strip() for item in value.split(","))):
+        name, _, weight = part.partition("=")
+        try:
+            mix[ProvisionType(name.strip())] = float(weight or 1)
+        except ValueError:
+            raise CommandError(f"Bad provision mix entry {part!r}; use <provision_type>=<weight>.")
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic exam period and time parsing, each importer and the full "
+        "ingest on it. Everything written to the database is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exams", type=int, default=200)
+        parser.add_argument("--students", type=int, default=400, help="Students on the provision report.")
+        parser.add_argument("--venues", type=int, default=40)
+        parser.add_argument("--days", type=int, default=10, help="Weekdays in the exam period.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--provision-mix",
+            type=_provision_mix,
+            default=None,
+            help="Comma-separated <provision_type>=<weight> pairs (default: a typical mix).",
+        )
+        parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the fastest is kept.")
+        parser.add_argument("--workbooks", help="Keep the generated workbooks in this directory.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Baseline JSON from an earlier run to compare against.")
+        parser.add_argument(
+            "--generate-only",
+            action="store_true",
+            help="Only write the workbooks (requires --workbooks).",
+        )
+
+    def handle(self, *args, **options):
+        if options["generate_only"] and not options["workbooks"]:
+            raise CommandError("--generate-only needs --workbooks to say where to write them.")
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(Path(options["compare"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read baseline {options['compare']}: {exc}")
+
+        scale = {
+            key: options[key] for key in ("exams", "students", "venues", "days", "seed")
+        }
+        with tempfile.TemporaryDirectory() as scratch:
+            paths = generate_exam_period(
+                options["workbooks"] or scratch, provision_mix=options["provision_mix"], **scale
+            )
+            if options["generate_only"]:
+                for file_type in ("Venue", "Exam", "Provisions"):
+                    self.stdout.write(f"{file_type}: {paths[file_type]} ({paths['rows'][file_type]} rows)")
+                return
+            stages = run_ingest_benchmark(paths, repeat=options["repeat"])
+
+        report = benchmark_report(stages, scale, options["repeat"])
+        self._print(report, baseline)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _print(self, report, baseline):
+        self.stdout.write(
+            f"{'stage':<30}{'rows':>8}{'seconds':>10}{'rows/s':>11}{'queries':>9}{'peak MiB':>10}"
+        )
+        for name, stage in report["stages"].items():
+            self.stdout.write(
+                f"{name:<30}{stage['rows']:>8}{stage['seconds']:>10.3f}"
+                f"{stage['rows_per_sec'] or 0:>11.1f}{stage['queries']:>9}"
+                f"{stage['peak_memory_bytes'] / 2**20:>10.1f}"
+            )
+        if baseline is None:
+            return
+        self.stdout.write("")
+        self.stdout.write(f"{'stage':<30}{'baseline s':>12}{'now s':>10}{'change':>9}{'queries':>14}")
+        for row in compare_benchmarks(report, baseline):
+            before = "-" if row["baseline_seconds"] is None else f"{row['baseline_seconds']:.3f}"
+            change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+            queries = f"{row['baseline_queries'] if row['baseline_queries'] is not None else '-'}->{row['queries']}"
+            self.stdout.write(f"{row['stage']:<30}{before:>12}{row['seconds']:>10.3f}{change:>9}{queries:>14}")
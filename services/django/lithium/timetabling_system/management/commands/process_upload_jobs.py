@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from timetabling_system.services.upload_jobs import claim_next_job, run_upload_job
+
+
+class Command(BaseCommand):
+    help = "Run queued timetable uploads (start alongside the web workers)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # A long-lived worker never goes through request_started/finished,
+            # so drop connections past CONN_MAX_AGE or broken by a DB restart here.
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            run_upload_job(job)
+            self.stdout.write(f"Upload job {job.pk} ({job.file_name}): {job.status}")
@@ -0,0 +1,290 @@
+"""
+In-process metrics with a Prometheus text endpoint (see views.metrics_view).
+
+Each worker process keeps its own counters, histograms and gauges in memory
+and writes them to its own JSON file in settings.METRICS_DIR, at most once
+every METRICS_FLUSH_INTERVAL seconds and whenever it serves /metrics.
+Rendering merges every file in the directory, so any worker reports the
+totals for all of them. Each scrape first folds the files of workers that
+have exited into one archive file (see prune_exited_workers), so counters
+never go backwards while the directory only holds a file per live worker.
+Workers are told apart by pid, so every host or container needs its own
+METRICS_DIR.
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+# Seconds between writes of a worker's metrics file.
+METRICS_FLUSH_INTERVAL = 1.0
+# Totals of workers that have exited, folded in by prune_exited_workers().
+ARCHIVE_FILE = "exited-workers.json"
+# Temp files older than this (seconds) were left by a worker killed mid-write.
+STALE_TEMP_SECONDS = 60
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "timetabling_upload_stage_seconds": (
+        "histogram",
+        "Time spent in each upload stage (read, classify, parse, ingest, allocate).",
+        STAGE_BUCKETS,
+    ),
+    "timetabling_upload_rows_total": ("counter", "Rows imported, by file type.", None),
+    "timetabling_upload_rows_per_second": (
+        "gauge",
+        "Import throughput of the most recent upload, by file type.",
+        None,
+    ),
+    "timetabling_allocation_failures_total": (
+        "counter",
+        "Provision students left on a placeholder because no venue could take them.",
+        None,
+    ),
+    "timetabling_http_request_duration_seconds": (
+        "histogram",
+        "Request latency by view, method and status.",
+        REQUEST_BUCKETS,
+    ),
+}
+
+_lock = threading.Lock()
+_state: Dict[str, dict] = {}
+_owner = {"pid": None, "file": None, "flushed": 0.0, "dirty": False}
+
+
+def _key(name: str, labels: Dict[str, str]) -> str:
+    return json.dumps([name, sorted((k, str(v)) for k, v in labels.items())])
+
+
+def _series() -> Dict[str, dict]:
+    # A forked worker starts its own series instead of re-reporting the parent's.
+    if _owner["pid"] != os.getpid():
+        _state.clear()
+        _owner.update(pid=os.getpid(), file=f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json", dirty=False)
+    return _state
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    with _lock:
+        series = _series()
+        key = _key(name, labels)
+        series[key] = series.get(key, 0) + amount
+        _touched()
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Gauges merge across workers by keeping the most recently set value."""
+    with _lock:
+        _series()[_key(name, labels)] = [value, time.time()]
+        _touched()
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    buckets = METRICS[name][2]
+    with _lock:
+        series = _series()
+        key = _key(name, labels)
+        entry = series.get(key)
+        if entry is None:
+            entry = series[key] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for idx, bound in enumerate(buckets):
+            if seconds <= bound:
+                entry["buckets"][idx] += 1
+                break
+        entry["sum"] += seconds
+        entry["count"] += 1
+        _touched()
+
+
+@contextmanager
+def stage_timer(stage: str, file_type: str = "") -> Iterator[None]:
+    """Observe the block's duration as one upload stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(
+            "timetabling_upload_stage_seconds",
+            time.perf_counter() - started,
+            stage=stage,
+            file_type=file_type or "unknown",
+        )
+
+
+def _touched() -> None:
+    _owner["dirty"] = True
+    if time.monotonic() - _owner["flushed"] >= METRICS_FLUSH_INTERVAL:
+        _flush_locked()
+
+
+def _flush_locked() -> None:
+    _owner["flushed"] = time.monotonic()
+    if not _owner["dirty"] or _owner["file"] is None:
+        return
+    _write(Path(settings.METRICS_DIR) / _owner["file"], _state)
+    _owner["dirty"] = False
+
+
+def _write(path: Path, series: Dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(series, handle)
+    os.replace(tmp_path, path)
+
+
+def flush() -> None:
+    with _lock:
+        _series()
+        _flush_locked()
+
+
+atexit.register(flush)
+
+
+def _read(path: Path) -> Optional[Dict[str, object]]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None  # being replaced, or already pruned
+
+
+def _merge(merged: Dict[str, object], series: Dict[str, object]) -> None:
+    for key, value in series.items():
+        current = merged.get(key)
+        if current is None:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = {
+                "buckets": [a + b for a, b in zip(current["buckets"], value["buckets"])],
+                "sum": current["sum"] + value["sum"],
+                "count": current["count"] + value["count"],
+            }
+        elif isinstance(value, list):
+            merged[key] = max(current, value, key=lambda gauge: gauge[1])
+        else:
+            merged[key] = current + value
+
+
+def _merged() -> Dict[str, object]:
+    merged: Dict[str, object] = {}
+    for path in sorted(Path(settings.METRICS_DIR).glob("*.json")):
+        series = _read(path)
+        if series:
+            _merge(merged, series)
+    return merged
+
+
+def _worker_exited(path: Path) -> bool:
+    """True for a <pid>-<id>.json file whose process is gone (never for the archive)."""
+    pid = path.name.split("-", 1)[0]
+    if not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass  # alive, owned by another user
+    return False
+
+
+def prune_exited_workers() -> int:
+    """
+    Fold the files of workers whose process has exited into ARCHIVE_FILE,
+    delete them and any stale temp files; returns how many worker files were
+    folded. A lock file keeps concurrent scrapes from folding a file twice.
+    """
+    directory = Path(settings.METRICS_DIR)
+    if not directory.exists():
+        return 0
+    with open(directory / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        exited = [path for path in directory.glob("*.json") if _worker_exited(path)]
+        if exited:
+            archive = _read(directory / ARCHIVE_FILE) or {}
+            for path in exited:
+                _merge(archive, _read(path) or {})
+            _write(directory / ARCHIVE_FILE, archive)
+            for path in exited:
+                path.unlink(missing_ok=True)
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        for path in directory.glob("*.tmp"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+    return len(exited)
+
+
+def _label_text(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in labels]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(extra_gauges: Dict[str, Tuple[str, float]] = None) -> str:
+    """
+    Prometheus text exposition of every worker's metrics, plus extra_gauges
+    (name -> (help, value)) computed by the caller at scrape time.
+    """
+    flush()
+    prune_exited_workers()
+    by_name: Dict[str, List[Tuple[List[Tuple[str, str]], object]]] = {}
+    for key, value in _merged().items():
+        name, labels = json.loads(key)
+        by_name.setdefault(name, []).append(([tuple(label) for label in labels], value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+            if kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(buckets, value["buckets"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_label_text(labels + [('le', str(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_label_text(labels + [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{_label_text(labels)} {_format_number(value['sum'])}")
+                lines.append(f"{name}_count{_label_text(labels)} {value['count']}")
+            elif kind == "gauge":
+                lines.append(f"{name}{_label_text(labels)} {_format_number(value[0])}")
+            else:
+                lines.append(f"{name}{_label_text(labels)} {_format_number(value)}")
+    for name, (help_text, value) in (extra_gauges or {}).items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget this process's metrics and remove every metrics file (tests, redeploys)."""
+    with _lock:
+        _state.clear()
+        _owner.update(pid=None, file=None, dirty=False)
+        directory = Path(settings.METRICS_DIR)
+        if directory.exists():
+            for path in directory.glob("*.json"):
+                path.unlink(missing_ok=True)
@@ -0,0 +1,23 @@
+import time
+
+from . import metrics
+
+
+class RequestMetricsMiddleware:
+    """Records each request's latency in timetabling_http_request_duration_seconds, by view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        metrics.observe(
+            "timetabling_http_request_duration_seconds",
+            time.perf_counter() - started,
+            view=(match.view_name if match else "") or "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+        return response
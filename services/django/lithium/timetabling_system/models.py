@@ -1,6 +1,9 @@
 from django.conf import settings
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.fields import ArrayField, DateTimeRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import F, Func, Q, Value
 
 
 # ---------- ENUM TYPES ----------
@@ -45,12 +48,49 @@ class VenueType(models.TextChoices):
     SCHOOL_TO_SORT = 'school_to_sort', 'School To Sort'
 
 
+class UploadJobStatus(models.TextChoices):
+    QUEUED = 'queued', 'Queued'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+
+
+# ---------- EXPRESSIONS ----------
+
+def _exam_slot_expression():
+    """
+    tstzrange [start_time, start_time + exam_length minutes), NULL without timing
+    (or without a positive length, which tstzrange would reject or leave empty).
+
+    timestamptz + interval is only STABLE in Postgres, so the end is computed
+    on the UTC wall-clock timestamp, which keeps the expression IMMUTABLE as a
+    generated column requires.
+    """
+    start_utc = Func(F("start_time"), Value("UTC"), template="(%(expressions)s)", arg_joiner=" AT TIME ZONE ")
+    length = Func(F("exam_length"), template="make_interval(mins => %(expressions)s)")
+    end = Func(
+        Func(start_utc, length, template="(%(expressions)s)", arg_joiner=" + "),
+        Value("UTC"),
+        template="(%(expressions)s)",
+        arg_joiner=" AT TIME ZONE ",
+        output_field=models.DateTimeField(),
+    )
+    return models.Case(
+        models.When(
+            Q(start_time__isnull=False, exam_length__gt=0),
+            then=Func(F("start_time"), end, Value("[)"), function="tstzrange"),
+        ),
+        default=None,
+        output_field=DateTimeRangeField(),
+    )
+
+
 # ---------- MAIN TABLES ----------
 
 class Exam(models.Model):
     exam_id = models.AutoField(primary_key=True)
     exam_name = models.CharField(max_length=30)
-    course_code = models.CharField(max_length=30)
+    course_code = models.CharField(max_length=30, unique=True)  # import/provision lookup key
     exam_type = models.CharField(max_length=30)
     no_students = models.IntegerField()
     exam_school = models.CharField(max_length=30)
@@ -100,6 +140,25 @@ class ExamVenue(models.Model):
         default=list,
         blank=True,
     )
+    # Booked interval, maintained by Postgres for overlap (&&) queries.
+    slot = models.GeneratedField(
+        expression=_exam_slot_expression(),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["venue", "start_time"]),
+            models.Index(fields=["exam", "core"]),
+            GistIndex(fields=["slot"]),
+            # Capability (<@) lookups over unresolved placeholders only.
+            GinIndex(
+                fields=["provision_capabilities"],
+                condition=Q(venue__isnull=True),
+                name="examvenue_placeholder_caps",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.exam} at {self.venue}"
@@ -158,6 +217,55 @@ class UploadLog(models.Model):  # this lets us view upload history
     uploaded_at = models.DateTimeField(auto_now_add=True)
     records_created = models.IntegerField(default=0)
     records_updated = models.IntegerField(default=0)
+    records_skipped = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    query_count = models.IntegerField(default=0)  # SQL run by the import
+    query_time_ms = models.IntegerField(default=0)
+    top_queries = models.JSONField(default=list, blank=True)  # most repeated query shapes
+    has_profile = models.BooleanField(default=False)  # ?profile=1 output saved (see upload_profiling)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256 of the uploaded bytes
+    data_version = models.IntegerField(null=True, blank=True)  # timetable DataVersion once the import committed
 
     def __str__(self):
         return f"{self.file_name} by {self.uploaded_by} on {self.uploaded_at:%Y-%m-%d %H:%M}"
+
+
+class UploadJob(models.Model):  # uploads queued for the background worker
+    file_name = models.CharField(max_length=255)
+    file_content = models.BinaryField()
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="upload_jobs",
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=UploadJobStatus.choices,
+        default=UploadJobStatus.QUEUED,
+    )
+    force = models.BooleanField(default=False)  # skip dedup and the parse cache
+    incremental = models.BooleanField(default=False)  # diff-based exam re-import
+    prune = models.BooleanField(default=False)  # incremental import may delete missing exams
+    attempts = models.PositiveSmallIntegerField(default=0)  # times a worker has claimed it
+    progress = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    summary = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+
+class DataVersion(models.Model):  # change counter behind the read API's ETags
+    name = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
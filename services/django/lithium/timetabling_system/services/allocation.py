@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.db.models import Count
+
+from timetabling_system.models import ExamVenue, Venue
+from timetabling_system.services.venue_matching import VenueBookingIndex, venue_seat_limit
+
+
+def booking_rows():
+    """ExamVenue rows with just the fields booking checks read, plus their seat counts."""
+    return ExamVenue.objects.only(
+        "examvenue_id", "exam_id", "venue_id", "start_time", "exam_length", "core"
+    ).annotate(seated=Count("studentexam"))
+
+
+class AllocationContext:
+    """
+    Venue catalog and current bookings, loaded once per ingest.
+
+    Venues are bucketed by venuetype, accessibility and provision capability so
+    candidate search is a set lookup instead of a table scan per student.
+    Bookings are kept per venue and updated in place as rows are allocated,
+    along with the number of students seated in each booking, so capacity
+    checks need no per-exam count queries.
+    """
+
+    def __init__(self, venues: Iterable[Venue], exam_venues: Iterable[ExamVenue] = ()):
+        self.venues: Dict[str, Venue] = {}
+        self._position: Dict[str, int] = {}
+        self.by_type: Dict[str, Set[str]] = defaultdict(set)
+        self.by_capability: Dict[str, Set[str]] = defaultdict(set)
+        self.accessible: Set[str] = set()
+        self.bookings: Dict[str, VenueBookingIndex] = defaultdict(VenueBookingIndex)
+        self.seated: Dict[object, int] = defaultdict(int)
+
+        for venue in venues:
+            self.add_venue(venue)
+        by_venue: Dict[str, List[ExamVenue]] = defaultdict(list)
+        for exam_venue in exam_venues:
+            if exam_venue.venue_id:
+                by_venue[exam_venue.venue_id].append(exam_venue)
+            self.seated[self._seat_key(exam_venue)] = getattr(exam_venue, "seated", 0)
+        for name, bookings in by_venue.items():
+            self.bookings[name] = VenueBookingIndex(bookings)
+
+    @classmethod
+    def load(cls) -> "AllocationContext":
+        """
+        Build a context from the current database state (two queries).
+        Bookings come with their StudentExam counts from one aggregate.
+        """
+        return cls(Venue.objects.all(), booking_rows().filter(venue__isnull=False))
+
+    def add_venue(self, venue: Venue) -> None:
+        name = venue.venue_name
+        self.venues[name] = venue
+        self._position.setdefault(name, len(self._position))
+        self.by_type[venue.venuetype].add(name)
+        for cap in venue.provision_capabilities or []:
+            self.by_capability[cap].add(name)
+        if venue.is_accessible:
+            self.accessible.add(name)
+
+    def candidates(
+        self,
+        *,
+        allowed_venue_types: Optional[Iterable[str]] = None,
+        required_caps: Optional[Iterable[str]] = None,
+        require_accessible: bool = False,
+    ) -> List[Venue]:
+        """
+        Venues matching the type/capability/accessibility filters, in catalog order.
+        Availability and timing are left to the caller.
+        """
+        names: Optional[Set[str]] = None
+        if allowed_venue_types is not None:
+            names = set().union(*(self.by_type.get(t, set()) for t in allowed_venue_types))
+        for cap in required_caps or []:
+            bucket = self.by_capability.get(cap, set())
+            names = set(bucket) if names is None else names & bucket
+        if require_accessible:
+            names = set(self.accessible) if names is None else names & self.accessible
+        if names is None:
+            return list(self.venues.values())
+        return [self.venues[name] for name in sorted(names, key=self._position.__getitem__)]
+
+    def has_conflict(
+        self,
+        venue: Venue,
+        start_time: Optional[datetime],
+        length_minutes: Optional[int],
+        ignore_exam_id: Optional[int] = None,
+        allow_same_exam_overlap: bool = False,
+    ) -> bool:
+        """In-memory equivalent of venue_matching.venue_has_timing_conflict."""
+        if not venue or venue.venue_name not in self.bookings:
+            return False
+        return self.bookings[venue.venue_name].has_conflict(
+            start_time,
+            length_minutes,
+            ignore_exam_id=ignore_exam_id,
+            allow_same_exam_overlap=allow_same_exam_overlap,
+        )
+
+    def book(self, exam_venue: ExamVenue) -> None:
+        """Record (or refresh) an ExamVenue booking against its venue."""
+        if not exam_venue.venue_id:
+            return
+        booked = self.bookings[exam_venue.venue_id]
+        booked.discard(exam_venue)
+        booked.add(exam_venue)
+
+    def release(self, exam_venue: ExamVenue, venue_name: str) -> None:
+        """Drop a booking that has moved away from venue_name."""
+        if venue_name in self.bookings:
+            self.bookings[venue_name].discard(exam_venue)
+
+    def free_seats(
+        self,
+        venue: Venue,
+        start_time: Optional[datetime],
+        length_minutes: Optional[int],
+        exam_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Seats left in venue over the slot, or None when there is no limit to
+        enforce: the capacity is unknown, or the venue holds exam_id's core
+        sitting at that time (its headcount already includes the student).
+        Bookings that overlap the slot but not each other are not summed.
+        """
+        limit = venue_seat_limit(venue)
+        if limit is None or venue.venue_name not in self.bookings:
+            return limit
+        booked = list(self.bookings[venue.venue_name].overlapping(start_time, length_minutes))
+        if any(ev.core and ev.exam_id == exam_id for ev in booked):
+            return None
+        peak = 0
+        for moment in [start_time] + [ev.start_time for ev in booked if ev.start_time > start_time]:
+            peak = max(peak, sum(
+                self.seated[self._seat_key(ev)]
+                for ev in booked
+                if ev.start_time <= moment < ev.start_time + timedelta(minutes=ev.exam_length)
+            ))
+        return max(limit - peak, 0)
+
+    def seat(self, exam_venue: ExamVenue, count: int = 1) -> None:
+        """Record count more (or, if negative, fewer) students sitting in exam_venue."""
+        self.seated[self._seat_key(exam_venue)] += count
+
+    def seats_in(self, exam_venue: ExamVenue) -> int:
+        return self.seated[self._seat_key(exam_venue)]
+
+    def unseat(self, exam_venue_id: Optional[int], count: int = 1) -> None:
+        """Record students leaving the saved ExamVenue exam_venue_id."""
+        if exam_venue_id:
+            key = ("pk", exam_venue_id)
+            self.seated[key] = max(self.seated[key] - count, 0)
+
+    @staticmethod
+    def _seat_key(exam_venue: ExamVenue) -> object:
+        return ("pk", exam_venue.pk) if exam_venue.pk else id(exam_venue)
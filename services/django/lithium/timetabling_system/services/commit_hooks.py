@@ -0,0 +1,48 @@
+import threading
+import weakref
+from typing import Callable, Dict, Hashable, List
+
+from django.db import transaction
+
+# Per thread: callback -> {item: commit callbacks still holding it}, in scheduling order.
+_pending = threading.local()
+
+
+def coalesce_on_commit(fn: Callable[[List[Hashable]], None], item: Hashable) -> None:
+    """
+    Call fn once the current transaction commits, with every distinct item
+    scheduled for it in the meantime, in scheduling order.
+
+    Each call registers its own robust commit callback; the first one to run
+    takes the whole batch and the rest find it gone. An item only stays in
+    the batch while one of its callbacks does, so a rollback (of the
+    transaction, or of the savepoint it was scheduled in) discards it along
+    with the callback instead of leaving it for the next commit. Outside a
+    transaction fn runs straight away, as with transaction.on_commit.
+    """
+    batches = _batches()
+    batch = batches.setdefault(fn, {})
+    batch[item] = batch.get(item, 0) + 1
+
+    def flush() -> None:
+        if batches.get(fn) is not batch:
+            return  # already taken by an earlier callback
+        del batches[fn]
+        fn([pending for pending, holders in batch.items() if holders])
+
+    flush.__qualname__ = getattr(fn, "__qualname__", flush.__qualname__)
+    # Django drops the callback on rollback; nothing else holds a reference.
+    weakref.finalize(flush, _release, batch, item)
+    transaction.on_commit(flush, robust=True)
+
+
+def _batches() -> Dict[Callable, Dict[Hashable, int]]:
+    if getattr(_pending, "batches", None) is None:
+        _pending.batches = {}
+    return _pending.batches
+
+
+def _release(batch: Dict[Hashable, int], item: Hashable) -> None:
+    batch[item] -= 1
+    if not batch[item]:
+        del batch[item]
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import F
+from django.utils import timezone
+
+from timetabling_system.models import DataVersion
+from timetabling_system.services.commit_hooks import coalesce_on_commit
+
+# One counter covers exams, venues and their bookings: each read endpoint
+# nests the other's rows, so any of them changing invalidates both.
+TIMETABLE_DATA = "timetable"
+
+
+def get_data_version(name: str = TIMETABLE_DATA) -> Tuple[int, Optional[datetime]]:
+    """Current (version, updated_at) for a data set; (0, None) before its first change."""
+    row = DataVersion.objects.filter(name=name).values_list("version", "updated_at").first()
+    return row or (0, None)
+
+
+def bump_data_version(name: str = TIMETABLE_DATA) -> None:
+    """
+    Record that a data set changed, once the current transaction commits.
+
+    Any number of bumps inside one transaction (e.g. a post_save per row of
+    an admin bulk action) collapse into a single increment per data set.
+    """
+    coalesce_on_commit(_increment_versions, name)
+
+
+def _increment_versions(names: List[str]) -> None:
+    now = timezone.now()
+    for name in sorted(names):
+        if _increment(name, now):
+            continue
+        _, created = DataVersion.objects.get_or_create(
+            name=name, defaults={"version": 1, "updated_at": now}
+        )
+        if not created:
+            _increment(name, now)
+
+
+def _increment(name: str, now: datetime) -> int:
+    return DataVersion.objects.filter(name=name).update(version=F("version") + 1, updated_at=now)
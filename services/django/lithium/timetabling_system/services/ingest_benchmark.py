@@ -0,0 +1,157 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+
+from timetabling_system.services import upload_processor
+from timetabling_system.services.query_stats import collect_query_stats
+from timetabling_system.utils.excel_parser import parse_excel_file
+
+
+@contextmanager
+def _rolled_back():
+    """Savepoint that is always rolled back, so each stage starts from the same state."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+class _Stages:
+    def __init__(self, repeat: int):
+        self.repeat = max(repeat, 1)
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, rows, func, *, rollback: bool = True):
+        """
+        Time func() repeat times, keeping the fastest run's timing alongside
+        its query count and peak traced memory. rows is the row count, or a
+        callable deriving it from func's result, which is returned.
+        """
+        best = None
+        result = None
+        for _ in range(self.repeat):
+            tracemalloc.start()
+            started = time.perf_counter()
+            with collect_query_stats() as query_stats:
+                if rollback:
+                    with _rolled_back():
+                        result = func()
+                else:
+                    result = func()
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if best is None or seconds < best["seconds"]:
+                best = {"seconds": seconds, "queries": query_stats.count, "peak_memory_bytes": peak}
+        count = rows(result) if callable(rows) else rows
+        best["rows"] = count
+        best["rows_per_sec"] = round(count / best["seconds"], 1) if best["seconds"] else None
+        best["seconds"] = round(best["seconds"], 4)
+        self.results[name] = best
+        return result
+
+
+def _parse(path):
+    with open(path, "rb") as handle:
+        result = parse_excel_file(handle)
+    if result.get("status") != "ok":
+        raise ValueError(f"{path}: {result.get('message')}")
+    return result
+
+
+def _parsed_rows(result) -> int:
+    if result.get("type") == "Venue":
+        return sum(len(day["rooms"]) for day in result["days"])
+    return len(result["rows"])
+
+
+def run_ingest_benchmark(paths: Dict[str, Any], *, repeat: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Time parsing, each importer and the full ingest on the workbooks in paths
+    ({"Venue"|"Exam"|"Provisions": path}, see utils.exam_period_generator).
+
+    Importers run against the state they see in a real upload (exams after
+    venues, provisions after exams) and every stage is rolled back, as is the
+    whole run, so nothing is left in the database. Returns per-stage seconds
+    (fastest of repeat runs), rows, rows/sec, query count and peak memory.
+    tracemalloc is on while timing, so compare runs with each other rather
+    than with production timings.
+    """
+    stages = _Stages(repeat)
+    parsed = {}
+    for file_type in ("Venue", "Exam", "Provisions"):
+        path = paths[file_type]
+        parsed[file_type] = stages.run(
+            f"parse_{file_type.lower()}", _parsed_rows, lambda path=path: _parse(path), rollback=False
+        )
+
+    days = parsed["Venue"]["days"]
+    exam_rows = parsed["Exam"]["rows"]
+    provision_rows = parsed["Provisions"]["rows"]
+    room_days = _parsed_rows(parsed["Venue"])
+
+    with _rolled_back():
+        stages.run("import_venue_days", room_days, lambda: upload_processor._import_venue_days(days))
+        upload_processor._import_venue_days(days)
+        stages.run("import_exam_rows", len(exam_rows), lambda: upload_processor._import_exam_rows(exam_rows))
+        stages.run(
+            "import_exam_rows_bulk", len(exam_rows), lambda: upload_processor._import_exam_rows_bulk(exam_rows)
+        )
+        upload_processor._import_exam_rows_bulk(exam_rows)
+        # Re-uploading the same timetable: an incremental diff with nothing to change.
+        stages.run(
+            "import_exam_rows_incremental",
+            len(exam_rows),
+            lambda: upload_processor._import_exam_rows_incremental(exam_rows),
+        )
+        stages.run(
+            "import_provision_rows",
+            len(provision_rows),
+            lambda: upload_processor._import_provision_rows(provision_rows),
+        )
+        stages.run(
+            "import_provision_rows_bulk",
+            len(provision_rows),
+            lambda: upload_processor._import_provision_rows_bulk(provision_rows),
+        )
+
+    def ingest_all():
+        for file_type in ("Venue", "Exam", "Provisions"):
+            upload_processor.ingest_upload_result(parsed[file_type], file_name=str(paths[file_type]), bulk=True)
+
+    stages.run("ingest_upload_result", room_days + len(exam_rows) + len(provision_rows), ingest_all)
+    return stages.results
+
+
+def benchmark_report(stages: Dict[str, Dict[str, Any]], scale: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "scale": scale,
+        "repeat": repeat,
+        "stages": stages,
+    }
+
+
+def compare_benchmarks(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-stage seconds and query counts of current against a saved baseline report."""
+    rows = []
+    old_stages = baseline.get("stages", {})
+    for name, stage in current.get("stages", {}).items():
+        old: Optional[Dict[str, Any]] = old_stages.get(name)
+        change = None
+        if old and old.get("seconds"):
+            change = round((stage["seconds"] - old["seconds"]) / old["seconds"] * 100, 1)
+        rows.append(
+            {
+                "stage": name,
+                "seconds": stage["seconds"],
+                "baseline_seconds": old.get("seconds") if old else None,
+                "change_pct": change,
+                "queries": stage["queries"],
+                "baseline_queries": old.get("queries") if old else None,
+            }
+        )
+    return rows
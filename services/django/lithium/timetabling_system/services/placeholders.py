@@ -0,0 +1,156 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+
+from timetabling_system.models import ExamVenue, ExamVenueProvisionType, StudentExam, Venue
+from timetabling_system.services.allocation import AllocationContext, booking_rows
+from timetabling_system.services.commit_hooks import coalesce_on_commit
+from timetabling_system.services.data_version import bump_data_version
+from timetabling_system.services.venue_matching import venue_is_available, venue_supports_caps
+
+
+def schedule_placeholder_attach(venue: Venue) -> None:
+    """
+    Offer placeholders to venue once the current transaction commits.
+
+    Every venue scheduled within one transaction (e.g. each room of a venue
+    upload) is handled by a single attach_placeholders_to_venues pass.
+    """
+    if not venue:
+        return
+    coalesce_on_commit(_attach_pending_placeholders, venue.venue_name)
+
+
+def _attach_pending_placeholders(names: List[str]) -> None:
+    if not names or not ExamVenue.objects.filter(venue__isnull=True).exists():
+        return
+    venues = Venue.objects.in_bulk(names)
+    attach_placeholders_to_venues(venues[name] for name in names if name in venues)
+
+
+@transaction.atomic
+def attach_placeholders_to_venues(venues: Iterable[Venue]) -> int:
+    """
+    Upgrade placeholder ExamVenue records (venue is NULL) that any of these
+    venues can now satisfy; returns how many were resolved.
+
+    Only placeholders that placeholder_candidates lets through are loaded,
+    and the venues' bookings and seat counts are read once for the whole
+    set. Each venue in turn takes the remaining placeholders it can
+    host without a clash or going over capacity; a placeholder whose exam
+    already has a row at that venue is folded into that row instead.
+    """
+    venues = [venue for venue in venues if venue]
+    if not venues:
+        return 0
+    placeholders = list(placeholder_candidates(venues).order_by("pk"))
+    if not placeholders:
+        return 0
+
+    names = [venue.venue_name for venue in venues]
+    bookings = list(booking_rows().filter(venue_id__in=names).order_by("pk"))
+    context = AllocationContext(venues, bookings)
+    existing: Dict[tuple, ExamVenue] = {}
+    for booking in bookings:
+        existing.setdefault((booking.exam_id, booking.venue_id), booking)
+
+    attached: List[ExamVenue] = []
+    merged: Dict[int, List[int]] = defaultdict(list)
+    for venue in venues:
+        remaining = []
+        for ev in placeholders:
+            if not _can_host(context, venue, ev):
+                remaining.append(ev)
+                continue
+            target = existing.get((ev.exam_id, venue.venue_name))
+            if target:
+                # Re-point the students to the row already at this venue.
+                merged[target.pk].append(ev.pk)
+                context.seat(target, ev.seated)
+                continue
+            ev.venue = venue
+            context.book(ev)
+            context.seat(ev, ev.seated)
+            existing[(ev.exam_id, venue.venue_name)] = ev
+            attached.append(ev)
+        placeholders = remaining
+
+    ExamVenue.objects.bulk_update(attached, fields=["venue"])
+    for target_pk, placeholder_pks in merged.items():
+        StudentExam.objects.filter(exam_venue_id__in=placeholder_pks).update(exam_venue_id=target_pk)
+    merged_pks = [pk for pks in merged.values() for pk in pks]
+    if merged_pks:
+        ExamVenue.objects.filter(pk__in=merged_pks).delete()
+    resolved = len(attached) + len(merged_pks)
+    if resolved:
+        bump_data_version()
+    return resolved
+
+
+def placeholder_candidates(venues: Iterable[Venue]) -> QuerySet:
+    """
+    Placeholders (annotated with seated) that at least one of venues might
+    host, filtered in Postgres: capabilities with <@, accessibility,
+    availability date and no overlapping booking at the venue
+    via the indexed slot range. This only narrows the set; _can_host still
+    makes the final call, including against bookings made during the pass.
+    """
+    fits = [_venue_candidate_filter(venue) for venue in venues if venue]
+    placeholders = ExamVenue.objects.filter(venue__isnull=True)
+    if not fits:
+        return placeholders.none()
+    return placeholders.filter(reduce(or_, fits)).annotate(seated=Count("studentexam"))
+
+
+def _venue_candidate_filter(venue: Venue) -> Q:
+    # NULL capabilities count as none, like the `or []` in _can_host.
+    fits = Q(provision_capabilities__isnull=True) | Q(
+        provision_capabilities__contained_by=venue.provision_capabilities or []
+    )
+    if not venue.is_accessible:
+        fits &= ~Q(provision_capabilities__contains=[ExamVenueProvisionType.ACCESSIBLE_HALL])
+    days = venue.availability or []
+    if days:
+        fits &= _available_on(days)
+    # Placeholders without a slot never overlap anything, as in the Python check.
+    clash = ExamVenue.objects.filter(venue=venue, slot__overlap=OuterRef("slot")).exclude(
+        exam_id=OuterRef("exam_id"),
+        start_time=OuterRef("start_time"),
+        exam_length=OuterRef("exam_length"),
+    )
+    return fits & ~Exists(clash)
+
+
+def _available_on(days: Iterable[str]) -> Q:
+    """
+    Placeholders without a start, or starting on one of days. Days are
+    compared in UTC, as venue_is_available does with the stored value,
+    rather than in the active time zone that start_time__date would use.
+    """
+    available = Q(start_time__isnull=True)
+    for day in days:
+        try:
+            start = datetime.combine(date.fromisoformat(str(day)), time.min, tzinfo=dt_timezone.utc)
+        except ValueError:
+            continue  # never equal to a start_time.date().isoformat()
+        available |= Q(start_time__gte=start, start_time__lt=start + timedelta(days=1))
+    return available
+
+
+def _can_host(context: AllocationContext, venue: Venue, ev: ExamVenue) -> bool:
+    required_caps = ev.provision_capabilities or []
+    if not venue_supports_caps(venue, required_caps):
+        return False
+    if ExamVenueProvisionType.ACCESSIBLE_HALL in required_caps and not venue.is_accessible:
+        return False
+    if not venue_is_available(venue, ev.start_time):
+        return False
+    if context.has_conflict(venue, ev.start_time, ev.exam_length, ignore_exam_id=ev.exam_id):
+        return False
+    free = context.free_seats(venue, ev.start_time, ev.exam_length, ev.exam_id)
+    return free is None or free >= ev.seated
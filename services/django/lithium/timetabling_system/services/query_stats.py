@@ -0,0 +1,74 @@
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from django.db import connection
+
+# Repeated query shapes kept in a summary.
+TOP_QUERY_SHAPES = 5
+# Longer SQL is cut to this many characters in the summary.
+QUERY_SHAPE_LENGTH = 300
+
+_PLACEHOLDER_RUN = re.compile(r"%s(?:, %s)+")
+_VALUES_RUN = re.compile(r"(\([^()]*\))(?:, \1)+")
+_SAVEPOINT_NAME = re.compile(r'"s\d+_x\d+"')
+
+
+def query_shape(sql: str) -> str:
+    """
+    The SQL with variable-length parts folded, so a query issued with
+    different numbers of parameters (IN lists, multi-row VALUES) or savepoint
+    names counts as one shape.
+    """
+    shape = _PLACEHOLDER_RUN.sub("%s, ...", " ".join(sql.split()))
+    shape = _VALUES_RUN.sub(r"\1, ...", shape)
+    return _SAVEPOINT_NAME.sub('"sN"', shape)
+
+
+class QueryStats:
+    """
+    connection.execute_wrapper that counts and times every query, grouped
+    by query_shape. Install with collect_query_stats().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._shapes: Dict[str, list] = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            shape = self._shapes[query_shape(sql)]
+            shape[0] += 1
+            shape[1] += elapsed
+
+    @property
+    def time_ms(self) -> int:
+        return round(self.seconds * 1000)
+
+    def top_shapes(self, limit: int = TOP_QUERY_SHAPES) -> list:
+        """The most repeated shapes (ties broken by time) with their counts and time."""
+        ranked = sorted(self._shapes.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return [
+            {"sql": sql[:QUERY_SHAPE_LENGTH], "count": count, "time_ms": round(seconds * 1000)}
+            for sql, (count, seconds) in ranked[:limit]
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {"count": self.count, "time_ms": self.time_ms, "top": self.top_shapes()}
+
+
+@contextmanager
+def collect_query_stats() -> Iterator[QueryStats]:
+    """Count and time the queries run on the default connection inside the block."""
+    stats = QueryStats()
+    with connection.execute_wrapper(stats):
+        yield stats
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+from timetabling_system.models import UploadLog
+from timetabling_system.services.data_version import get_data_version
+
+# Bump when the shape of parse_excel_file's result changes so stale entries are ignored.
+PARSE_CACHE_VERSION = "3"
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def is_force_request(request) -> bool:
+    """True when the caller asked to bypass dedup and the parse cache (?force=1 or form field)."""
+    flag = request.GET.get("force") or request.POST.get("force") or ""
+    return str(flag).strip().lower() in ("1", "true", "yes")
+
+
+def hash_upload(upload) -> str:
+    """SHA-256 of the uploaded bytes; the file is left rewound for the parser."""
+    digest = hashlib.sha256()
+    if hasattr(upload, "chunks"):
+        for chunk in upload.chunks():
+            digest.update(chunk)
+    else:
+        upload.seek(0)
+        for chunk in iter(lambda: upload.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(chunk)
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    return digest.hexdigest()
+
+
+def find_duplicate_upload(content_hash: str) -> Optional[UploadLog]:
+    """
+    Most recent upload with exactly these bytes that imported every row, if
+    nothing has changed since. An import that skipped rows or reported
+    errors (say, a provision report sent before its timetable) is not a
+    duplicate: the same file can import differently once the missing data is
+    there. Neither is one followed by any other change to the timetable (a
+    different upload, an admin edit), which its re-import would revert.
+    """
+    if not content_hash:
+        return None
+    previous = (
+        UploadLog.objects.filter(content_hash=content_hash, records_skipped=0, error_count=0)
+        .order_by("-uploaded_at")
+        .first()
+    )
+    if previous is None or previous.data_version is None:
+        return None
+    version, _ = get_data_version()
+    return previous if previous.data_version == version else None
+
+
+def unchanged_result(previous: UploadLog, *, file_name: str) -> Dict[str, Any]:
+    """Response body for an upload identical to one already imported."""
+    return {
+        "status": "ok",
+        "file": file_name,
+        "unchanged": True,
+        "message": (
+            f"Identical to {previous.file_name} uploaded "
+            f"{previous.uploaded_at:%Y-%m-%d %H:%M}; nothing to import."
+        ),
+        "ingest": {
+            "handled": True,
+            "unchanged": True,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "errors": [],
+        },
+        "records_created": 0,
+        "records_updated": 0,
+    }
+
+
+class ParseResultCache:
+    """
+    Parsed upload results on local disk, keyed by content hash.
+
+    Entries are pickles written atomically into a directory only this app
+    writes to. Once the directory grows past max_bytes the least recently
+    used entries (by mtime, refreshed on every hit) are evicted.
+    A max_bytes of 0 disables the cache.
+    """
+
+    def __init__(self, directory, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, content_hash: str) -> Path:
+        return self.directory / f"{PARSE_CACHE_VERSION}-{content_hash}.pickle"
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        path = self._path(content_hash)
+        try:
+            with open(path, "rb") as fh:
+                result = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def set(self, content_hash: str, result: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, self._path(content_hash))
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def get_parse_cache() -> ParseResultCache:
+    return ParseResultCache(settings.UPLOAD_PARSE_CACHE_DIR, settings.UPLOAD_PARSE_CACHE_MAX_BYTES)
+
+
+def parse_upload(
+    upload,
+    parse: Callable[[Any], Dict[str, Any]],
+    *,
+    content_hash: str,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    parse(upload), served from the parse cache when these bytes were parsed
+    before. Only successful parses are cached; force re-parses and refreshes
+    the entry.
+    """
+    file_name = getattr(upload, "name", "uploaded_file")
+    cache = get_parse_cache()
+    if not force:
+        cached = cache.get(content_hash)
+        if cached is not None:
+            if "file" in cached:
+                cached["file"] = file_name
+            return cached
+
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    result = parse(upload)
+    if result.get("status") == "ok":
+        cache.set(content_hash, result)
+    return result
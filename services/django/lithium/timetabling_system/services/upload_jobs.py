@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from timetabling_system.models import UploadJob, UploadJobStatus
+from timetabling_system.services.upload_cache import (
+    find_duplicate_upload,
+    hash_upload,
+    parse_upload,
+    unchanged_result,
+)
+from timetabling_system.services.upload_processor import ingest_upload_result
+from timetabling_system.utils.excel_parser import parse_excel_file
+
+JOB_STAGES = ("parse", "ingest")
+
+# Parsed row payloads can be large; the job only keeps what the summary needs.
+_RESULT_PAYLOAD_KEYS = ("rows", "days", "venues")
+
+
+def is_async_request(request) -> bool:
+    """True when the caller asked for the upload to be queued (?async=1 or form field)."""
+    flag = request.GET.get("async") or request.POST.get("async") or ""
+    return str(flag).strip().lower() in ("1", "true", "yes")
+
+
+def enqueue_upload(
+    upload,
+    *,
+    uploaded_by: Optional[Any] = None,
+    force: bool = False,
+    incremental: bool = False,
+    prune: bool = False,
+) -> UploadJob:
+    """Store the uploaded file on a queued UploadJob for the background worker."""
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    user = uploaded_by if getattr(uploaded_by, "is_authenticated", False) else None
+    return UploadJob.objects.create(
+        file_name=getattr(upload, "name", "uploaded_file"),
+        file_content=upload.read(),
+        uploaded_by=user,
+        force=force,
+        incremental=incremental,
+        prune=prune,
+        progress={stage: {"status": "pending"} for stage in JOB_STAGES},
+    )
+
+
+def reclaim_stale_jobs() -> int:
+    """
+    Requeue jobs left running past UPLOAD_JOB_TIMEOUT by a worker that died,
+    or fail them once they have used UPLOAD_JOB_MAX_ATTEMPTS claims; returns
+    how many were reclaimed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_JOB_TIMEOUT)
+    with transaction.atomic():
+        stale = list(
+            UploadJob.objects.select_for_update(skip_locked=True).filter(
+                status=UploadJobStatus.RUNNING, started_at__lt=cutoff
+            )
+        )
+        for job in stale:
+            if job.attempts < settings.UPLOAD_JOB_MAX_ATTEMPTS:
+                job.status = UploadJobStatus.QUEUED
+                job.started_at = None
+                job.progress = {stage: {"status": "pending"} for stage in JOB_STAGES}
+            else:
+                job.status = UploadJobStatus.FAILED
+                job.error = (
+                    f"No worker finished the job after {job.attempts} attempts "
+                    f"(each timed out after {settings.UPLOAD_JOB_TIMEOUT}s)."
+                )
+                job.finished_at = timezone.now()
+        UploadJob.objects.bulk_update(
+            stale, fields=["status", "started_at", "progress", "error", "finished_at"]
+        )
+    return len(stale)
+
+
+def claim_next_job() -> Optional[UploadJob]:
+    """
+    Take the oldest queued job and mark it running, after reclaiming any
+    job a dead worker left running (see reclaim_stale_jobs).
+
+    SKIP LOCKED lets several workers poll the same table without blocking on,
+    or double-claiming, a row another worker is already taking.
+    """
+    reclaim_stale_jobs()
+    with transaction.atomic():
+        job = (
+            UploadJob.objects.select_for_update(skip_locked=True)
+            .filter(status=UploadJobStatus.QUEUED)
+            .order_by("created_at", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = UploadJobStatus.RUNNING
+        job.started_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "attempts"])
+    return job
+
+
+def run_upload_job(job: UploadJob) -> UploadJob:
+    """Parse and ingest a claimed job, recording per-stage progress as it goes."""
+    upload = BytesIO(bytes(job.file_content))
+    upload.name = job.file_name
+
+    try:
+        content_hash = hash_upload(upload)
+        duplicate = None if job.force or job.prune else find_duplicate_upload(content_hash)
+        if duplicate:
+            for stage in JOB_STAGES:
+                job.progress[stage] = {"status": "skipped"}
+            job.summary = unchanged_result(duplicate, file_name=job.file_name)
+            job.status = UploadJobStatus.SUCCEEDED
+        else:
+            _parse_and_ingest(job, upload, content_hash)
+    except Exception as exc:
+        job.status = UploadJobStatus.FAILED
+        job.error = str(exc)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "progress", "summary", "error", "finished_at"])
+    return job
+
+
+def _parse_and_ingest(job: UploadJob, upload, content_hash: str) -> None:
+    with _stage(job, "parse"):
+        result = parse_upload(upload, parse_excel_file, content_hash=content_hash, force=job.force)
+
+    summary: Dict[str, Any] = {
+        key: value for key, value in result.items() if key not in _RESULT_PAYLOAD_KEYS
+    }
+    if result.get("status") == "ok":
+        with _stage(job, "ingest"):
+            ingest_summary = ingest_upload_result(
+                result,
+                file_name=job.file_name,
+                uploaded_by=job.uploaded_by,
+                bulk=True,
+                incremental=job.incremental,
+                prune=job.prune,
+                content_hash=content_hash,
+            )
+        if ingest_summary:
+            summary["ingest"] = ingest_summary
+            summary["records_created"] = ingest_summary.get("created", 0)
+            summary["records_updated"] = ingest_summary.get("updated", 0)
+        job.status = UploadJobStatus.SUCCEEDED
+    else:
+        job.progress["ingest"] = {"status": "skipped"}
+        job.status = UploadJobStatus.FAILED
+        job.error = result.get("message", "")
+    job.summary = summary
+
+
+def process_pending_jobs(limit: Optional[int] = None) -> int:
+    """Run queued jobs until the queue is empty (or limit is reached); returns the count."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_upload_job(job)
+        processed += 1
+    return processed
+
+
+@contextmanager
+def _stage(job: UploadJob, stage: str):
+    started = timezone.now()
+    job.progress[stage] = {"status": "running", "started_at": started}
+    job.save(update_fields=["progress"])
+    try:
+        yield
+    except Exception:
+        job.progress[stage] = {"status": "failed", "started_at": started}
+        raise
+    finished = timezone.now()
+    job.progress[stage] = {
+        "status": "done",
+        "started_at": started,
+        "finished_at": finished,
+        "seconds": round((finished - started).total_seconds(), 3),
+    }
+    job.save(update_fields=["progress"])
@@ -1,12 +1,16 @@
 import math
 import re
+from collections import defaultdict
 from datetime import date, datetime, time, timedelta
-from typing import Any, Dict, Iterable, List, Optional
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
 
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 from django.utils import dateparse, timezone
 
+from timetabling_system import metrics
 from timetabling_system.models import (
     Exam,
     ProvisionType,
@@ -19,18 +23,30 @@ from timetabling_system.models import (
     VenueType,
     UploadLog,
 )
+from timetabling_system.services.allocation import AllocationContext
+from timetabling_system.services.data_version import bump_data_version, get_data_version
+from timetabling_system.services.placeholders import schedule_placeholder_attach
+from timetabling_system.services.query_stats import collect_query_stats
 from timetabling_system.services.venue_matching import (
+    VenueBookingIndex,
     venue_has_timing_conflict,
     venue_is_available,
     venue_supports_caps,
 )
+from timetabling_system.utils.row_batch import RowBatch
 
+# exam_school for timetable rows without one; shared by every such upload.
+DEFAULT_EXAM_SCHOOL = "Unassigned"
 
 def ingest_upload_result(
     result: Dict[str, Any],
     *,
     file_name: str,
     uploaded_by: Optional[Any] = None,
+    bulk: bool = False,
+    incremental: bool = False,
+    prune: bool = False,
+    content_hash: str = "",
 ) -> Optional[Dict[str, Any]]:
     """
     Persist parsed upload results into the relational models.
@@ -38,6 +54,23 @@ def ingest_upload_result(
     Returns a summary dictionary that is merged back into the API response.
     Unsupported file types return a handled=False summary so callers can show
     a helpful message without treating the upload as an error.
+
+    With bulk=True exam timetables and provision reports go through the
+    set-based importers, which produce the same summary while resolving
+    existing rows up front and writing them back in batches.
+
+    With incremental=True an exam timetable is diffed against the current
+    state instead (see _import_exam_rows_incremental) and the summary carries
+    the added/changed/moved/missing exam codes. Exams missing from the file
+    are only deleted when prune=True as well.
+
+    content_hash is recorded on the UploadLog so identical re-uploads can be
+    recognised (see services.upload_cache). Imports that change anything bump
+    the timetable data version so the read API's cached responses expire.
+
+    The import's query count, SQL time and most repeated query shapes are
+    returned under "queries" and kept on the UploadLog, so a slow upload can
+    be told apart from a slow parse afterwards.
     """
     
     if not result or result.get("status") != "ok":
@@ -46,13 +79,21 @@ def ingest_upload_result(
     file_type = result.get("type")
     rows: Iterable[Dict[str, Any]] = result.get("rows", [])
 
-    if file_type == "Exam":
-        summary = _import_exam_rows(rows)
-    elif file_type == "Provisions":
-        summary = _import_provision_rows(rows)
-    elif file_type == "Venue":
-        summary = _import_venue_days(result.get("days", []))
-    else:
+    started = perf_counter()
+    with collect_query_stats() as query_stats:
+        if file_type == "Exam" and incremental:
+            summary = _import_exam_rows_incremental(rows, prune=prune)
+        elif file_type == "Exam":
+            summary = _import_exam_rows_bulk(rows) if bulk else _import_exam_rows(rows)
+        elif file_type == "Provisions":
+            summary = _import_provision_rows_bulk(rows) if bulk else _import_provision_rows(rows)
+        elif file_type == "Venue":
+            summary = _import_venue_days(result.get("days", []))
+        else:
+            summary = None
+    elapsed = perf_counter() - started
+
+    if summary is None:
         return {
             "handled": False,
             "type": file_type,
@@ -65,18 +106,67 @@ def ingest_upload_result(
 
     summary["handled"] = True
     summary["type"] = file_type
+    summary["queries"] = query_stats.summary()
+    _record_ingest_metrics(file_type, summary, elapsed)
 
     user = uploaded_by if getattr(uploaded_by, "is_authenticated", False) else None
-    UploadLog.objects.create(
+    log = UploadLog.objects.create(
         file_name=file_name or result.get("file", "uploaded_file"),
         uploaded_by=user,
         records_created=summary["created"],
         records_updated=summary["updated"],
+        records_skipped=summary.get("skipped", 0),
+        error_count=len(summary.get("errors", [])),
+        query_count=query_stats.count,
+        query_time_ms=query_stats.time_ms,
+        top_queries=summary["queries"]["top"],
+        content_hash=content_hash,
     )
+    summary["upload_log_id"] = log.pk
+    if summary["created"] or summary["updated"] or summary.get("diff", {}).get("removed"):
+        bump_data_version()
+    transaction.on_commit(lambda: _stamp_data_version(log.pk), robust=True)
 
     return summary
 
 
+def _stamp_data_version(log_id: int) -> None:
+    """Record the data version this import left behind, for upload dedup."""
+    version, _ = get_data_version()
+    UploadLog.objects.filter(pk=log_id).update(data_version=version)
+
+
+def _record_ingest_metrics(file_type: str, summary: Dict[str, Any], seconds: float) -> None:
+    metrics.observe("timetabling_upload_stage_seconds", seconds, stage="ingest", file_type=file_type)
+    rows = summary.get("total_rows", 0)
+    metrics.inc("timetabling_upload_rows_total", rows, file_type=file_type)
+    if seconds > 0:
+        metrics.set_gauge("timetabling_upload_rows_per_second", rows / seconds, file_type=file_type)
+
+
+def is_incremental_request(request) -> bool:
+    """True when the caller asked for a diff-based re-import (?incremental=1 or form field)."""
+    flag = request.GET.get("incremental") or request.POST.get("incremental") or ""
+    return str(flag).strip().lower() in ("1", "true", "yes")
+
+
+def is_prune_request(request) -> bool:
+    """True when an incremental re-import may delete exams missing from the file (?prune=1 or form field)."""
+    flag = request.GET.get("prune") or request.POST.get("prune") or ""
+    return str(flag).strip().lower() in ("1", "true", "yes")
+
+
+def _sized_rows(rows: Optional[Iterable[Dict[str, Any]]]) -> Sequence[Dict[str, Any]]:
+    """
+    Rows as a sized, re-iterable sequence. Lists and RowBatches pass through
+    (a RowBatch builds its row dicts chunk by chunk while being iterated);
+    other iterables are listed.
+    """
+    if rows is None:
+        return []
+    return rows if hasattr(rows, "__len__") else list(rows)
+
+
 def _base_summary(total_rows: int) -> Dict[str, Any]:
     return {
         "created": 0,
@@ -116,6 +206,9 @@ def _clean_string(value: Any, *, max_length: Optional[int] = None) -> str:
     return text
 
 
+# Uploaded sheets arrive with their typed columns already converted
+# (utils.column_coercion); these per-value helpers cover the cells it leaves
+# raw and callers that do not come from a DataFrame (venue days, tests).
 def _coerce_date(value: Any) -> Optional[date]:
     if _is_missing(value):
         return None
@@ -267,16 +360,24 @@ def _duration_in_minutes(length_value: Any, end_value: Any, start_dt: Optional[d
     return 0
 
 
-def _core_exam_timing(exam: Exam) -> tuple[Optional[datetime], Optional[int]]:
+def _core_exam_timing(
+    exam: Exam,
+    exam_venues: Optional[List[ExamVenue]] = None,
+) -> tuple[Optional[datetime], Optional[int]]:
     """
     Return the core exam start_time and length from the primary ExamVenue rows.
+    exam_venues may carry the exam's ExamVenue rows (in pk order) to avoid querying.
     """
     if not exam:
         return None, None
-    core_ev = exam.examvenue_set.filter(core=True).order_by("pk").first()
+    if exam_venues is not None:
+        core_ev = next((ev for ev in exam_venues if ev.core), None)
+        fallback = exam_venues[0] if exam_venues else None
+    else:
+        core_ev = exam.examvenue_set.filter(core=True).order_by("pk").first()
+        fallback = None if core_ev else exam.examvenue_set.order_by("pk").first()
     if core_ev:
         return core_ev.start_time, core_ev.exam_length
-    fallback = exam.examvenue_set.order_by("pk").first()
     if fallback:
         return fallback.start_time, fallback.exam_length
     return None, None
@@ -338,7 +439,7 @@ def _apply_extra_time(
 
 @transaction.atomic
 def _import_exam_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
-    rows_list = list(rows or [])
+    rows_list = _sized_rows(rows)
     summary = _base_summary(len(rows_list))
 
     for idx, raw in enumerate(rows_list, start=1):
@@ -383,7 +484,7 @@ def _build_exam_payload(row: Dict[str, Any]) -> Dict[str, Any]:
         "exam_name": _clean_string(row.get("exam_name"), max_length=30) or course_code,
         "exam_type": _clean_string(row.get("exam_type"), max_length=30) or "Exam",
         "no_students": _coerce_int(row.get("no_students")) or 0,
-        "exam_school": _clean_string(row.get("school"), max_length=30) or "Unassigned",
+        "exam_school": _clean_string(row.get("school"), max_length=30) or DEFAULT_EXAM_SCHOOL,
         "school_contact": _clean_string(row.get("school_contact"), max_length=100),
     }
 
@@ -442,8 +543,9 @@ def _normalize_provisions(value: Any) -> List[str]:
 
 @transaction.atomic
 def _import_provision_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
-    rows_list = list(rows or [])
+    rows_list = _sized_rows(rows)
     summary = _base_summary(len(rows_list))
+    context = AllocationContext.load()
 
     for idx, raw in enumerate(rows_list, start=1):
         student_id = _clean_string(
@@ -488,83 +590,594 @@ def _import_provision_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         )
 
         student_exam, _ = StudentExam.objects.get_or_create(student=student, exam=exam)
-        required_caps = _required_capabilities(provisions)
-        needs_accessible = _needs_accessible_venue(provisions)
-        requires_separate_room = _needs_separate_room(provisions)
-        needs_computer = _needs_computer(provisions)
-        allowed_venue_types = _allowed_venue_types(needs_computer, requires_separate_room)
+        # The student's current seat is free while their room is chosen.
+        context.unseat(student_exam.exam_venue_id)
+        exam_venue, updates = _resolve_provision_exam_venue(exam, provisions, context=context)
+        if updates:
+            exam_venue.save(update_fields=updates)
+            context.book(exam_venue)
+
+        if exam_venue and exam_venue.venue_id is None:
+            metrics.inc("timetabling_allocation_failures_total")
+        if exam_venue:
+            context.seat(exam_venue)
+            if student_exam.exam_venue_id != exam_venue.pk:
+                student_exam.exam_venue = exam_venue
+                student_exam.save(update_fields=["exam_venue"])
+
+        if created:
+            summary["created"] += 1
+        else:
+            summary["updated"] += 1
+
+    return summary
+
+
+class _ProvisionTarget(NamedTuple):
+    """What a student's provisions ask of their room; students with equal targets can share one."""
+
+    required_caps: tuple
+    require_accessible: bool
+    allowed_venue_types: Optional[frozenset]
+    start_time: Optional[datetime]
+    exam_length: Optional[int]
+    preferred_venue: Optional[Venue]
+    allow_same_exam_overlap: bool
+
+
+def _provision_target(
+    exam: Exam,
+    provisions: List[str],
+    *,
+    exam_venues: Optional[List[ExamVenue]] = None,
+) -> _ProvisionTarget:
+    """Capabilities, venue filters and timing a student with these provisions needs."""
+    required_caps = _required_capabilities(provisions)
+    needs_accessible = _needs_accessible_venue(provisions)
+    requires_separate_room = _needs_separate_room(provisions)
+    needs_computer = _needs_computer(provisions)
+    allowed_venue_types = _allowed_venue_types(needs_computer, requires_separate_room)
+    if exam_venues is not None:
+        core_ev = next((ev for ev in exam_venues if ev.core and ev.venue_id), None)
+    else:
         core_ev = (
             exam.examvenue_set.select_related("venue")
             .filter(core=True, venue__isnull=False)
             .order_by("pk")
             .first()
         )
-        core_venue = core_ev.venue if core_ev else None
-        base_start, base_length = _core_exam_timing(exam)
-        extra_minutes = _extra_time_minutes(provisions, base_length)
-        target_start, target_length = _apply_extra_time(base_start, base_length, extra_minutes)
-        small_extra_time = _has_small_extra_time(extra_minutes, base_length)
-        preferred_venue = None
-        if small_extra_time and not requires_separate_room and not needs_computer:
-            preferred_venue = core_venue
-            if needs_accessible and preferred_venue and not preferred_venue.is_accessible:
-                preferred_venue = None
-        allow_same_exam_overlap = bool(preferred_venue and small_extra_time)
-
-        exam_venue = _find_matching_exam_venue(
+    core_venue = core_ev.venue if core_ev else None
+    base_start, base_length = _core_exam_timing(exam, exam_venues)
+    extra_minutes = _extra_time_minutes(provisions, base_length)
+    target_start, target_length = _apply_extra_time(base_start, base_length, extra_minutes)
+    small_extra_time = _has_small_extra_time(extra_minutes, base_length)
+    preferred_venue = None
+    if small_extra_time and not requires_separate_room and not needs_computer:
+        preferred_venue = core_venue
+        if needs_accessible and preferred_venue and not preferred_venue.is_accessible:
+            preferred_venue = None
+    return _ProvisionTarget(
+        required_caps=tuple(required_caps),
+        require_accessible=needs_accessible,
+        allowed_venue_types=frozenset(allowed_venue_types) if allowed_venue_types is not None else None,
+        start_time=target_start,
+        exam_length=target_length,
+        preferred_venue=preferred_venue,
+        allow_same_exam_overlap=bool(preferred_venue and small_extra_time),
+    )
+
+
+def _apply_provision_target(exam_venue: ExamVenue, target: _ProvisionTarget) -> List[str]:
+    """Set the target timing and capabilities on exam_venue; returns the fields changed."""
+    updates: List[str] = []
+    if target.start_time and exam_venue.start_time != target.start_time:
+        exam_venue.start_time = target.start_time
+        updates.append("start_time")
+    if target.exam_length is not None and exam_venue.exam_length != target.exam_length:
+        exam_venue.exam_length = target.exam_length
+        updates.append("exam_length")
+    existing_caps = exam_venue.provision_capabilities or []
+    if target.required_caps and not all(cap in existing_caps for cap in target.required_caps):
+        exam_venue.provision_capabilities = sorted(set(existing_caps) | set(target.required_caps))
+        updates.append("provision_capabilities")
+    return updates
+
+
+def _resolve_provision_exam_venue(
+    exam: Exam,
+    provisions: List[str],
+    *,
+    exam_venues: Optional[List[ExamVenue]] = None,
+    context: Optional[AllocationContext] = None,
+) -> tuple[Optional[ExamVenue], List[str]]:
+    """
+    Find or allocate the ExamVenue a student with these provisions should sit in.
+
+    Target timing and capabilities are applied to the instance in memory; the
+    returned field list says what still needs saving. exam_venues may carry the
+    exam's ExamVenue rows (pk order, venue loaded) so lookups run without queries,
+    and context supplies the preloaded venue catalog for new allocations.
+    Whole uploads go through _ProvisionAllocator instead.
+    """
+    target = _provision_target(exam, provisions, exam_venues=exam_venues)
+    exam_venue = _find_matching_exam_venue(
+        exam,
+        list(target.required_caps),
+        target.start_time,
+        target.exam_length,
+        require_accessible=target.require_accessible,
+        preferred_venue=target.preferred_venue,
+        allowed_venue_types=target.allowed_venue_types,
+        exam_venues=exam_venues,
+        context=context,
+    )
+    if not exam_venue:
+        exam_venue = _allocate_exam_venue(
             exam,
-            required_caps,
-            target_start,
-            target_length,
-            require_accessible=needs_accessible,
-            preferred_venue=preferred_venue,
-            allowed_venue_types=allowed_venue_types,
+            list(target.required_caps),
+            target.start_time,
+            target.exam_length,
+            require_accessible=target.require_accessible,
+            preferred_venue=target.preferred_venue,
+            allow_same_exam_overlap=target.allow_same_exam_overlap,
+            allowed_venue_types=target.allowed_venue_types,
+            exam_venues=exam_venues,
+            context=context,
         )
-        if (
-            allowed_venue_types is not None
-            and exam_venue
-            and exam_venue.venue
-            and exam_venue.venue.venuetype not in allowed_venue_types
-        ):
-            exam_venue = None
-        if not exam_venue:
-            exam_venue = _allocate_exam_venue(
-                exam,
-                required_caps,
-                target_start,
-                target_length,
-                require_accessible=needs_accessible,
-                preferred_venue=preferred_venue,
-                allow_same_exam_overlap=allow_same_exam_overlap,
-                allowed_venue_types=allowed_venue_types,
-            )
 
-        if exam_venue:
-            updates = []
-            if target_start and exam_venue.start_time != target_start:
-                exam_venue.start_time = target_start
-                updates.append("start_time")
-            if target_length is not None and exam_venue.exam_length != target_length:
-                exam_venue.exam_length = target_length
-                updates.append("exam_length")
-            existing_caps = exam_venue.provision_capabilities or []
-            if required_caps and not all(cap in existing_caps for cap in required_caps):
-                exam_venue.provision_capabilities = sorted(set(existing_caps + required_caps))
-                updates.append("provision_capabilities")
-            if updates:
-                exam_venue.save(update_fields=updates)
+    if not exam_venue:
+        return None, []
+    return exam_venue, _apply_provision_target(exam_venue, target)
 
-        if exam_venue and student_exam.exam_venue_id != exam_venue.pk:
-            student_exam.exam_venue = exam_venue
-            student_exam.save(update_fields=["exam_venue"])
+
+_PROVISION_KEY_COLUMNS = ("student_id", "mock_ids", "id", "exam_code", "course_code")
+
+
+@transaction.atomic
+def _import_provision_rows_bulk(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Batched variant of _import_provision_rows.
+
+    Exams, their ExamVenue rows and existing Student/Provisions/StudentExam rows
+    are resolved up front in a handful of queries. Rows are then processed in
+    file order against those in-memory maps, provision rooms are allocated for
+    the whole upload at once (see _ProvisionAllocator), and everything is
+    written back in bulk.
+    """
+    rows_list = _sized_rows(rows)
+    summary = _base_summary(len(rows_list))
+
+    def _row_keys(raw: Dict[str, Any]) -> tuple[str, str]:
+        student_id = _clean_string(
+            raw.get("student_id") or raw.get("mock_ids") or raw.get("id"),
+            max_length=255,
+        )
+        exam_code = _clean_string(raw.get("exam_code") or raw.get("course_code"), max_length=30)
+        return student_id, exam_code
+
+    key_rows = rows_list
+    if isinstance(rows_list, RowBatch):
+        # Only the key columns are needed for the lookups; skip building full rows.
+        key_rows = rows_list.project(_PROVISION_KEY_COLUMNS)
+    keys = [_row_keys(raw) for raw in key_rows]
+    student_ids = {student_id for student_id, _ in keys if student_id}
+    exam_codes = {exam_code for _, exam_code in keys if exam_code}
+
+    exams_by_code: Dict[str, Exam] = {}
+    for exam in Exam.objects.filter(course_code__in=exam_codes).order_by("pk"):
+        exams_by_code.setdefault(exam.course_code, exam)
+    exam_ids = [exam.pk for exam in exams_by_code.values()]
+    context = AllocationContext.load()
+
+    exam_venues: Dict[int, List[ExamVenue]] = defaultdict(list)
+    for ev in (
+        ExamVenue.objects.filter(exam_id__in=exam_ids).select_related("venue").order_by("pk")
+    ):
+        exam_venues[ev.exam_id].append(ev)
+
+    students: Dict[str, Student] = Student.objects.in_bulk(list(student_ids))
+    provisions_by_key: Dict[tuple, Provisions] = {}
+    for provision in Provisions.objects.filter(
+        student_id__in=student_ids, exam_id__in=exam_ids
+    ).order_by("pk"):
+        provisions_by_key.setdefault((provision.student_id, provision.exam_id), provision)
+    student_exams: Dict[tuple, StudentExam] = {
+        (se.student_id, se.exam_id): se
+        for se in StudentExam.objects.filter(student_id__in=student_ids, exam_id__in=exam_ids)
+    }
+
+    new_students: Dict[str, Student] = {}
+    changed_students: Dict[str, Student] = {}
+    new_provisions: List[Provisions] = []
+    changed_provisions: Dict[int, Provisions] = {}
+    new_student_exams: List[StudentExam] = []
+    changed_student_exams: Dict[int, StudentExam] = {}
+    # The last row for a student/exam pair decides their provisions.
+    placements: Dict[tuple, tuple] = {}
+
+    for idx, (raw, (student_id, exam_code)) in enumerate(zip(rows_list, keys), start=1):
+        if not student_id:
+            summary["skipped"] += 1
+            summary["errors"].append(f"Row {idx}: Missing student_id.")
+            continue
+        if not exam_code:
+            summary["skipped"] += 1
+            summary["errors"].append(f"Row {idx}: Missing exam_code.")
+            continue
+        exam = exams_by_code.get(exam_code)
+        if exam is None:
+            summary["skipped"] += 1
+            summary["errors"].append(f"Row {idx}: Exam with code '{exam_code}' not found.")
+            continue
+
+        student_name = _clean_string(raw.get("student_name"), max_length=255) or student_id
+        student = students.get(student_id)
+        if student is None:
+            student = Student(student_id=student_id, student_name=student_name)
+            students[student_id] = student
+            new_students[student_id] = student
+        else:
+            student.student_name = student_name
+            if student_id not in new_students:
+                changed_students[student_id] = student
+
+        provisions = _normalize_provisions(raw.get("provisions"))
+        notes = _clean_string(raw.get("additional_info") or raw.get("notes"), max_length=200)
+
+        key = (student_id, exam.pk)
+        provision_obj = provisions_by_key.get(key)
+        created = provision_obj is None
+        if created:
+            provision_obj = Provisions(student=student, exam=exam)
+            provisions_by_key[key] = provision_obj
+            new_provisions.append(provision_obj)
+        elif provision_obj.pk:
+            changed_provisions[provision_obj.pk] = provision_obj
+        provision_obj.provisions = provisions
+        provision_obj.notes = notes or None
+
+        student_exam = student_exams.get(key)
+        if student_exam is None:
+            student_exam = StudentExam(student=student, exam=exam)
+            student_exams[key] = student_exam
+            new_student_exams.append(student_exam)
+
+        placements[key] = (student_exam, exam, provisions)
 
         if created:
             summary["created"] += 1
         else:
             summary["updated"] += 1
 
+    Student.objects.bulk_create(new_students.values(), batch_size=BULK_BATCH_SIZE)
+    if changed_students:
+        Student.objects.bulk_update(
+            changed_students.values(), fields=["student_name"], batch_size=BULK_BATCH_SIZE
+        )
+    Provisions.objects.bulk_create(new_provisions, batch_size=BULK_BATCH_SIZE)
+    if changed_provisions:
+        Provisions.objects.bulk_update(
+            changed_provisions.values(), fields=["provisions", "notes"], batch_size=BULK_BATCH_SIZE
+        )
+    allocator = _ProvisionAllocator(exam_venues, context)
+    groups = [
+        allocator.add(exam, provisions, student_exam.exam_venue_id)
+        for student_exam, exam, provisions in placements.values()
+    ]
+    with metrics.stage_timer("allocate", "Provisions"):
+        allocator.allocate()
+        allocator.flush()
+    for (student_exam, _, _), group in zip(placements.values(), groups):
+        exam_venue = allocator.take(group, student_exam.exam_venue_id)
+        if exam_venue and student_exam.exam_venue_id != exam_venue.pk:
+            student_exam.exam_venue = exam_venue
+            if student_exam.pk:
+                changed_student_exams[student_exam.pk] = student_exam
+    StudentExam.objects.bulk_create(new_student_exams, batch_size=BULK_BATCH_SIZE)
+    if changed_student_exams:
+        StudentExam.objects.bulk_update(
+            changed_student_exams.values(), fields=["exam_venue"], batch_size=BULK_BATCH_SIZE
+        )
+
     return summary
 
+
+class _ProvisionAllocator:
+    """
+    Allocates provision rooms for a whole upload at once.
+
+    Students are grouped by exam and _ProvisionTarget; a group sits together
+    unless no single room has the seats for it. Groups an existing room
+    already serves are settled first. The rest are placed tightest first
+    (fewest venues that could host them), each taking the free venue that the
+    fewest still-open groups could also use, so scarce rooms are not spent on
+    students who had other options. A group left with no free venue tries to
+    move a room opened earlier in the batch to another venue to make space,
+    and only then falls back to a placeholder. Seat counts come from the
+    AllocationContext, so no room is filled past its capacity. Planning runs
+    in memory; flush() writes new and changed ExamVenue rows in bulk.
+    """
+
+    def __init__(self, exam_venues: Dict[int, List[ExamVenue]], context: AllocationContext):
+        self.by_exam = exam_venues
+        self.context = context
+        self.exams: Dict[int, Exam] = {}
+        self.sizes: Dict[tuple, int] = {}  # (exam_id, target) -> students, in first-seen order
+        self.remaining: Dict[tuple, int] = {}
+        self.fits: Dict[tuple, List[Venue]] = {}
+        self.seats: Dict[tuple, List[list]] = defaultdict(list)  # [exam_venue, count] per room
+        self.owners: Dict[int, List[tuple]] = defaultdict(list)
+        self.demand: Dict[str, int] = defaultdict(int)
+        self.created: List[ExamVenue] = []
+        # venue_name (None for placeholders) -> rooms in self.created booked there
+        self.created_in: Dict[Optional[str], List[ExamVenue]] = defaultdict(list)
+        self.dirty: Dict[int, ExamVenue] = {}
+        self.dirty_fields: set = set()
+        self._targets: Dict[tuple, _ProvisionTarget] = {}
+
+    def add(self, exam: Exam, provisions: List[str], exam_venue_id: Optional[int] = None) -> tuple:
+        """
+        Register a student sitting exam, currently seated in exam_venue_id
+        (if any); returns the key of their group.
+        """
+        cache_key = (exam.pk, tuple(provisions or ()))
+        target = self._targets.get(cache_key)
+        if target is None:
+            target = _provision_target(exam, provisions, exam_venues=self.by_exam[exam.pk])
+            self._targets[cache_key] = target
+        self.exams.setdefault(exam.pk, exam)
+        self.context.unseat(exam_venue_id)
+        key = (exam.pk, target)
+        self.sizes[key] = self.sizes.get(key, 0) + 1
+        return key
+
+    def take(self, key: tuple, exam_venue_id: Optional[int] = None) -> Optional[ExamVenue]:
+        """The ExamVenue for one student of the group, keeping exam_venue_id if it has a seat."""
+        seats = self.seats.get(key)
+        if not seats:
+            return None
+        pos = next((i for i, (ev, _) in enumerate(seats) if ev.pk and ev.pk == exam_venue_id), 0)
+        exam_venue = seats[pos][0]
+        seats[pos][1] -= 1
+        if seats[pos][1] <= 0:
+            del seats[pos]
+        return exam_venue
+
+    def allocate(self) -> None:
+        self.remaining = dict(self.sizes)
+        open_keys = []
+        for key in self.sizes:
+            self._seat_in_existing(key)
+            if self.remaining[key]:
+                open_keys.append(key)
+
+        for key in open_keys:
+            self.fits[key] = self._fitting_venues(key)
+            for venue in self.fits[key]:
+                self.demand[venue.venue_name] += 1
+        # Stable sort: equally tight groups keep file order.
+        open_keys.sort(key=lambda key: len(self.fits[key]))
+
+        unplaced = []
+        for key in open_keys:
+            for venue in self.fits[key]:
+                self.demand[venue.venue_name] -= 1
+            # A room opened for an earlier group may already suit this one.
+            self._seat_in_existing(key)
+            while self.remaining[key]:
+                free = self._free_venues(key)
+                if free:
+                    self._assign(key, self._open(key, free[0]), self._room(key, free[0]))
+                    continue
+                exam_venue = self._make_room(key)
+                if not exam_venue:
+                    unplaced.append(key)
+                    break
+                self._assign(key, exam_venue, self._room(key, exam_venue.venue))
+        if unplaced:
+            metrics.inc(
+                "timetabling_allocation_failures_total", sum(self.remaining[key] for key in unplaced)
+            )
+        for key in unplaced:
+            self._assign(key, self._placeholder(key), None)
+
+    def flush(self) -> None:
+        ExamVenue.objects.bulk_create(self.created, batch_size=BULK_BATCH_SIZE)
+        if self.dirty:
+            ExamVenue.objects.bulk_update(
+                self.dirty.values(), fields=sorted(self.dirty_fields), batch_size=BULK_BATCH_SIZE
+            )
+
+    def _seat_in_existing(self, key: tuple) -> None:
+        while self.remaining[key]:
+            exam_venue = self._match(key, placeholders=False)
+            if not exam_venue:
+                return
+            self._assign(key, exam_venue, self._room(key, exam_venue.venue))
+
+    def _match(self, key: tuple, *, placeholders: bool) -> Optional[ExamVenue]:
+        exam_id, target = key
+        return _find_matching_exam_venue(
+            self.exams[exam_id],
+            list(target.required_caps),
+            target.start_time,
+            target.exam_length,
+            require_accessible=target.require_accessible,
+            preferred_venue=target.preferred_venue,
+            allowed_venue_types=target.allowed_venue_types,
+            exam_venues=[ev for ev in self.by_exam[exam_id] if (ev.venue_id is None) == placeholders],
+            context=self.context,
+        )
+
+    def _room(self, key: tuple, venue: Venue) -> Optional[int]:
+        """Free seats for the group in venue over its slot (None: no limit)."""
+        exam_id, target = key
+        return self.context.free_seats(venue, target.start_time, target.exam_length, exam_id)
+
+    def _preferred(self, key: tuple) -> List[Venue]:
+        exam_id, target = key
+        core_venues = [ev.venue for ev in self.by_exam[exam_id] if ev.core and ev.venue_id]
+        return [target.preferred_venue] + core_venues if target.preferred_venue else core_venues
+
+    def _fitting_venues(self, key: tuple) -> List[Venue]:
+        """Venues that could host the group if they were free, in allocation order."""
+        exam_id, target = key
+        candidate_order = self._preferred(key) + self.context.candidates(
+            allowed_venue_types=target.allowed_venue_types,
+            required_caps=target.required_caps,
+            require_accessible=target.require_accessible,
+        )
+        venues: List[Venue] = []
+        seen_names = set()
+        for venue in candidate_order:
+            if venue.venue_name in seen_names:
+                continue
+            seen_names.add(venue.venue_name)
+            if _venue_fits(
+                venue,
+                self.exams[exam_id],
+                target.required_caps,
+                target.start_time,
+                target.exam_length,
+                require_accessible=target.require_accessible,
+                allowed_venue_types=target.allowed_venue_types,
+            ):
+                venues.append(venue)
+        return venues
+
+    def _free_venues(self, key: tuple, exclude: Optional[str] = None, seats: int = 1) -> List[Venue]:
+        """
+        Fitting venues with no clashing booking and at least seats seats left:
+        the exam's own venues first, then ones that seat the rest of the group
+        together, each in order of least contested.
+        """
+        exam_id, target = key
+        preferred = {venue.venue_name for venue in self._preferred(key)}
+        ranked = []
+        for venue in self.fits[key]:
+            if venue.venue_name == exclude or self.context.has_conflict(
+                venue,
+                target.start_time,
+                target.exam_length,
+                ignore_exam_id=exam_id,
+                allow_same_exam_overlap=target.allow_same_exam_overlap,
+            ):
+                continue
+            room = self._room(key, venue)
+            if room is not None and room < seats:
+                continue
+            if venue.venue_name in preferred:
+                rank = (0, False, 0)
+            else:
+                splits_group = room is not None and room < self.remaining.get(key, 0)
+                rank = (1, splits_group, self.demand[venue.venue_name])
+            ranked.append((rank, venue))
+        # Stable sort: equal ranks keep catalog order.
+        ranked.sort(key=lambda item: item[0])
+        return [venue for _, venue in ranked]
+
+    def _open(self, key: tuple, venue: Venue) -> ExamVenue:
+        exam_id, target = key
+        exam_venues = self.by_exam[exam_id]
+        # A placeholder nobody in this upload sits in becomes the real booking.
+        placeholder = next(
+            (ev for ev in exam_venues if ev.venue_id is None and not self.owners[id(ev)]), None
+        )
+        if placeholder:
+            self._set_venue(placeholder, venue)
+            return placeholder
+        existing = next(
+            (
+                ev for ev in exam_venues
+                if ev.venue_id == venue.pk
+                and ev.start_time == target.start_time
+                and ev.exam_length == target.exam_length
+            ),
+            None,
+        )
+        return existing or self._create(key, venue)
+
+    def _make_room(self, key: tuple) -> Optional[ExamVenue]:
+        """
+        Free a fitting venue by moving a room opened earlier in this batch,
+        held by a single group, to another venue that group can use.
+        """
+        exam_id, target = key
+        for venue in self.fits[key]:
+            movable = [ev for ev in self.created_in[venue.venue_name] if len(self.owners[id(ev)]) == 1]
+            for exam_venue in movable:
+                self.context.release(exam_venue, venue.venue_name)
+                if not self.context.has_conflict(
+                    venue,
+                    target.start_time,
+                    target.exam_length,
+                    ignore_exam_id=exam_id,
+                    allow_same_exam_overlap=target.allow_same_exam_overlap,
+                ) and self._room(key, venue) != 0:
+                    alternatives = self._free_venues(
+                        self.owners[id(exam_venue)][0],
+                        exclude=venue.venue_name,
+                        seats=self.context.seats_in(exam_venue),
+                    )
+                    if alternatives:
+                        self._set_venue(exam_venue, alternatives[0])
+                        return self._open(key, venue)
+                self.context.book(exam_venue)
+        return None
+
+    def _placeholder(self, key: tuple) -> ExamVenue:
+        exam_id, _ = key
+        matched = self._match(key, placeholders=True)
+        if matched:
+            return matched
+        unused = next(
+            (ev for ev in self.by_exam[exam_id] if ev.venue_id is None and not self.owners[id(ev)]),
+            None,
+        )
+        return unused or self._create(key, None)
+
+    def _create(self, key: tuple, venue: Optional[Venue]) -> ExamVenue:
+        exam_id, target = key
+        exam_venue = ExamVenue(
+            exam=self.exams[exam_id],
+            venue=venue,
+            start_time=target.start_time,
+            exam_length=target.exam_length,
+            provision_capabilities=list(target.required_caps),
+        )
+        self.created.append(exam_venue)
+        self.created_in[venue.venue_name if venue else None].append(exam_venue)
+        self.by_exam[exam_id].append(exam_venue)
+        return exam_venue
+
+    def _set_venue(self, exam_venue: ExamVenue, venue: Venue) -> None:
+        bucket = self.created_in.get(exam_venue.venue_id)
+        if bucket and any(ev is exam_venue for ev in bucket):
+            bucket.remove(exam_venue)
+            self.created_in[venue.venue_name].append(exam_venue)
+        exam_venue.venue = venue
+        self.context.book(exam_venue)
+        if exam_venue.pk:
+            self.dirty[exam_venue.pk] = exam_venue
+            self.dirty_fields.add("venue")
+
+    def _assign(self, key: tuple, exam_venue: ExamVenue, room: Optional[int]) -> None:
+        """Seat as many of the group's remaining students in exam_venue as room allows."""
+        _, target = key
+        count = self.remaining[key] if room is None else min(room, self.remaining[key])
+        updates = _apply_provision_target(exam_venue, target)
+        if updates and exam_venue.pk:
+            self.dirty[exam_venue.pk] = exam_venue
+            self.dirty_fields.update(updates)
+        # Re-book so the venue's index carries the final timing.
+        self.context.book(exam_venue)
+        self.context.seat(exam_venue, count)
+        if key not in self.owners[id(exam_venue)]:
+            self.owners[id(exam_venue)].append(key)
+        self.seats[key].append([exam_venue, count])
+        self.remaining[key] -= count
+
+
 def _create_provision_exam_venues():
     provision_list = Provisions.objects.all()
     for provision in provision_list:
@@ -655,11 +1268,16 @@ def _find_matching_exam_venue(
     require_accessible: bool = False,
     preferred_venue: Optional[Venue] = None,
     allowed_venue_types: Optional[set] = None,
+    exam_venues: Optional[List[ExamVenue]] = None,
+    context: Optional[AllocationContext] = None,
 ) -> Optional[ExamVenue]:
     if not exam:
         return None
 
-    evs = list(ExamVenue.objects.filter(exam=exam).select_related("venue"))
+    if exam_venues is not None:
+        evs = list(exam_venues)
+    else:
+        evs = list(ExamVenue.objects.filter(exam=exam).select_related("venue"))
 
     def _matches(ev: ExamVenue) -> bool:
         if ev.venue:
@@ -669,6 +1287,10 @@ def _find_matching_exam_venue(
                 return False
             if allowed_venue_types is not None and ev.venue.venuetype not in allowed_venue_types:
                 return False
+            if context is not None and context.free_seats(
+                ev.venue, ev.start_time, ev.exam_length, exam.pk
+            ) == 0:
+                return False
         else:
             placeholder_caps = ev.provision_capabilities or []
             if required_caps and not all(cap in placeholder_caps for cap in required_caps):
@@ -691,6 +1313,44 @@ def _find_matching_exam_venue(
     return None
 
 
+def _venue_fits(
+    venue: Venue,
+    exam: Exam,
+    required_caps: Sequence[str],
+    target_start: Optional[datetime],
+    target_length: Optional[int],
+    *,
+    require_accessible: bool = False,
+    allowed_venue_types: Optional[Iterable[str]] = None,
+    allow_same_exam_overlap: bool = False,
+    has_conflict=None,
+) -> bool:
+    """
+    True when venue can host the slot: type, capabilities, accessibility and
+    availability all match, and (when has_conflict is given) nothing else is
+    booked there at that time.
+    """
+    if allowed_venue_types is not None and venue.venuetype not in allowed_venue_types:
+        return False
+    if required_caps and not venue_supports_caps(venue, required_caps):
+        return False
+    if require_accessible and not venue.is_accessible:
+        return False
+    if not venue_is_available(venue, target_start):
+        return False
+    exam_date = getattr(exam, "date_exam", None)
+    availability = venue.availability or []
+    if exam_date and availability and exam_date.isoformat() not in availability:
+        return False
+    return has_conflict is None or not has_conflict(
+        venue,
+        target_start,
+        target_length,
+        ignore_exam_id=exam.exam_id,
+        allow_same_exam_overlap=allow_same_exam_overlap,
+    )
+
+
 def _allocate_exam_venue(
     exam: Exam,
     required_caps: List[str],
@@ -701,20 +1361,19 @@ def _allocate_exam_venue(
     preferred_venue: Optional[Venue] = None,
     allow_same_exam_overlap: bool = False,
     allowed_venue_types: Optional[set] = None,
+    exam_venues: Optional[List[ExamVenue]] = None,
+    context: Optional[AllocationContext] = None,
 ) -> Optional[ExamVenue]:
+    """
+    Pick a venue for the slot, reusing the exam's placeholder or matching
+    ExamVenue where possible. When exam_venues (the exam's rows in pk order)
+    is supplied, lookups use it and any new row is appended to it. With a
+    context, candidates and conflicts come from the in-memory catalog, venues
+    with no seat left are skipped, and the chosen booking is recorded there.
+    """
     if not exam:
         return None
 
-    exam_date = getattr(exam, "date_exam", None)
-    iso_date = exam_date.isoformat() if exam_date else None
-    requires_separate_room = any(
-        cap in required_caps
-        for cap in (
-            ExamVenueProvisionType.SEPARATE_ROOM_ON_OWN,
-            ExamVenueProvisionType.SEPARATE_ROOM_NOT_ON_OWN,
-        )
-    )
-
     def _merge_caps(ev: ExamVenue) -> List[str]:
         existing = ev.provision_capabilities or []
         merged = sorted(set(existing + (required_caps or [])))
@@ -727,39 +1386,66 @@ def _allocate_exam_venue(
         candidate_order.append(preferred_venue)
 
     # Prefer the venue(s) already linked to the core exam venue rows.
-    core_venues = [
-        ev.venue for ev in exam.examvenue_set.select_related("venue").filter(core=True, venue__isnull=False)
-    ]
+    if exam_venues is not None:
+        core_venues = [ev.venue for ev in exam_venues if ev.core and ev.venue_id]
+    else:
+        core_venues = [
+            ev.venue for ev in exam.examvenue_set.select_related("venue").filter(core=True, venue__isnull=False)
+        ]
     candidate_order.extend(core_venues)
-    candidate_order.extend(list(Venue.objects.all()))
+    if context is not None:
+        candidate_order.extend(
+            context.candidates(
+                allowed_venue_types=allowed_venue_types,
+                required_caps=required_caps,
+                require_accessible=require_accessible,
+            )
+        )
+        has_conflict = context.has_conflict
+    else:
+        candidate_order.extend(list(Venue.objects.all()))
+        has_conflict = venue_has_timing_conflict
 
     seen_names = set()
     for venue in candidate_order:
         if not venue or venue.venue_name in seen_names:
             continue
         seen_names.add(venue.venue_name)
-        if allowed_venue_types is not None and venue.venuetype not in allowed_venue_types:
-            continue
-        if required_caps and not venue_supports_caps(venue, required_caps):
-            continue
-        if require_accessible and not venue.is_accessible:
-            continue
-        if not venue_is_available(venue, target_start):
-            continue
-        if venue_has_timing_conflict(
+        if _venue_fits(
             venue,
+            exam,
+            required_caps,
             target_start,
             target_length,
-            ignore_exam_id=exam.exam_id,
+            require_accessible=require_accessible,
+            allowed_venue_types=allowed_venue_types,
             allow_same_exam_overlap=allow_same_exam_overlap,
+            has_conflict=has_conflict,
         ):
-            continue
-        availability = venue.availability or []
-        if iso_date and availability and iso_date not in availability:
-            continue
-        candidates.append(venue)
+            if context is not None and context.free_seats(
+                venue, target_start, target_length, exam.pk
+            ) == 0:
+                continue
+            candidates.append(venue)
+
+    if exam_venues is not None:
+        placeholder = next((ev for ev in exam_venues if ev.venue_id is None), None)
+    else:
+        placeholder = ExamVenue.objects.filter(exam=exam, venue__isnull=True).first()
 
-    placeholder = ExamVenue.objects.filter(exam=exam, venue__isnull=True).first()
+    def _create(venue: Optional[Venue]) -> ExamVenue:
+        exam_venue = ExamVenue.objects.create(
+            exam=exam,
+            venue=venue,
+            start_time=target_start,
+            exam_length=target_length,
+            provision_capabilities=required_caps,
+        )
+        if exam_venues is not None:
+            exam_venues.append(exam_venue)
+        if context is not None:
+            context.book(exam_venue)
+        return exam_venue
 
     if not candidates:
         if placeholder:
@@ -778,13 +1464,7 @@ def _allocate_exam_venue(
                 placeholder.save(update_fields=updates)
             return placeholder
 
-        return ExamVenue.objects.create(
-            exam=exam,
-            venue=None,
-            start_time=target_start,
-            exam_length=target_length,
-            provision_capabilities=required_caps,
-        )
+        return _create(None)
 
     selected = candidates[0]
     if placeholder:
@@ -801,14 +1481,27 @@ def _allocate_exam_venue(
             placeholder.exam_length = target_length
             updates.append("exam_length")
         placeholder.save(update_fields=updates)
+        if context is not None:
+            context.book(placeholder)
         return placeholder
 
-    existing = ExamVenue.objects.filter(
-        exam=exam,
-        venue=selected,
-        start_time=target_start,
-        exam_length=target_length,
-    ).first()
+    if exam_venues is not None:
+        existing = next(
+            (
+                ev for ev in exam_venues
+                if ev.venue_id == selected.pk
+                and ev.start_time == target_start
+                and ev.exam_length == target_length
+            ),
+            None,
+        )
+    else:
+        existing = ExamVenue.objects.filter(
+            exam=exam,
+            venue=selected,
+            start_time=target_start,
+            exam_length=target_length,
+        ).first()
 
     if existing:
         merged = _merge_caps(existing)
@@ -817,13 +1510,7 @@ def _allocate_exam_venue(
             existing.save(update_fields=["provision_capabilities"])
         return existing
 
-    return ExamVenue.objects.create(
-        exam=exam,
-        venue=selected,
-        start_time=target_start,
-        exam_length=target_length,
-        provision_capabilities=required_caps,
-    )
+    return _create(selected)
 
 
 def _create_exam_venue_links(
@@ -935,6 +1622,474 @@ def _create_exam_venue_links(
             exam_venue.save(update_fields=updates)
 
 
+BULK_BATCH_SIZE = 500
+
+
+@transaction.atomic
+def _import_exam_rows_bulk(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Set-based variant of _import_exam_rows.
+
+    Existing exams, venues and their ExamVenue rows are fetched up front,
+    reconciled in memory in file order (so conflict and placeholder handling
+    matches the per-row path) and written back with batched inserts/updates.
+    """
+    rows_list = _sized_rows(rows)
+    summary = _base_summary(len(rows_list))
+
+    parsed: List[tuple] = []
+    for idx, raw in enumerate(rows_list, start=1):
+        try:
+            payload = _build_exam_payload(raw)
+        except ValueError as exc:
+            summary["skipped"] += 1
+            summary["errors"].append(f"Row {idx}: {exc}")
+            continue
+        # Keep what later passes need, not the row dict itself.
+        parsed.append((_extract_venue_names(raw), payload))
+
+    if not parsed:
+        return summary
+
+    exams_by_code: Dict[str, Exam] = {}
+    codes = {payload["course_code"] for _, payload in parsed}
+    for exam in Exam.objects.filter(course_code__in=codes).order_by("pk"):
+        exams_by_code.setdefault(exam.course_code, exam)
+
+    new_exams: Dict[str, Exam] = {}
+    changed_exams: Dict[str, Exam] = {}
+    for _, payload in parsed:
+        code = payload["course_code"]
+        exam = exams_by_code.get(code)
+        if exam is None:
+            exam = Exam(course_code=code, **payload["defaults"])
+            exams_by_code[code] = exam
+            new_exams[code] = exam
+            summary["created"] += 1
+            continue
+        for field, value in payload["defaults"].items():
+            setattr(exam, field, value)
+        if code not in new_exams:
+            changed_exams[code] = exam
+        summary["updated"] += 1
+
+    Exam.objects.bulk_create(new_exams.values(), batch_size=BULK_BATCH_SIZE)
+    if changed_exams:
+        Exam.objects.bulk_update(
+            changed_exams.values(),
+            fields=list(parsed[0][1]["defaults"].keys()),
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+    venue_names = {name for names, _ in parsed for name in names}
+    venues: Dict[str, Venue] = Venue.objects.in_bulk(list(venue_names))
+    new_venues = [
+        Venue(
+            venue_name=name,
+            capacity=0,
+            venuetype=VenueType.SCHOOL_TO_SORT,
+            is_accessible=True,
+            qualifications=[],
+        )
+        for name in sorted(venue_names - venues.keys())
+    ]
+    Venue.objects.bulk_create(new_venues, batch_size=BULK_BATCH_SIZE)
+    venues.update({venue.venue_name: venue for venue in new_venues})
+
+    linker = _ExamVenueLinker(
+        ExamVenue.objects.filter(
+            Q(exam_id__in=[exam.pk for exam in exams_by_code.values()])
+            | Q(venue_id__in=list(venue_names))
+        ).order_by("pk")
+    )
+    for names, payload in parsed:
+        linker.link(
+            exams_by_code[payload["course_code"]],
+            [venues[name] for name in names],
+            start_time=payload["start_time"],
+            exam_length=payload["exam_length"],
+        )
+    linker.flush()
+
+    # bulk_create skips post_save, so queue the placeholder upgrade the signal would have.
+    for venue in new_venues:
+        schedule_placeholder_attach(venue)
+
+    return summary
+
+
+class _ExamVenueLinker:
+    """
+    In-memory equivalent of _create_exam_venue_links for a whole upload.
+
+    Keeps ExamVenue rows in a booking index per venue (for conflict checks) and
+    listed by exam (for placeholder/existing-link lookups); changes are written
+    by flush().
+    """
+
+    LINK_FIELDS = ["venue", "start_time", "exam_length", "core"]
+
+    def __init__(self, exam_venues: Iterable[ExamVenue]):
+        self.by_venue: Dict[str, VenueBookingIndex] = defaultdict(VenueBookingIndex)
+        self.by_exam: Dict[int, List[ExamVenue]] = defaultdict(list)
+        self.created: List[ExamVenue] = []
+        self.dirty: Dict[int, ExamVenue] = {}
+        by_venue: Dict[str, List[ExamVenue]] = defaultdict(list)
+        for ev in exam_venues:
+            self.by_exam[ev.exam_id].append(ev)
+            if ev.venue_id:
+                by_venue[ev.venue_id].append(ev)
+        for name, bookings in by_venue.items():
+            self.by_venue[name] = VenueBookingIndex(bookings)
+
+    def link(
+        self,
+        exam: Exam,
+        venues: List[Venue],
+        *,
+        start_time: Optional[datetime] = None,
+        exam_length: Optional[int] = None,
+    ) -> None:
+        seen = set()
+        for venue in venues:
+            if venue.venue_name in seen:
+                continue
+            seen.add(venue.venue_name)
+
+            if not venue_is_available(venue, start_time):
+                # If the venue is not available on this date, fall back to a placeholder.
+                if not self._placeholder(exam):
+                    self._create(exam, None, start_time, exam_length)
+                continue
+
+            if self.by_venue[venue.venue_name].has_conflict(
+                start_time,
+                exam_length,
+                ignore_exam_id=exam.exam_id,
+            ):
+                # Conflict: create or update a placeholder so we do not double-book the room.
+                exam_venue = self._placeholder(exam) or self._linked(exam, venue)
+                if not exam_venue:
+                    self._create(exam, None, start_time, exam_length)
+                    continue
+                if exam_venue.venue_id is not None:
+                    self._set(exam_venue, "venue", None)
+                self._update_timing(exam_venue, start_time, exam_length)
+                if exam_venue.core is not True:
+                    self._set(exam_venue, "core", True)
+                continue
+
+            exam_venue = self._linked(exam, venue)
+            if not exam_venue:
+                self._create(exam, venue, start_time, exam_length)
+                continue
+            self._update_timing(exam_venue, start_time, exam_length)
+
+    def flush(self) -> None:
+        ExamVenue.objects.bulk_create(self.created, batch_size=BULK_BATCH_SIZE)
+        if self.dirty:
+            ExamVenue.objects.bulk_update(
+                self.dirty.values(), fields=self.LINK_FIELDS, batch_size=BULK_BATCH_SIZE
+            )
+
+    def _placeholder(self, exam: Exam) -> Optional[ExamVenue]:
+        return next((ev for ev in self.by_exam[exam.pk] if ev.venue_id is None), None)
+
+    def _linked(self, exam: Exam, venue: Venue) -> Optional[ExamVenue]:
+        return next(
+            (ev for ev in self.by_exam[exam.pk] if ev.venue_id == venue.venue_name),
+            None,
+        )
+
+    def _create(
+        self,
+        exam: Exam,
+        venue: Optional[Venue],
+        start_time: Optional[datetime],
+        exam_length: Optional[int],
+    ) -> None:
+        exam_venue = ExamVenue(
+            exam=exam,
+            venue=venue,
+            start_time=start_time,
+            exam_length=exam_length,
+            core=True,
+        )
+        self.created.append(exam_venue)
+        self.by_exam[exam.pk].append(exam_venue)
+        if venue:
+            self.by_venue[venue.venue_name].add(exam_venue)
+
+    def _update_timing(
+        self,
+        exam_venue: ExamVenue,
+        start_time: Optional[datetime],
+        exam_length: Optional[int],
+    ) -> None:
+        if start_time and exam_venue.start_time != start_time:
+            self._set(exam_venue, "start_time", start_time)
+        if exam_length is not None and exam_venue.exam_length != exam_length:
+            self._set(exam_venue, "exam_length", exam_length)
+
+    def _set(self, exam_venue: ExamVenue, field: str, value: Any) -> None:
+        booked_at = exam_venue.venue_id
+        if booked_at:
+            self.by_venue[booked_at].discard(exam_venue)
+        setattr(exam_venue, field, value)
+        if exam_venue.venue_id:
+            self.by_venue[exam_venue.venue_id].add(exam_venue)
+        if exam_venue.pk:
+            self.dirty[exam_venue.pk] = exam_venue
+
+
+@transaction.atomic
+def _import_exam_rows_incremental(rows: Iterable[Dict[str, Any]], *, prune: bool = False) -> Dict[str, Any]:
+    """
+    Diff an exam timetable against the current Exam/ExamVenue state and apply
+    only the differences.
+
+    Exams of the schools the upload covers that are missing from it are
+    listed under diff["missing"]. With prune=True they are deleted instead
+    (diff["removed"]), along with their bookings, student seats and
+    provisions; summary["deleted"] counts the rows removed per model. Only
+    the upload's schools are looked at, so one school's file never touches
+    another school's exams, and exams in DEFAULT_EXAM_SCHOOL are never
+    pruned since every upload without a school column shares it.
+    Venue linking runs only for added exams and exams whose slot moved (timing
+    changed, or a listed venue is not linked/placeheld at that timing, or a
+    core venue was dropped); stale core links of moved exams are deleted and
+    their students' provision allocations are redone against the new slot.
+    """
+    rows_list = _sized_rows(rows)
+    summary = _base_summary(len(rows_list))
+    diff: Dict[str, Any] = {
+        "added": [], "changed": [], "moved": [], "missing": [], "removed": [], "unchanged": 0
+    }
+    summary["diff"] = diff
+    summary["reallocated"] = 0
+
+    incoming: Dict[str, Dict[str, Any]] = {}
+    for idx, raw in enumerate(rows_list, start=1):
+        try:
+            payload = _build_exam_payload(raw)
+        except ValueError as exc:
+            summary["skipped"] += 1
+            summary["errors"].append(f"Row {idx}: {exc}")
+            continue
+        entry = incoming.setdefault(payload["course_code"], {"defaults": None, "links": []})
+        entry["defaults"] = payload["defaults"]
+        entry["links"].append(
+            (_extract_venue_names(raw), payload["start_time"], payload["exam_length"])
+        )
+
+    if not incoming:
+        return summary
+
+    schools = {entry["defaults"]["exam_school"] for entry in incoming.values()} - {DEFAULT_EXAM_SCHOOL}
+    exams_by_code: Dict[str, Exam] = {}
+    stale: List[Exam] = []
+    for exam in Exam.objects.filter(
+        Q(course_code__in=list(incoming)) | Q(exam_school__in=schools)
+    ).order_by("pk"):
+        if exam.course_code in incoming:
+            exams_by_code.setdefault(exam.course_code, exam)
+        else:
+            stale.append(exam)
+
+    exam_venues: Dict[int, List[ExamVenue]] = defaultdict(list)
+    for ev in ExamVenue.objects.filter(
+        exam_id__in=[exam.pk for exam in exams_by_code.values()]
+    ).order_by("pk"):
+        exam_venues[ev.exam_id].append(ev)
+
+    new_exams: List[Exam] = []
+    changed_exams: List[Exam] = []
+    moved_exams: List[Exam] = []
+    for code, entry in incoming.items():
+        exam = exams_by_code.get(code)
+        if exam is None:
+            exam = Exam(course_code=code, **entry["defaults"])
+            exams_by_code[code] = exam
+            new_exams.append(exam)
+            diff["added"].append(code)
+            continue
+
+        field_changed = any(
+            getattr(exam, field) != value for field, value in entry["defaults"].items()
+        )
+        if field_changed:
+            for field, value in entry["defaults"].items():
+                setattr(exam, field, value)
+            changed_exams.append(exam)
+            diff["changed"].append(code)
+        slot_moved = _exam_slot_moved(exam_venues[exam.pk], entry["links"])
+        if slot_moved:
+            moved_exams.append(exam)
+            diff["moved"].append(code)
+        if not (field_changed or slot_moved):
+            diff["unchanged"] += 1
+
+    summary["created"] = len(new_exams)
+    summary["updated"] = len({exam.pk for exam in changed_exams + moved_exams})
+
+    Exam.objects.bulk_create(new_exams, batch_size=BULK_BATCH_SIZE)
+    if changed_exams:
+        Exam.objects.bulk_update(
+            changed_exams,
+            fields=list(next(iter(incoming.values()))["defaults"].keys()),
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+    if stale and prune:
+        diff["removed"] = sorted({exam.course_code for exam in stale})
+        _, deleted = Exam.objects.filter(pk__in=[exam.pk for exam in stale]).delete()
+        summary["deleted"] = {
+            label.rsplit(".", 1)[-1]: count for label, count in sorted(deleted.items()) if count
+        }
+    elif stale:
+        diff["missing"] = sorted({exam.course_code for exam in stale})
+
+    # Core links to venues the upload no longer lists belong to the old slot.
+    dropped_links = [
+        ev.pk
+        for exam in moved_exams
+        for ev in _dropped_core_links(exam_venues[exam.pk], incoming[exam.course_code]["links"])
+    ]
+    if dropped_links:
+        ExamVenue.objects.filter(pk__in=dropped_links).delete()
+
+    to_link = new_exams + moved_exams
+    if to_link:
+        venue_names = {
+            name
+            for exam in to_link
+            for names, _, _ in incoming[exam.course_code]["links"]
+            for name in names
+        }
+        venues: Dict[str, Venue] = Venue.objects.in_bulk(list(venue_names))
+        new_venues = [
+            Venue(
+                venue_name=name,
+                capacity=0,
+                venuetype=VenueType.SCHOOL_TO_SORT,
+                is_accessible=True,
+                qualifications=[],
+            )
+            for name in sorted(venue_names - venues.keys())
+        ]
+        Venue.objects.bulk_create(new_venues, batch_size=BULK_BATCH_SIZE)
+        venues.update({venue.venue_name: venue for venue in new_venues})
+
+        linker = _ExamVenueLinker(
+            ExamVenue.objects.filter(
+                Q(exam_id__in=[exam.pk for exam in to_link]) | Q(venue_id__in=list(venue_names))
+            ).order_by("pk")
+        )
+        for exam in to_link:
+            for names, start_time, exam_length in incoming[exam.course_code]["links"]:
+                linker.link(
+                    exam,
+                    [venues[name] for name in names],
+                    start_time=start_time,
+                    exam_length=exam_length,
+                )
+        linker.flush()
+
+        # bulk_create skips post_save, so queue the placeholder upgrade the signal would have.
+        for venue in new_venues:
+            schedule_placeholder_attach(venue)
+
+    summary["reallocated"] = _reallocate_student_exams(moved_exams)
+    return summary
+
+
+def _dropped_core_links(exam_venues: List[ExamVenue], links: List[tuple]) -> List[ExamVenue]:
+    """Core bookings at venues the upload rows no longer list (rows without venues drop nothing)."""
+    listed = {name for names, _, _ in links for name in names}
+    if not listed:
+        return []
+    return [ev for ev in exam_venues if ev.core and ev.venue_id and ev.venue_id not in listed]
+
+
+def _exam_slot_moved(exam_venues: List[ExamVenue], links: List[tuple]) -> bool:
+    """
+    True when linking these upload rows would change the exam's venue rows:
+    a listed venue has no matching booking (nor a placeholder at that timing),
+    or a core venue booking is no longer listed.
+    """
+    def _timing_matches(ev: ExamVenue, start_time, exam_length) -> bool:
+        if start_time and ev.start_time != start_time:
+            return False
+        if exam_length is not None and ev.exam_length != exam_length:
+            return False
+        return True
+
+    placeholder = next((ev for ev in exam_venues if ev.venue_id is None), None)
+    for names, start_time, exam_length in links:
+        for name in names:
+            linked = next((ev for ev in exam_venues if ev.venue_id == name), None)
+            if linked and _timing_matches(linked, start_time, exam_length):
+                continue
+            if placeholder and _timing_matches(placeholder, start_time, exam_length):
+                continue
+            return True
+
+    return bool(_dropped_core_links(exam_venues, links))
+
+
+def _reallocate_student_exams(exams: List[Exam]) -> int:
+    """
+    Redo provision allocation for every student sitting these exams.
+
+    Provision rooms (non-core ExamVenue rows) were timed against the old slot,
+    so they are dropped and the students are allocated afresh, as one batch,
+    from their stored provisions. Returns the number of StudentExams resolved.
+    """
+    if not exams:
+        return 0
+    exams_by_id = {exam.pk: exam for exam in exams}
+    exam_ids = list(exams_by_id)
+
+    ExamVenue.objects.filter(exam_id__in=exam_ids, core=False).delete()
+    student_exams = list(StudentExam.objects.filter(exam_id__in=exam_ids).order_by("pk"))
+    if not student_exams:
+        return 0
+
+    context = AllocationContext.load()
+    exam_venues: Dict[int, List[ExamVenue]] = defaultdict(list)
+    for ev in ExamVenue.objects.filter(exam_id__in=exam_ids).select_related("venue").order_by("pk"):
+        exam_venues[ev.exam_id].append(ev)
+    provisions_by_key: Dict[tuple, List[str]] = {}
+    for provision in Provisions.objects.filter(exam_id__in=exam_ids).order_by("pk"):
+        provisions_by_key.setdefault((provision.student_id, provision.exam_id), provision.provisions or [])
+
+    allocator = _ProvisionAllocator(exam_venues, context)
+    groups = [
+        allocator.add(
+            exams_by_id[student_exam.exam_id],
+            provisions_by_key.get((student_exam.student_id, student_exam.exam_id), []),
+            student_exam.exam_venue_id,
+        )
+        for student_exam in student_exams
+    ]
+    with metrics.stage_timer("allocate", "Exam"):
+        allocator.allocate()
+        allocator.flush()
+
+    changed_student_exams: List[StudentExam] = []
+    for student_exam, group in zip(student_exams, groups):
+        exam_venue = allocator.take(group, student_exam.exam_venue_id)
+        if exam_venue and student_exam.exam_venue_id != exam_venue.pk:
+            student_exam.exam_venue = exam_venue
+            changed_student_exams.append(student_exam)
+
+    if changed_student_exams:
+        StudentExam.objects.bulk_update(
+            changed_student_exams, fields=["exam_venue"], batch_size=BULK_BATCH_SIZE
+        )
+    return len(student_exams)
+
+
 @transaction.atomic
 def _import_venue_days(days: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
     """
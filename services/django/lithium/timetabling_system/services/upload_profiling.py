@@ -0,0 +1,110 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+from django.urls import reverse
+
+from timetabling_system.models import UploadLog
+
+# Seconds between stack samples for the collapsed-stack output.
+SAMPLE_INTERVAL = 0.005
+
+PROFILE_KINDS = ("pstats", "collapsed")
+
+
+def is_profile_request(request) -> bool:
+    """True when a staff user asked for the upload to be profiled (?profile=1 or form field)."""
+    flag = request.GET.get("profile") or request.POST.get("profile") or ""
+    if str(flag).strip().lower() not in ("1", "true", "yes"):
+        return False
+    return bool(getattr(request.user, "is_staff", False))
+
+
+def profile_path(upload_log_id: int, kind: str) -> Path:
+    return Path(settings.UPLOAD_PROFILE_DIR) / f"upload-{upload_log_id}.{kind}"
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack every SAMPLE_INTERVAL into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class UploadProfile:
+    """
+    cProfile statistics plus sampled stacks for one upload request. Both
+    cover the code run inside upload_profile(); save() writes them out.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.sampler = _StackSampler(threading.get_ident())
+
+    def start(self):
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+
+    def save(self, upload_log_id: Optional[int]) -> Optional[Dict[str, str]]:
+        """
+        Write <id>.pstats and <id>.collapsed (flamegraph.pl / speedscope
+        input) for the UploadLog row and return their download links, or None
+        when the request never got as far as logging an import.
+        """
+        if not upload_log_id:
+            return None
+        directory = Path(settings.UPLOAD_PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.profiler.dump_stats(str(profile_path(upload_log_id, "pstats")))
+        with open(profile_path(upload_log_id, "collapsed"), "w") as handle:
+            for stack, count in self.sampler.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        UploadLog.objects.filter(pk=upload_log_id).update(has_profile=True)
+        url = reverse("api-upload-profile", args=[upload_log_id])
+        return {kind: f"{url}?kind={kind}" for kind in PROFILE_KINDS}
+
+
+@contextmanager
+def upload_profile(request) -> Iterator[Optional[UploadProfile]]:
+    """
+    Profile the block when is_profile_request(request), yielding the
+    UploadProfile (None otherwise). Call save() after the block with the
+    ingest summary's upload_log_id to keep the results.
+    """
+    if not is_profile_request(request):
+        yield None
+        return
+    profile = UploadProfile()
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
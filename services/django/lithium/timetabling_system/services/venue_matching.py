@@ -1,13 +1,13 @@
-from typing import Iterable, List, Optional
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 
-from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 
 from timetabling_system.models import (
     ExamVenue,
-    ExamVenueProvisionType,
-    StudentExam,
     Venue,
+    VenueType,
 )
 
 
@@ -33,12 +33,54 @@ def venue_has_timing_conflict(
     Return True if the venue already has another ExamVenue that overlaps the supplied slot.
     Exam with ID == ignore_exam_id is skipped (so a given exam can reuse its own slot);
     optionally allow overlaps for the same exam when allow_same_exam_overlap is True.
+
+    Answered by one EXISTS query on the indexed slot range, unless the venue's
+    bookings are already prefetched or the slot has no positive length (those
+    never get a range and keep the row-by-row rules).
     """
-    if not venue or not start_time or length_minutes is None:
+    if not venue:
+        return False
+    prefetched = getattr(venue, "_prefetched_objects_cache", {}).get("examvenue_set")
+    if prefetched is not None or (length_minutes is not None and length_minutes <= 0):
+        return bookings_have_timing_conflict(
+            venue.examvenue_set.all(),
+            start_time,
+            length_minutes,
+            ignore_exam_id=ignore_exam_id,
+            allow_same_exam_overlap=allow_same_exam_overlap,
+        )
+    if not start_time or length_minutes is None:
+        return False
+
+    # Bookings without timing have a NULL slot and never match &&.
+    target = DateTimeTZRange(start_time, start_time + timedelta(minutes=length_minutes), "[)")
+    overlapping = ExamVenue.objects.filter(venue=venue, slot__overlap=target)
+    if ignore_exam_id:
+        if allow_same_exam_overlap:
+            overlapping = overlapping.exclude(exam_id=ignore_exam_id)
+        else:
+            overlapping = overlapping.exclude(
+                exam_id=ignore_exam_id, start_time=start_time, exam_length=length_minutes
+            )
+    return overlapping.exists()
+
+
+def bookings_have_timing_conflict(
+    bookings: Iterable[ExamVenue],
+    start_time: Optional[datetime],
+    length_minutes: Optional[int],
+    ignore_exam_id: Optional[int] = None,
+    allow_same_exam_overlap: bool = False,
+) -> bool:
+    """
+    Same rules as venue_has_timing_conflict, applied to an already-loaded list of
+    ExamVenue rows for one venue (used by the bulk importers to avoid a query per check).
+    """
+    if not start_time or length_minutes is None:
         # Without timing info we cannot test overlap; allow allocation.
         return False
     target_end = start_time + timedelta(minutes=length_minutes)
-    for ev in venue.examvenue_set.all():
+    for ev in bookings:
         if ignore_exam_id and ev.exam_id == ignore_exam_id:
             if allow_same_exam_overlap:
                 # Explicitly allow overlap for the same exam (used for small extra-time cases).
@@ -58,6 +100,140 @@ def venue_has_timing_conflict(
     return False
 
 
+class VenueBookingIndex:
+    """
+    Sorted interval index over one venue's ExamVenue bookings.
+
+    Entries are kept ordered by start time alongside a running maximum of end
+    times, so an overlap query bisects to the last booking starting before the
+    slot ends and walks back only while earlier bookings can still reach it.
+    Bookings passed to the constructor are sorted once; add() and discard()
+    only touch the running maximum where the changed booking raised it.
+    Untimed bookings never conflict and are not indexed. Callers must discard()
+    a booking before changing its timing or venue and add() it again afterwards.
+    """
+
+    def __init__(self, bookings: Iterable[ExamVenue] = ()):
+        entries = sorted(
+            filter(None, (self._entry(exam_venue) for exam_venue in bookings)),
+            key=lambda entry: entry[0],
+        )
+        self._starts: List[datetime] = [entry[0] for entry in entries]
+        self._entries: List[tuple] = entries  # (start, end, length, exam_venue)
+        self._max_end: List[datetime] = []
+        self._indexed_start: Dict[object, datetime] = {}
+        running = None
+        for start, end, _, exam_venue in entries:
+            running = end if running is None or end > running else running
+            self._max_end.append(running)
+            for key in self._keys(exam_venue):
+                self._indexed_start[key] = start
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return (entry[3] for entry in self._entries)
+
+    def add(self, exam_venue: ExamVenue) -> None:
+        entry = self._entry(exam_venue)
+        if entry is None:
+            return
+        start, end = entry[0], entry[1]
+        pos = bisect_right(self._starts, start)
+        self._starts.insert(pos, start)
+        self._entries.insert(pos, entry)
+        previous = self._max_end[pos - 1] if pos > 0 else None
+        self._max_end.insert(pos, end if previous is None or end > previous else previous)
+        # Later maxima only change up to the first one already past this end.
+        for idx in range(pos + 1, len(self._max_end)):
+            if self._max_end[idx] >= end:
+                break
+            self._max_end[idx] = end
+        for key in self._keys(exam_venue):
+            self._indexed_start[key] = start
+
+    def discard(self, exam_venue: ExamVenue) -> None:
+        """Remove a booking (matched by identity, or by pk for reloaded rows)."""
+        start = next(
+            (self._indexed_start[key] for key in self._keys(exam_venue) if key in self._indexed_start),
+            None,
+        )
+        if start is None:
+            return
+        lo, hi = bisect_left(self._starts, start), bisect_right(self._starts, start)
+        for pos in range(lo, hi):
+            booked = self._entries[pos][3]
+            if booked is exam_venue or (exam_venue.pk and booked.pk == exam_venue.pk):
+                end = self._entries[pos][1]
+                previous = self._max_end[pos - 1] if pos > 0 else None
+                del self._starts[pos]
+                del self._entries[pos]
+                del self._max_end[pos]
+                if previous is None or end > previous:
+                    self._refresh_max_end(pos)
+                for key in self._keys(booked) + self._keys(exam_venue):
+                    self._indexed_start.pop(key, None)
+                return
+
+    def has_conflict(
+        self,
+        start_time: Optional[datetime],
+        length_minutes: Optional[int],
+        ignore_exam_id: Optional[int] = None,
+        allow_same_exam_overlap: bool = False,
+    ) -> bool:
+        """Same rules as venue_has_timing_conflict, answered from the index."""
+        for start, length, booked in self._overlapping(start_time, length_minutes):
+            if ignore_exam_id and booked.exam_id == ignore_exam_id:
+                if allow_same_exam_overlap:
+                    continue
+                if start == start_time and length == length_minutes:
+                    continue
+            return True
+        return False
+
+    def overlapping(self, start_time: Optional[datetime], length_minutes: Optional[int]):
+        """Yield the bookings that overlap the slot, latest start first."""
+        for _, _, booked in self._overlapping(start_time, length_minutes):
+            yield booked
+
+    def _overlapping(self, start_time: Optional[datetime], length_minutes: Optional[int]):
+        if not start_time or length_minutes is None:
+            return
+        target_end = start_time + timedelta(minutes=length_minutes)
+        pos = bisect_left(self._starts, target_end) - 1
+        while pos >= 0 and self._max_end[pos] > start_time:
+            start, end, length, booked = self._entries[pos]
+            pos -= 1
+            if end > start_time:
+                yield start, length, booked
+
+    @staticmethod
+    def _keys(exam_venue: ExamVenue) -> List[object]:
+        keys: List[object] = [id(exam_venue)]
+        if exam_venue.pk:
+            keys.append(("pk", exam_venue.pk))
+        return keys
+
+    @staticmethod
+    def _entry(exam_venue: ExamVenue) -> Optional[tuple]:
+        start, length = exam_venue.start_time, exam_venue.exam_length
+        if not start or length is None:
+            return None
+        return (start, start + timedelta(minutes=length), length, exam_venue)
+
+    def _refresh_max_end(self, pos: int) -> None:
+        """Recompute the running maximum from pos after the booking that set it was removed."""
+        running = self._max_end[pos - 1] if pos > 0 else None
+        for idx in range(pos, len(self._entries)):
+            end = self._entries[idx][1]
+            running = end if running is None or end > running else running
+            if self._max_end[idx] == running:
+                break  # unchanged from here on
+            self._max_end[idx] = running
+
+
 def venue_is_available(venue: Venue, start_time: Optional[datetime]) -> bool:
     """
     Return True if the venue is available on the date of start_time based on its availability list.
@@ -74,39 +250,14 @@ def venue_is_available(venue: Venue, start_time: Optional[datetime]) -> bool:
     return start_time.date().isoformat() in days
 
 
-@transaction.atomic
-def attach_placeholders_to_venue(venue: Venue) -> None:
+def venue_seat_limit(venue: Venue) -> Optional[int]:
     """
-    When a Venue gains provision capabilities, upgrade any placeholder ExamVenue
-    records (venue is NULL) that the room can now satisfy.
+    Seats the venue can hold, or None when unknown. Rooms created from
+    timetable/venue uploads default to capacity 0 and SCHOOL_TO_SORT until
+    someone fills them in, so neither is treated as a real limit.
     """
-    if not venue:
-        return
-
-    placeholders = ExamVenue.objects.select_related("exam").filter(venue__isnull=True)
-    for ev in placeholders:
-        required_caps = ev.provision_capabilities or []
-        if not venue_supports_caps(venue, required_caps):
-            continue
-        if ExamVenueProvisionType.ACCESSIBLE_HALL in required_caps and not venue.is_accessible:
-            continue
-        if not venue_is_available(venue, ev.start_time):
-            continue
-        if venue_has_timing_conflict(
-            venue, ev.start_time, ev.exam_length, ignore_exam_id=ev.exam_id
-        ):
-            continue
-
-        # If an ExamVenue already exists for this exam+venue, reuse it and re-point students.
-        existing = (
-            ExamVenue.objects.filter(exam=ev.exam, venue=venue)
-            .exclude(pk=ev.pk)
-            .first()
-        )
-        if existing:
-            StudentExam.objects.filter(exam_venue=ev).update(exam_venue=existing)
-            ev.delete()
-            continue
-
-        ev.venue = venue
-        ev.save(update_fields=["venue"])
+    if not venue or not venue.capacity or venue.capacity <= 0:
+        return None
+    if venue.venuetype == VenueType.SCHOOL_TO_SORT:
+        return None
+    return venue.capacity
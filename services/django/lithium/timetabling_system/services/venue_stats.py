@@ -1,6 +1,6 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
 
-from django.db.models import Count
+from django.db.models import Count, F, Q
 
 from timetabling_system.models import Exam, ExamVenue, StudentExam
 
@@ -29,19 +29,71 @@ def core_exam_size(exam: Exam) -> int:
     """
     if not exam:
         return 0
+    rows = _exam_venue_rows([exam.pk]).get(exam.pk, [])
+    return _core_size(getattr(exam, "no_students", 0) or 0, rows)
 
-    total = getattr(exam, "no_students", 0) or 0
-    counts = examvenue_student_counts(exam)
-    core_ev: Optional[ExamVenue] = (
-        exam.examvenue_set.select_related("venue").filter(core=True).order_by("pk").first()
+
+def exam_size_report(exams: Iterable[Exam]) -> List[dict]:
+    """
+    core_exam_size and per-ExamVenue student counts for many exams at once.
+
+    The exams are read as given (a queryset or an already fetched page) and
+    their ExamVenue rows and counts come from one grouped query, however many
+    exams there are.
+    """
+    exams = list(exams)
+    rows_by_exam = _exam_venue_rows([exam.pk for exam in exams])
+    report = []
+    for exam in exams:
+        rows = rows_by_exam.get(exam.pk, [])
+        report.append(
+            {
+                "exam_id": exam.pk,
+                "course_code": exam.course_code,
+                "exam_name": exam.exam_name,
+                "exam_school": exam.exam_school,
+                "no_students": exam.no_students,
+                "core_size": _core_size(exam.no_students or 0, rows),
+                "exam_venues": [
+                    {
+                        "examvenue_id": row["examvenue_id"],
+                        "venue_name": row["venue_id"],
+                        "start_time": row["start_time"],
+                        "exam_length": row["exam_length"],
+                        "core": row["core"],
+                        "students": row["students"],
+                    }
+                    for row in rows
+                ],
+            }
+        )
+    return report
+
+
+def _exam_venue_rows(exam_ids: List[int]) -> Dict[int, List[dict]]:
+    """ExamVenue rows for exam_ids in pk order, grouped by exam, each with its student count."""
+    if not exam_ids:
+        return {}
+    rows = (
+        ExamVenue.objects.filter(exam_id__in=exam_ids)
+        .values("examvenue_id", "exam_id", "venue_id", "start_time", "exam_length", "core")
+        .annotate(students=Count("studentexam", filter=Q(studentexam__exam_id=F("exam_id"))))
+        .order_by("examvenue_id")
     )
+    grouped: Dict[int, List[dict]] = {}
+    for row in rows:
+        grouped.setdefault(row["exam_id"], []).append(row)
+    return grouped
 
-    for ev in exam.examvenue_set.select_related("venue").all():
-        if core_ev and ev.pk == core_ev.pk:
+
+def _core_size(no_students: int, rows: List[dict]) -> int:
+    core: Optional[dict] = next((row for row in rows if row["core"]), None)
+    total = no_students
+    for row in rows:
+        if core and row["examvenue_id"] == core["examvenue_id"]:
             continue
-        if core_ev and ev.venue_id == core_ev.venue_id:
+        if core and row["venue_id"] == core["venue_id"]:
             # Small extra-time slot in the same physical room: do not reduce core count.
             continue
-        total -= counts.get(ev.pk, 0)
-
+        total -= row["students"]
     return max(total, 0)
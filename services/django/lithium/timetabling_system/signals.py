@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from timetabling_system.models import Venue, VenueType, ExamVenueProvisionType
-from timetabling_system.services.venue_matching import attach_placeholders_to_venue
+from timetabling_system.models import Exam, ExamVenue, StudentExam, Venue, VenueType, ExamVenueProvisionType
+from timetabling_system.services.data_version import bump_data_version
+from timetabling_system.services.placeholders import schedule_placeholder_attach
 
 
 @receiver(pre_save, sender=Venue)
@@ -20,5 +21,21 @@ def ensure_computer_cluster_for_use_computer(sender, instance: Venue, **kwargs):
 @receiver(post_save, sender=Venue)
 def update_placeholders_on_venue_save(sender, instance: Venue, **kwargs):
     # When a venue is created or its capabilities change, try to upgrade any
-    # placeholder ExamVenue rows that this venue can now satisfy.
-    attach_placeholders_to_venue(instance)
+    # placeholder ExamVenue rows that this venue can now satisfy. Saves are
+    # collected and handled in one pass after the transaction commits.
+    schedule_placeholder_attach(instance)
+
+
+@receiver(post_save, sender=Exam)
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=ExamVenue)
+@receiver(post_save, sender=StudentExam)
+@receiver(post_delete, sender=Exam)
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=ExamVenue)
+@receiver(post_delete, sender=StudentExam)
+def bump_timetable_version(sender, **kwargs):
+    # Row-level edits (admin, placeholder attach) invalidate the read API's ETags;
+    # StudentExam rows feed the per-room headcounts in /api/exam-sizes.
+    # Bulk imports bypass signals and bump once from ingest_upload_result instead.
+    bump_data_version()
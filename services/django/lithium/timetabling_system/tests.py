@@ -4,7 +4,7 @@ from unittest import mock
 import pandas as pd
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import DatabaseError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from openpyxl import Workbook
 from openpyxl.styles import Font
@@ -59,6 +59,7 @@ class HealthTests(TestCase):
         )
 
 
+@override_settings(UPLOAD_PARSE_CACHE_MAX_BYTES=0)
 class UploadTimetableFileTests(TestCase):
     def _build_excel_upload(self, rows):
         buffer = BytesIO()
@@ -0,0 +1,200 @@
+# timetabling_system/utils/column_coercion.py
+
+"""
+Column-level typing of parsed exam/provision sheets.
+
+Every typed column declared in file_definitions.COLUMN_TYPES is converted
+in one pass over the DataFrame, before it is turned into row dicts. Only
+unambiguous shapes are converted, and they give exactly what the importer's
+per-value coercion (services.upload_processor._coerce_*) would give; Excel
+serial numbers in date columns, which that path ignored, are read as dates.
+Any other cell is passed through unchanged for the per-value path.
+"""
+
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .file_definitions import COLUMN_TYPES
+
+# Excel serial day 0; the epoch absorbs Excel's 1900 leap-year bug.
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+_EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+_ISO_DATE_RE = r"^(\d{4})-(\d{1,2})-(\d{1,2})$"
+_CLOCK_RE = r"^(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?$"
+_HOURS_MINUTES_RE = r"^(\d{1,9}):(\d{1,9})(?::\d+)*$"
+_UNITS_RE = r"^(?:(\d{1,9})\s*h(?:ours?|rs?)?)?\s*(?:(\d{1,9})\s*m(?:ins?|inutes?)?)?$"
+_DIGITS_RE = r"^\d{1,9}$"
+# Numbers outside this range are left to the importer rather than risk int64 overflow.
+_MAX_NUMBER = 2 ** 40
+
+# Cell kinds, decided once per cell so each kind can be converted as a block.
+_OTHER, _MISSING, _STRING, _NUMBER, _DATETIME, _TIME, _TIMEDELTA = range(7)
+
+
+def coerce_columns(df, file_type):
+    """Convert df's typed columns in place (object dtype, None for blanks) and return it."""
+    for column, kind in (COLUMN_TYPES.get(file_type) or {}).items():
+        if column not in df.columns or isinstance(df[column], pd.DataFrame):
+            continue  # absent, or ambiguous duplicate headers: leave to the importer
+        df[column] = _coerce_series(df[column], _COERCERS[kind])
+    return df
+
+
+def _coerce_series(series, coerce):
+    # A timetable repeats a handful of dates, start times and lengths across
+    # thousands of rows: convert each distinct value once, then scatter back.
+    values = series.to_numpy(dtype=object)
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:  # unhashable cells
+        return coerce(series)
+    converted = coerce(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    out = np.full(len(values), None, dtype=object)
+    present = codes >= 0
+    out[present] = converted[codes[present]]
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def _cell_kind(value):
+    if value is None:
+        return _MISSING
+    if isinstance(value, str):
+        return _STRING
+    if isinstance(value, (bool, np.bool_, pd.Timedelta)):
+        return _OTHER
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        if value != value:
+            return _MISSING
+        return _NUMBER if abs(value) < _MAX_NUMBER else _OTHER
+    if isinstance(value, datetime):
+        return _DATETIME
+    if isinstance(value, time):
+        return _TIME
+    if isinstance(value, timedelta):
+        return _TIMEDELTA
+    return _OTHER
+
+
+class _Column:
+    """A column's values split by cell kind, with an output array to fill."""
+
+    def __init__(self, series):
+        self.index = series.index
+        self.values = series.to_numpy(dtype=object)
+        self.kinds = np.fromiter((_cell_kind(v) for v in self.values), dtype=np.int8, count=len(self.values))
+        self.out = self.values.copy()
+        self.out[self.kinds == _MISSING] = None
+
+        self.strings = pd.Series([], dtype=object)
+        is_string = self.kinds == _STRING
+        if is_string.any():
+            stripped = pd.Series(self.values[is_string], index=np.flatnonzero(is_string)).str.strip()
+            blank = stripped == ""
+            self.out[stripped.index[blank]] = None
+            self.strings = stripped[~blank].str.lower()
+
+    def mask(self, kind):
+        return self.kinds == kind
+
+    def series(self):
+        return pd.Series(self.out, index=self.index, dtype=object)
+
+
+def _to_dates(series):
+    col = _Column(series)
+
+    is_datetime = col.mask(_DATETIME)
+    col.out[is_datetime] = [value.date() for value in col.values[is_datetime]]
+
+    positions = np.flatnonzero(col.mask(_NUMBER))
+    serials = col.values[positions].astype(float)
+    in_range = (serials >= 1) & (serials <= _EXCEL_MAX_SERIAL)
+    days = pd.to_timedelta(np.floor(serials[in_range]), unit="D")
+    col.out[positions[in_range]] = (EXCEL_EPOCH + days).date
+
+    parts = col.strings.str.extract(_ISO_DATE_RE).dropna()
+    if not parts.empty:
+        parsed = pd.to_datetime(
+            {"year": parts[0].astype(int), "month": parts[1].astype(int), "day": parts[2].astype(int)},
+            errors="coerce",
+        ).dropna()
+        col.out[parsed.index] = parsed.dt.date.to_numpy()
+    return col.series()
+
+
+def _to_times(series):
+    # Datetime cells are kept whole: the importer prefers their own date.
+    col = _Column(series)
+
+    positions = np.flatnonzero(col.mask(_NUMBER))
+    fractions = col.values[positions].astype(float)
+    seconds = np.rint(fractions * 24 * 3600).astype(np.int64) % (24 * 3600)
+    col.out[positions] = [time(s // 3600, s % 3600 // 60, s % 60) for s in seconds.tolist()]
+
+    parts = col.strings.str.extract(_CLOCK_RE).dropna(subset=[0, 1])
+    if not parts.empty:
+        hours = parts[0].astype(int)
+        minutes = parts[1].astype(int)
+        secs = parts[2].fillna("0").astype(int)
+        valid = (hours < 24) & (minutes < 60) & (secs < 60)
+        col.out[parts.index[valid]] = [
+            time(h, m, s) for h, m, s in zip(hours[valid], minutes[valid], secs[valid])
+        ]
+    return col.series()
+
+
+def _to_minutes(series):
+    col = _Column(series)
+    _whole_numbers(col)
+
+    is_time = col.mask(_TIME)
+    col.out[is_time] = [value.hour * 60 + value.minute for value in col.values[is_time]]
+
+    is_timedelta = col.mask(_TIMEDELTA)
+    for pos in np.flatnonzero(is_timedelta):
+        value = col.values[pos]
+        if 0 <= value.days < 1:
+            col.out[pos] = value.seconds // 60
+
+    strings = col.strings
+    if not strings.empty:
+        clock = strings.str.extract(_HOURS_MINUTES_RE).dropna()
+        col.out[clock.index] = (clock[0].astype(int) * 60 + clock[1].astype(int)).to_numpy(dtype=object)
+
+        units = strings.str.extract(_UNITS_RE)
+        units = units[units[0].notna() | units[1].notna()]
+        col.out[units.index] = (
+            units[0].fillna("0").astype(int) * 60 + units[1].fillna("0").astype(int)
+        ).to_numpy(dtype=object)
+
+        _digit_strings(col)
+    return col.series()
+
+
+def _to_ints(series):
+    col = _Column(series)
+    _whole_numbers(col)
+    _digit_strings(col)
+    return col.series()
+
+
+def _whole_numbers(col):
+    positions = np.flatnonzero(col.mask(_NUMBER))
+    numbers = col.values[positions].astype(float)
+    col.out[positions] = np.rint(numbers).astype(np.int64).astype(object)
+
+
+def _digit_strings(col):
+    digits = col.strings[col.strings.str.fullmatch(_DIGITS_RE)]
+    col.out[digits.index] = digits.astype(int).to_numpy(dtype=object)
+
+
+_COERCERS = {
+    "date": _to_dates,
+    "time": _to_times,
+    "duration": _to_minutes,
+    "int": _to_ints,
+}
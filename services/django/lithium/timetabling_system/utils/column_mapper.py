@@ -1,26 +1,54 @@
 import re
+from functools import lru_cache
+
 from .equivalents import EQUIVALENT_COLUMNS
 
+_WHITESPACE_RE = re.compile(r'\s+')
+_PUNCTUATION_RE = re.compile(r'[^a-z0-9_]')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+
 def normalize(col):
     """Normalize column names: lowercase, underscores, remove punctuation."""
-    text = str(col).strip().lower()
+    return _normalize_text(str(col))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_text(text):
+    text = text.strip().lower()
     if text.startswith("unnamed") or text in ("", "nan"):
         return ""
-    text = re.sub(r'\s+', '_', text)            # collapse all whitespace (incl. newlines)
-    text = re.sub(r'[^a-z0-9_]', '', text)      # drop punctuation
-    text = re.sub(r'_+', '_', text).strip('_')  # collapse duplicate underscores
+    text = _WHITESPACE_RE.sub('_', text)        # collapse all whitespace (incl. newlines)
+    text = _PUNCTUATION_RE.sub('', text)        # drop punctuation
+    text = _UNDERSCORES_RE.sub('_', text).strip('_')  # collapse duplicate underscores
 
     return text
 
+
+# Built once at import; later entries win, as when the map was rebuilt per call.
+NORMALIZED_TO_CANONICAL = {
+    normalize(eq): canonical
+    for canonical, equivalents in EQUIVALENT_COLUMNS.items()
+    for eq in equivalents
+}
+
+
+@lru_cache(maxsize=4096)
+def _canonical_text(text):
+    norm = _normalize_text(text)
+    return NORMALIZED_TO_CANONICAL.get(norm, norm)
+
+
+def canonical_headers(headers):
+    """
+    Canonical field name for each header in a row, in order.
+
+    Used when scoring whole rows as header candidates: each distinct header
+    text is normalized and looked up once, then served from cache.
+    """
+    return [_canonical_text(str(h)) for h in headers]
+
+
 def map_equivalent_columns(columns):
     """Map messy Excel columns to standardized field names."""
-    normalized_to_canonical = {}
-    for canonical, equivalents in EQUIVALENT_COLUMNS.items():
-        for eq in equivalents:
-            normalized_to_canonical[normalize(eq)] = canonical
-
-    mapping = {}
-    for col in columns:
-        norm = normalize(col)
-        mapping[col] = normalized_to_canonical.get(norm, norm)
-    return mapping
+    return {col: _canonical_text(str(col)) for col in columns}
@@ -0,0 +1,234 @@
+# timetabling_system/utils/exam_period_generator.py
+
+"""
+Synthetic exam-period workbooks for benchmarking the upload pipeline.
+
+Writes the three upload types in the layouts parse_excel_file expects from
+the real files (banner rows above the exam header, the multi-line provision
+report headers, the day/date/room columns of a venue sheet), at whatever
+scale is asked for. The same seed always produces the same workbooks.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from timetabling_system.models import ProvisionType
+
+# Relative weight of each provision in the generated provision report.
+DEFAULT_PROVISION_MIX = {
+    ProvisionType.EXTRA_TIME_15_PER_HOUR: 4,
+    ProvisionType.EXTRA_TIME_30_PER_HOUR: 2,
+    ProvisionType.EXTRA_TIME_100: 0.3,
+    ProvisionType.SEPARATE_ROOM_ON_OWN: 1,
+    ProvisionType.SEPARATE_ROOM_NOT_ON_OWN: 1.5,
+    ProvisionType.USE_COMPUTER: 1.5,
+    ProvisionType.ACCESSIBLE_HALL: 0.5,
+    ProvisionType.SEATED_AT_BACK: 1,
+    ProvisionType.TOILET_BREAKS_REQUIRED: 1,
+}
+
+EXAM_HEADERS = [
+    "Exam Code",
+    "Exam Name",
+    "Exam date",
+    "Exam Start (BST)",
+    "Exam Duration (Hours:Minutes)",
+    "Exam finish",
+    "Online/ On Campus Exam",
+    "Assessment Type (Online Exams/ Venue (On Campus Exams)",
+    "Exam Size",
+    "School Contact ",
+    "School",
+]
+
+PROVISION_HEADERS = [
+    "Main Venue",
+    "Day",
+    "Date",
+    "Start Time",
+    "Finish Time",
+    "Duration",
+    "Exam Type",
+    "Exam Code",
+    "Exam",
+    "School",
+    "Student ID\nMock IDs",
+    "Student Name\nMock Names",
+    "Exam Provision\nData as presented to Registry",
+    "Additional Information \nStudent identifers have been removed",
+]
+
+SCHOOLS = [
+    "SCHOOL OF CHEMISTRY",
+    "SCHOOL OF COMPUTING SCIENCE",
+    "SCHOOL OF MATHEMATICS & STATISTICS",
+    "SCHOOL OF PHYSICS & ASTRONOMY",
+    "ADAM SMITH BUSINESS SCHOOL",
+    "SCHOOL OF LAW",
+]
+SUBJECTS = ["Chemistry", "Computing", "Mathematics", "Physics", "Economics", "Law"]
+START_TIMES = [time(9, 30), time(13, 0), time(14, 0)]
+DURATIONS = [60, 90, 120, 180]
+FILE_NAMES = {"Venue": "venues.xlsx", "Exam": "exam_timetable.xlsx", "Provisions": "provisions.xlsx"}
+
+
+def generate_exam_period(
+    directory,
+    *,
+    exams=200,
+    students=400,
+    venues=40,
+    days=10,
+    start_date=date(2025, 8, 4),
+    provision_mix=None,
+    main_halls=None,
+    seed=0,
+):
+    """
+    Write venue, exam timetable and provision report workbooks to directory.
+
+    exams are spread over the first `days` weekdays from start_date; each of
+    the `students` on the provision report sits one to four of them with one
+    or two provisions drawn from provision_mix (ProvisionType -> weight).
+    Returns {"Venue"|"Exam"|"Provisions": path} plus the row counts.
+    """
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    mix = dict(provision_mix or DEFAULT_PROVISION_MIX)
+
+    dates = _weekdays(start_date, days)
+    hall_count = main_halls if main_halls is not None else max(1, venues // 10)
+    halls = [f"Bench Main Hall {n}" for n in range(1, hall_count + 1)]
+    rooms = [f"Bench Room {n}" for n in range(1, max(venues - hall_count, 0) + 1)]
+    timetable = _exam_timetable(rng, exams, dates, halls)
+
+    paths = {file_type: directory / name for file_type, name in FILE_NAMES.items()}
+    _write_venues(paths["Venue"], rng, dates, halls, rooms)
+    _write_exams(paths["Exam"], timetable)
+    provision_rows = _write_provisions(paths["Provisions"], rng, timetable, students, mix)
+    return {
+        **paths,
+        "rows": {"Venue": len(halls) + len(rooms), "Exam": len(timetable), "Provisions": provision_rows},
+    }
+
+
+def _weekdays(start, count):
+    dates = []
+    day = start
+    while len(dates) < count:
+        if day.weekday() < 5:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+
+def _exam_timetable(rng, count, dates, halls):
+    timetable = []
+    for n in range(count):
+        school_idx = n % len(SCHOOLS)
+        exam_date = rng.choice(dates)
+        start = rng.choice(START_TIMES)
+        length = rng.choice(DURATIONS)
+        finish = datetime.combine(exam_date, start) + timedelta(minutes=length)
+        timetable.append(
+            {
+                "code": f"BENCH{n:05d}",
+                "name": f"{SUBJECTS[school_idx]} {n}",
+                "date": exam_date,
+                "start": start,
+                "length": length,
+                "finish": finish.time(),
+                "venue": rng.choice(halls),
+                "size": rng.randint(10, 300),
+                "school": SCHOOLS[school_idx],
+            }
+        )
+    return timetable
+
+
+def _hours_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _write_venues(path, rng, dates, halls, rooms):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([day.strftime("%A") for day in dates])
+    ws.append([day.isoformat() for day in dates])
+    # Halls are free every day; each room on roughly four days in five.
+    inaccessible = set(rng.sample(rooms, len(rooms) // 10))
+    red = Font(color="FFFF0000")
+    columns = [halls + [room for room in rooms if rng.random() < 0.8] for _ in dates]
+    for idx in range(max((len(column) for column in columns), default=0)):
+        row = []
+        for column in columns:
+            name = column[idx] if idx < len(column) else None
+            cell = WriteOnlyCell(ws, value=name)
+            if name in inaccessible:
+                cell.font = red
+            row.append(cell)
+        ws.append(row)
+    wb.save(path)
+
+
+def _write_exams(path, timetable):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Exam Period Final Timetable (generated)"])
+    ws.append([""])
+    ws.append(EXAM_HEADERS)
+    for exam in timetable:
+        ws.append(
+            [
+                exam["code"],
+                exam["name"],
+                exam["date"].isoformat(),
+                exam["start"].strftime("%H:%M"),
+                _hours_minutes(exam["length"]),
+                exam["finish"].strftime("%H:%M"),
+                "On Campus",
+                exam["venue"],
+                exam["size"],
+                "",
+                exam["school"],
+            ]
+        )
+    wb.save(path)
+
+
+def _write_provisions(path, rng, timetable, students, mix):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(PROVISION_HEADERS)
+    choices, weights = list(mix), list(mix.values())
+    rows = 0
+    for n in range(students):
+        provisions = {ProvisionType(p).label for p in rng.choices(choices, weights, k=rng.randint(1, 2))}
+        for exam in rng.sample(timetable, min(rng.randint(1, 4), len(timetable))):
+            ws.append(
+                [
+                    exam["venue"],
+                    exam["date"].strftime("%A"),
+                    exam["date"].isoformat(),
+                    exam["start"].strftime("%H:%M"),
+                    exam["finish"].strftime("%H:%M"),
+                    _hours_minutes(exam["length"]),
+                    "Campus Exam",
+                    exam["code"],
+                    exam["name"],
+                    exam["school"],
+                    f"B{n:07d}",
+                    f"Student{n};Bench",
+                    " ; ".join(sorted(provisions)),
+                    "",
+                ]
+            )
+            rows += 1
+    wb.save(path)
+    return rows
@@ -2,16 +2,18 @@
 
 import pandas as pd
 
-from .column_mapper import map_equivalent_columns, normalize
+from ..metrics import stage_timer
+from .column_coercion import coerce_columns
+from .column_mapper import canonical_headers, map_equivalent_columns, normalize
 from .file_classifier import (
-    detect_provision_file,
-    detect_venue_file,
-    detect_exam_file,
+    classify,
     EXAM_INDICATORS,
     PROVISION_INDICATORS,
 )
 from .file_definitions import REQUIRED_COLUMNS
-from .venue_parser import parse_venue_file
+from .row_batch import RowBatch
+from .venue_parser import parse_venue_rows
+from .workbook_source import WorkbookSource
 
 
 # --------------------------------------------------------------------------
@@ -19,8 +21,7 @@ from .venue_parser import parse_venue_file
 # --------------------------------------------------------------------------
 
 def _score_headers(headers):
-    mapping = map_equivalent_columns(headers)
-    canonical = [mapping.get(h, normalize(h)) for h in headers]
+    canonical = canonical_headers(headers)
     canonical_set = set(canonical)
     exam_hits = len(canonical_set & EXAM_INDICATORS)
     provision_hits = len(canonical_set & PROVISION_INDICATORS)
@@ -114,22 +115,28 @@ def parse_excel_file(file):
     Then returns structured data for each.
     """
 
-    filename = getattr(file, "name", "uploaded_file")
+    with stage_timer("read"):
+        source = WorkbookSource(file)
+        try:
+            raw_df = source.dataframe()
+        except Exception:
+            raw_df = None
+    filename = source.name
 
-    try:
-        raw_df = pd.read_excel(file)
-    except Exception:
-        if hasattr(file, "seek"):
-            file.seek(0)
-        return parse_venue_file(file)
+    if raw_df is None:
+        with stage_timer("parse", "Venue"):
+            return parse_venue_rows(source.active_rows)
 
-    # Prepare normalized copy for exam/provision detection
-    df = prepare_exam_provision_df(raw_df.copy())
+    # Prepare normalized copy for exam/provision detection (column relabelling
+    # only, so a shallow copy keeps raw_df intact for venue detection).
+    with stage_timer("classify"):
+        df = prepare_exam_provision_df(raw_df.copy(deep=False))
+        profile = classify(df)
 
     # ------------------------------------------
     # 1. Detect PROVISION file
     # ------------------------------------------
-    if detect_provision_file(df):
+    if profile.is_provision:
         file_type = "Provisions"
 
         missing = validate_required_columns(df, file_type)
@@ -141,18 +148,21 @@ def parse_excel_file(file):
                 "message": f"Missing required columns: {', '.join(missing)}"
             }
 
+        with stage_timer("parse", file_type):
+            df = coerce_columns(df, file_type)
+            rows = RowBatch.from_dataframe(df)
         return {
             "status": "ok",
             "type": "Provisions",
             "file": filename,
             "columns": list(df.columns),
-            "rows": df.to_dict(orient="records"),
+            "rows": rows,
         }
 
     # ------------------------------------------
     # 2. Detect EXAM file
     # (Check exam before venue to avoid misclassifying exam tables that include day/date columns.)
-    if detect_exam_file(df):
+    if profile.is_exam:
         file_type = "Exam"
 
         missing = validate_required_columns(df, file_type)
@@ -164,21 +174,24 @@ def parse_excel_file(file):
                 "message": f"Missing required columns: {', '.join(missing)}"
             }
 
+        with stage_timer("parse", file_type):
+            df = coerce_columns(df, file_type)
+            rows = RowBatch.from_dataframe(df)
         return {
             "status": "ok",
             "type": "Exam",
             "file": filename,
             "columns": list(df.columns),
-            "rows": df.to_dict(orient="records"),
+            "rows": rows,
         }
 
     # ------------------------------------------
     # 3. Detect VENUE file
     # ------------------------------------------
-    if detect_venue_file(raw_df):
-        if hasattr(file, "seek"):
-            file.seek(0)
-        return parse_venue_file(file)
+    # Venue detection runs on the raw sheet structure, not the re-headed frame.
+    if classify(raw_df).is_venue:
+        with stage_timer("parse", "Venue"):
+            return parse_venue_rows(source.active_rows)
 
     # ------------------------------------------
     # 4. Unknown file type
@@ -1,9 +1,14 @@
 # timetabling_system/utils/file_classifier.py
 
+import logging
 import math
+from dataclasses import dataclass
 from datetime import date, datetime
+from typing import FrozenSet, Optional
 
-from .column_mapper import normalize, map_equivalent_columns
+from .column_mapper import canonical_headers, normalize
+
+logger = logging.getLogger(__name__)
 
 
 EXAM_INDICATORS = {
@@ -31,6 +36,9 @@ def _normalized_columns(df):
     return {normalize(col) for col in df.columns}
 
 
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "sat", "sun", "saturday", "sunday")
+
+
 def _canonical_columns(df):
     """
     Map messy column names to canonical equivalents before detection.
@@ -38,7 +46,7 @@ def _canonical_columns(df):
     row (e.g., the real header) as a header guess.
     """
     def map_and_score(headers):
-        mapped = set(map_equivalent_columns(headers).values())
+        mapped = set(canonical_headers(headers))
         exam_hits = len(mapped & EXAM_INDICATORS)
         provision_hits = len(mapped & PROVISION_INDICATORS)
         return mapped, exam_hits, provision_hits
@@ -67,43 +75,90 @@ def _canonical_columns(df):
     return best[0]
 
 
-def detect_provision_file(df):
-    print("Detecting provision file...")
-    """Provision files contain student + registry info."""
-    canonical_cols = _canonical_columns(df)
-
-    provision_indicators = PROVISION_INDICATORS
-    provision_present = "provisions" in canonical_cols
+@dataclass(frozen=True)
+class FileProfile:
+    """
+    Everything the detectors look at, computed once per DataFrame by classify().
 
+    file_type is "Provisions", "Exam", "Venue" or None, checked in that order
+    of precedence; confidence is the share of that type's signals present.
+    """
+    canonical_columns: FrozenSet[str]
+    exam_hits: int
+    provision_hits: int
+    is_provision: bool
+    is_exam: bool
+    venue_weekday_hits: int
+    venue_date_hits: int
+    is_venue: bool
+    file_type: Optional[str]
+    confidence: float
+
+
+def classify(df):
+    """Profile a DataFrame: header mapping, indicator hits and venue signals in one pass."""
+    canonical_cols = frozenset(_canonical_columns(df))
+    exam_hits = len(canonical_cols & EXAM_INDICATORS)
+    provision_hits = len(canonical_cols & PROVISION_INDICATORS)
+
+    is_provision = _is_provision(canonical_cols, provision_hits)
+    is_exam = exam_hits >= 2 and not is_provision
+
+    weekday_hits = date_hits = 0
+    is_venue = False
+    if not (is_exam or is_provision):
+        try:
+            weekday_hits, date_hits = _venue_signals(df)
+        except Exception:
+            weekday_hits = date_hits = 0
+        is_venue = weekday_hits >= 1 and date_hits >= 1
+
+    if is_provision:
+        file_type, confidence = "Provisions", provision_hits / len(PROVISION_INDICATORS)
+    elif is_exam:
+        file_type, confidence = "Exam", exam_hits / len(EXAM_INDICATORS)
+    elif is_venue:
+        width = max(len(df.columns), 1)
+        file_type, confidence = "Venue", min(weekday_hits, date_hits) / width
+    else:
+        file_type, confidence = None, 0.0
+
+    profile = FileProfile(
+        canonical_columns=canonical_cols,
+        exam_hits=exam_hits,
+        provision_hits=provision_hits,
+        is_provision=is_provision,
+        is_exam=is_exam,
+        venue_weekday_hits=weekday_hits,
+        venue_date_hits=date_hits,
+        is_venue=is_venue,
+        file_type=file_type,
+        confidence=round(min(confidence, 1.0), 3),
+    )
+    logger.debug("Classified upload as %s: %s", file_type, profile)
+    return profile
+
+
+def _is_provision(canonical_cols, strong_hits):
+    """Provision files contain student + registry info."""
     # Must have at least one provision-like column to count as a provision file.
-    if not provision_present:
+    if "provisions" not in canonical_cols:
         return False
 
-    strong_hits = len(canonical_cols & provision_indicators)
-
     studentish = sum("student" in col for col in canonical_cols)
     provisionish = sum(any(term in col for term in ("provision", "registry", "adjustment")) for col in canonical_cols)
 
     return strong_hits >= 2 or (studentish >= 1 and provisionish >= 1)
 
 
+def detect_provision_file(df):
+    """Provision files contain student + registry info."""
+    return classify(df).is_provision
+
+
 def detect_exam_file(df):
-    print("Detecting exam file...")
     """Exam files contain exam session fields but no student data."""
-    canonical_cols = _canonical_columns(df)
-    exam_indicators = {
-        "exam_code",
-        "exam_name",
-        "exam_date",
-        "exam_start",
-        "main_venue",
-        "exam_type",
-        "exam_end",
-        "exam_length",
-    }
-
-    exam_hits = len(canonical_cols & exam_indicators)
-    return exam_hits >= 2 and not detect_provision_file(df)
+    return classify(df).is_exam
 
 
 def _looks_like_date_cell(val):
@@ -137,39 +192,34 @@ def _looks_like_date_cell(val):
         return False
 
 
-def detect_venue_file(df):
-    print("Detecting venue file...")
+def _venue_signals(df):
     """
-    Venue files are column-based:
+    Weekday and date hits for the venue layout. Venue files are column-based:
     Row 1 = day names
     Row 2 = dates
     Rows 3.. = room names
+    Returns the first matching (weekday_hits, date_hits), or (0, 0).
     """
-    weekdays = ("monday", "tuesday", "wednesday", "thursday", "friday", "sat", "sun", "saturday", "sunday")
-
     def weekday_hits(seq):
-        return sum(any(day in str(cell).lower().split("-")[0] for day in weekdays) for cell in seq)
+        return sum(any(day in str(cell).lower().split("-")[0] for day in WEEKDAYS) for cell in seq)
 
     def date_hits(seq):
         return sum(_looks_like_date_cell(cell) for cell in seq)
 
-    try:
-        # If it already looks like an exam or provision file, do not treat it as venue.
-        if detect_exam_file(df) or detect_provision_file(df):
-            return False
+    # Case 1: worksheets treated as data rows (no header)
+    if len(df.index) >= 2:
+        hits = weekday_hits(df.iloc[0]), date_hits(df.iloc[1])
+        if min(hits) >= 1:
+            return hits
 
-        # Case 1: worksheets treated as data rows (no header)
-        if len(df.index) >= 2:
-            first_row = df.iloc[0]
-            second_row = df.iloc[1]
-            if weekday_hits(first_row) >= 1 and date_hits(second_row) >= 1:
-                return True
-
-        # Case 2: pandas used first row as header, so weekdays sit in columns
-        if len(df.columns) >= 1 and len(df.index) >= 1:
-            if weekday_hits(df.columns) >= 1 and date_hits(df.iloc[0]) >= 1:
-                return True
-        return False
+    # Case 2: pandas used first row as header, so weekdays sit in columns
+    if len(df.columns) >= 1 and len(df.index) >= 1:
+        hits = weekday_hits(df.columns), date_hits(df.iloc[0])
+        if min(hits) >= 1:
+            return hits
+    return 0, 0
 
-    except Exception:
-        return False
+
+def detect_venue_file(df):
+    """Venue files have weekday names over dates; never an exam or provision file."""
+    return classify(df).is_venue
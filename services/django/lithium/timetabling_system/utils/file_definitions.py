@@ -48,3 +48,27 @@ REQUIRED_COLUMNS = {
     "Provisions": REQUIRED_PROVISION_COLUMNS,
     "Venue": REQUIRED_VENUE_COLUMNS,
 }
+
+
+# ---------------------------------
+#  TYPED COLUMNS (see column_coercion)
+# ---------------------------------
+#   "date"     -> datetime.date (ISO strings, Excel serial numbers)
+#   "time"     -> datetime.time ("09:30", fraction-of-day numbers);
+#                 full datetimes are kept, they already carry the date
+#   "duration" -> minutes as int ("02:30", "2h30m", "90 mins", 120)
+#   "int"      -> int
+
+EXAM_COLUMN_TYPES = {
+    "exam_date": "date",
+    "exam_start": "time",
+    "exam_end": "time",
+    "exam_length": "duration",
+    "no_students": "int",
+}
+
+COLUMN_TYPES = {
+    "Exam": EXAM_COLUMN_TYPES,
+    "Provisions": {},
+    "Venue": {},
+}
@@ -0,0 +1,79 @@
+# timetabling_system/utils/row_batch.py
+
+import numpy as np
+
+# Rows are materialized this many at a time while iterating.
+ROW_CHUNK_SIZE = 500
+
+
+class RowBatch:
+    """
+    Parsed sheet rows held column-wise.
+
+    parse_excel_file returns one of these as result["rows"] instead of a list
+    of per-row dicts. Each column is a single object array, and the row dicts
+    the importers read are built lazily, a chunk at a time, while iterating.
+    The full list of dicts is only produced when a caller asks for it with
+    tolist() (the JSON encoders do this when a response echoes the rows).
+
+    Row dicts match DataFrame.to_dict(orient="records"). That includes
+    duplicate column names, where the right-most column wins.
+    """
+
+    def __init__(self, columns, arrays):
+        if len(columns) != len(arrays):
+            raise ValueError("RowBatch needs exactly one array per column.")
+        self.columns = list(columns)
+        self._arrays = [np.asarray(array, dtype=object) for array in arrays]
+        self._length = len(self._arrays[0]) if self._arrays else 0
+
+    @classmethod
+    def from_dataframe(cls, df):
+        arrays = [df.iloc[:, pos].to_numpy(dtype=object) for pos in range(df.shape[1])]
+        batch = cls([str(column) for column in df.columns], arrays)
+        batch._length = len(df.index)
+        return batch
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            batch = RowBatch(self.columns, [array[index] for array in self._arrays])
+            batch._length = len(range(*index.indices(self._length)))
+            return batch
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("RowBatch index out of range")
+        return dict(zip(self.columns, (array[index] for array in self._arrays)))
+
+    def __repr__(self):
+        return f"<RowBatch rows={self._length} columns={self.columns!r}>"
+
+    def chunks(self, size=ROW_CHUNK_SIZE):
+        """Yield lists of up to size row dicts, in row order."""
+        columns = self.columns
+        for start in range(0, self._length, size):
+            stop = min(start + size, self._length)
+            values = [array[start:stop].tolist() for array in self._arrays]
+            if values:
+                yield [dict(zip(columns, row)) for row in zip(*values)]
+            else:
+                yield [{} for _ in range(stop - start)]
+
+    def project(self, columns):
+        """A RowBatch with only the given columns that exist, sharing the arrays."""
+        wanted = set(columns)
+        kept = [(column, array) for column, array in zip(self.columns, self._arrays) if column in wanted]
+        batch = RowBatch([column for column, _ in kept], [array for _, array in kept])
+        batch._length = self._length
+        return batch
+
+    def tolist(self):
+        """All rows as a list of dicts."""
+        return [row for chunk in self.chunks() for row in chunk]
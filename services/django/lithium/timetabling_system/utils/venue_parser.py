@@ -23,80 +23,88 @@ def _cell_to_date_text(cell):
             return str(val).strip()
     return None
 
-def parse_venue_file(file):
-    print("Parsing venue file...")
-    print(type(file))
-    wb = load_workbook(file)
-    ws = wb.active
-    results = []
-    venue_index = {}  # venue_name -> accessibility flag (False if any instance is inaccessible)
-    # Find the first non-empty row; some templates start with a blank row.
-    header_row = None
-    for row in range(1, ws.max_row + 1):
-        if any(ws.cell(row, col).value for col in range(1, ws.max_column + 1)):
-            header_row = row
-            break
-    if header_row is None or header_row + 1 > ws.max_row:
-        return {
-            "status": "error",
-            "type": "Venue",
-            "message": "Could not locate header rows in venue file."
-        }
-
-    # Read column pairs: (header row, date row, data rows)
-    date_row = header_row + 1
-    first_data_row = date_row + 1
+def _is_red_font(cell):
+    font = getattr(cell, "font", None)
+    font_color = font.color if font else None
+    if not font_color or font_color.type != "rgb":
+        return False
+    rgb = str(font_color.rgb).upper() if font_color.rgb else ""
+    return "FF0000" in rgb
 
-    for col in range(1, ws.max_column + 1):
-        day_cell = ws.cell(header_row, col)
-        date_cell = ws.cell(date_row, col)
 
-        day_text = str(day_cell.value).strip() if day_cell.value else None
-        date_text = _cell_to_date_text(date_cell)
-
-        # Skip empty columns
-        if not day_text:
+def parse_venue_file(file):
+    """
+    Parse a venue availability workbook in a single streaming pass.
+
+    The workbook is opened read-only so rows are streamed from the sheet XML
+    instead of materialising every cell and style.
+    """
+    wb = load_workbook(file, read_only=True)
+    try:
+        ws = wb.active
+        # Ignore the (often stale) <dimension> tag so every populated row is read.
+        ws.reset_dimensions()
+        return parse_venue_rows(ws.iter_rows())
+    finally:
+        wb.close()
+
+
+def parse_venue_rows(rows):
+    """
+    Build the venue payload from an iterable of worksheet rows (cell tuples).
+
+    Layout: the first non-empty row holds day names, the row beneath it the
+    dates, and each column below lists the rooms free that day. Rooms in red
+    font are inaccessible.
+    """
+    header = None
+    dates = None
+    rooms_by_col = {}
+
+    for row in rows:
+        if header is None:
+            # Some templates start with one or more blank rows.
+            if not any(cell.value for cell in row):
+                continue
+            header = {
+                idx: str(cell.value).strip()
+                for idx, cell in enumerate(row)
+                if cell.value and str(cell.value).strip()
+            }
+            rooms_by_col = {idx: [] for idx in header}
             continue
 
-        rooms = []
-        
-
-        for row in range(first_data_row, ws.max_row + 1):
-            cell = ws.cell(row, col)
-            value = cell.value
-
-            if not value: continue
-
-            # Detect red font (non-accessible)
-            font_color = cell.font.color
-            rgb = str(font_color.rgb).upper() if font_color and font_color.rgb else ""
-            is_red = (
-                font_color
-                and font_color.type == "rgb"
-                and "FF0000" in rgb
-            )
-
-            room_name = str(value).strip()
-            accessible = not is_red
+        if dates is None:
+            dates = {idx: _cell_to_date_text(cell) for idx, cell in enumerate(row) if idx in header}
+            continue
 
+        for idx, cell in enumerate(row):
+            rooms = rooms_by_col.get(idx)
+            if rooms is None or not cell.value:
+                continue
             rooms.append({
-                "name": room_name,
-                "accessible": accessible
+                "name": str(cell.value).strip(),
+                "accessible": not _is_red_font(cell),
             })
-            
-
-            # Track venue-level accessibility; once false, remain false.
-            venue_index[room_name] = venue_index.get(room_name, True) and accessible
 
+    if header is None or dates is None:
+        return {
+            "status": "error",
+            "type": "Venue",
+            "message": "Could not locate header rows in venue file."
+        }
 
+    results = []
+    venue_index = {}  # venue_name -> accessibility flag (False if any instance is inaccessible)
+    for idx, day_text in header.items():
+        rooms = rooms_by_col[idx]
+        for room in rooms:
             # Track venue-level accessibility; once false, remain false.
-            venue_index[room_name] = venue_index.get(room_name, True) and accessible
-
-
+            venue_index[room["name"]] = venue_index.get(room["name"], True) and room["accessible"]
         results.append({
             "day": day_text,
-            "date": date_text,
-            "rooms": rooms
+            "date": dates.get(idx),
+            "rooms": rooms,
         })
 
     venues = [
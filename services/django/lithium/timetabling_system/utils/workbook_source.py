@@ -0,0 +1,82 @@
+# timetabling_system/utils/workbook_source.py
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+
+class WorkbookSource:
+    """
+    An uploaded workbook, read exactly once.
+
+    The sheet is streamed in read-only mode a single time and its cells kept,
+    so the pandas view (header sniffing, exam/provision parsing) and the
+    raw-cell view (values plus font, for the venue parser) come from the same
+    pass instead of each re-reading the upload.
+    """
+
+    def __init__(self, file):
+        self.name = getattr(file, "name", "uploaded_file")
+        if hasattr(file, "seek"):
+            file.seek(0)
+        # Same options pandas uses for its own openpyxl loads.
+        wb = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+        try:
+            # pd.read_excel reads the first sheet; the venue parser reads the active one.
+            self.rows = _read_rows(wb.worksheets[0])
+            active = wb.active
+            self.active_rows = self.rows if active is wb.worksheets[0] else _read_rows(active)
+        finally:
+            wb.close()
+        self._dataframe = None
+
+    def dataframe(self):
+        """First sheet as a DataFrame, equivalent to pd.read_excel(file)."""
+        if self._dataframe is None:
+            self._dataframe = _rows_to_dataframe(self.rows)
+        return self._dataframe
+
+
+def _read_rows(ws):
+    # Ignore the (often stale) <dimension> tag so every populated row is read.
+    ws.reset_dimensions()
+    return [tuple(row) for row in ws.iter_rows()]
+
+
+def _convert_cell(cell):
+    # Mirrors pandas' openpyxl reader so the frame matches pd.read_excel.
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def _rows_to_dataframe(rows):
+    data = []
+    last_row_with_data = -1
+    for row_number, row in enumerate(rows):
+        converted = [_convert_cell(cell) for cell in row]
+        while converted and converted[-1] == "":
+            converted.pop()
+        if converted:
+            last_row_with_data = row_number
+        data.append(converted)
+    data = data[: last_row_with_data + 1]
+    if not data:
+        return pd.DataFrame()
+
+    width = max(len(row) for row in data)
+    data = [row + [""] * (width - len(row)) for row in data]
+    try:
+        return TextParser(data, header=0, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
@@ -1,14 +1,40 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import DatabaseError, connection
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
 
+from . import metrics
+from .models import ExamVenue
 from .services import ingest_upload_result
+from .services.upload_cache import (
+    find_duplicate_upload,
+    hash_upload,
+    is_force_request,
+    parse_upload,
+    unchanged_result,
+)
+from .services.upload_jobs import enqueue_upload, is_async_request
+from .services.upload_profiling import upload_profile
+from .services.upload_processor import is_incremental_request, is_prune_request
 from .utils.excel_parser import parse_excel_file
+from .utils.row_batch import RowBatch
 from .utils.venue_ingest import upsert_venues
 
 
+class UploadResultEncoder(DjangoJSONEncoder):
+    """Writes parsed rows (a RowBatch) out as the list of row objects."""
+
+    def default(self, o):
+        if isinstance(o, RowBatch):
+            return o.tolist()
+        return super().default(o)
+
+
 class HomePageView(TemplateView):
     template_name = "timetabling_system/home.html"
 
@@ -42,6 +68,27 @@ def healthz_view(_request):
     )
 
 
+def _metrics_allowed(request) -> bool:
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """
+    Prometheus text metrics merged across workers, plus the current placeholder
+    backlog. Only served to METRICS_ALLOWED_IPS or holders of METRICS_TOKEN.
+    """
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden("Forbidden", content_type="text/plain")
+    placeholders = ExamVenue.objects.filter(venue__isnull=True).count()
+    body = metrics.render_metrics(
+        {"timetabling_placeholder_exam_venues": ("ExamVenue rows still waiting for a venue.", placeholders)}
+    )
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @csrf_exempt
 @require_POST
 def upload_timetable_file(request):
@@ -51,31 +98,59 @@ def upload_timetable_file(request):
             {"status": "error", "message": "No file uploaded."}, status=400
         )
 
-    if hasattr(upload, "seek"):
-        upload.seek(0)
-
-    try:
-        result = parse_excel_file(upload)
-    except Exception as exc:  # pragma: no cover - defensive fallback
+    force = is_force_request(request)
+    incremental = is_incremental_request(request)
+    prune = incremental and is_prune_request(request)
+    if is_async_request(request):
+        job = enqueue_upload(
+            upload, uploaded_by=request.user, force=force, incremental=incremental, prune=prune
+        )
         return JsonResponse(
             {
-                "status": "error",
-                "message": "Failed to parse uploaded file.",
-                "details": str(exc),
+                "status": job.status,
+                "job_id": job.pk,
+                "status_url": reverse("api-upload-job", args=[job.pk]),
             },
-            status=400,
+            status=202,
         )
 
-    if result.get("status") == "ok":
-        ingest_summary = ingest_upload_result(
-            result,
-            file_name=getattr(upload, "name", "uploaded_file"),
-            uploaded_by=request.user,
-        )
-        if ingest_summary:
-            result["ingest"] = ingest_summary
-            result["records_created"] = ingest_summary.get("created", 0)
-            result["records_updated"] = ingest_summary.get("updated", 0)
+    file_name = getattr(upload, "name", "uploaded_file")
+    content_hash = hash_upload(upload)
+    duplicate = None if force or prune else find_duplicate_upload(content_hash)
+    if duplicate:
+        return JsonResponse(unchanged_result(duplicate, file_name=file_name))
+
+    # Staff ?profile=1 profiles the parse and import (see services.upload_profiling).
+    ingest_summary = None
+    with upload_profile(request) as profile:
+        try:
+            result = parse_upload(upload, parse_excel_file, content_hash=content_hash, force=force)
+        except Exception as exc:  # pragma: no cover - defensive fallback
+            return JsonResponse(
+                {
+                    "status": "error",
+                    "message": "Failed to parse uploaded file.",
+                    "details": str(exc),
+                },
+                status=400,
+            )
+
+        if result.get("status") == "ok":
+            ingest_summary = ingest_upload_result(
+                result,
+                file_name=file_name,
+                uploaded_by=request.user,
+                bulk=True,
+                incremental=incremental,
+                prune=prune,
+                content_hash=content_hash,
+            )
+            if ingest_summary:
+                result["ingest"] = ingest_summary
+                result["records_created"] = ingest_summary.get("created", 0)
+                result["records_updated"] = ingest_summary.get("updated", 0)
+    if profile:
+        result["profile"] = profile.save((ingest_summary or {}).get("upload_log_id"))
 
     status_code = 200 if result.get("status") == "ok" else 400
-    return JsonResponse(result, status=status_code)
+    return JsonResponse(result, status=status_code, encoder=UploadResultEncoder)